@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import argparse
 from datetime import datetime
 from typing import List
 
@@ -13,16 +14,21 @@ sys.path.insert(0, src_path)
 try:
     from scraper.dje_scraper import DJEScraperDownload
     from scraper.cache_manager import CacheManager
+    from scraper.limite_espaco import LimiteEspaco
     from api.api_client import JusAPIClient
     from utils.logger import setup_logger
     from utils.config import Config
+    from utils.jsonl import GravadorJSONL
     from models.publicacao import Publicacao
+    from models.publicacao_batch import PublicacaoBatch
 except ImportError as e:
     print(f"Erro ao importar módulos: {e}")
     sys.exit(1)
 
 logger = setup_logger()
 
+PASTA_DOWNLOADS = "./downloads_dje"
+
 def criar_diretorios():
     """Cria diretórios necessários se não existirem."""
     diretorios = ['data/cache', 'data/results', 'data/backups', 'logs']
@@ -37,9 +43,8 @@ def mostrar_banner():
     print("Versão 2.0 - Estrutura Organizada")
     print("="*62)
 
-def mostrar_estatisticas_cache():
+def mostrar_estatisticas_cache(cache_manager: CacheManager):
     """Exibe estatísticas do cache atual."""
-    cache_manager = CacheManager()
     stats = cache_manager.estatisticas_cache()
     
     print(f"\nSITUAÇÃO ATUAL DO CACHE:")
@@ -60,7 +65,7 @@ def mostrar_menu():
     print("  5. Configurar API")
     print("  0. Sair")
 
-def extrair_do_site():
+def extrair_do_site(limite_espaco: LimiteEspaco):
     """Executa a extração de publicações do site DJE."""
     print("\n--- EXTRAÇÃO DO SITE DJE ---")
     data_busca = input("Data para busca (DD/MM/AAAA) [13/11/2024]: ").strip()
@@ -70,7 +75,7 @@ def extrair_do_site():
     logger.info(f"Iniciando extração para data: {data_busca}")
     
     try:
-        scraper = DJEScraperDownload() # Usando DJEScraperDownload
+        scraper = DJEScraperDownload(PASTA_DOWNLOADS, limite_espaco=limite_espaco)
         publicacoes = scraper.executar(data_busca)
         
         if publicacoes:
@@ -86,10 +91,9 @@ def extrair_do_site():
         print(f"Erro durante a extração: {e}")
         return []
 
-def processar_cache():
+def processar_cache(cache_manager: CacheManager):
     """Processa arquivos de cache existentes."""
     print("\n--- PROCESSAMENTO DO CACHE ---")
-    cache_manager = CacheManager()
     arquivos_validos = cache_manager.listar_arquivos_validos()
     
     if not arquivos_validos:
@@ -99,7 +103,7 @@ def processar_cache():
     logger.info(f"Processando {len(arquivos_validos)} arquivos de cache")
     
     try:
-        scraper = DJEScraperDownload() # Usando DJEScraperDownload
+        scraper = DJEScraperDownload(PASTA_DOWNLOADS, limite_espaco=cache_manager.limite_espaco)
         publicacoes = scraper.processar_pdfs_baixados() #
         
         if publicacoes:
@@ -115,19 +119,25 @@ def processar_cache():
         return []
 
 def processar_resultados(publicacoes: List, origem: str):
-    """Processa e salva os resultados das publicações, perguntando sobre o envio para a API."""
+    """
+    Processa e salva os resultados das publicações, perguntando sobre o envio para a API.
+    Um PublicacaoBatch é fechado ao final (o conteúdo completo das publicações deixa de ser legível).
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"data/results/publicacoes_{origem}_{timestamp}.json"
-    dados = [pub.to_dict() for pub in publicacoes]
-    
-    with open(nome_arquivo, 'w', encoding='utf-8') as f:
-        json.dump(dados, f, ensure_ascii=False, indent=2)
-    
-    mostrar_resumo_publicacoes(publicacoes)
-    print(f"\nResultados salvos em: {nome_arquivo}")
+    nome_arquivo = f"data/results/publicacoes_{origem}_{timestamp}.jsonl"
     
-    if perguntar_envio_api():
-        enviar_para_api(publicacoes, timestamp)
+    try:
+        with GravadorJSONL(nome_arquivo) as gravador:
+            gravador.adicionar(publicacoes)
+        
+        mostrar_resumo_publicacoes(publicacoes)
+        print(f"\nResultados salvos em: {gravador.caminho}")
+        
+        if perguntar_envio_api():
+            enviar_para_api(publicacoes, timestamp)
+    finally:
+        if isinstance(publicacoes, PublicacaoBatch):
+            publicacoes.fechar()
     
     return publicacoes
 
@@ -168,26 +178,31 @@ def enviar_para_api(publicacoes: List, timestamp: str):
     try:
         api_client = JusAPIClient()
         
-        nome_backup = f"data/backups/backup_pre_api_{timestamp}.json"
+        nome_backup = f"data/backups/backup_pre_api_{timestamp}.jsonl"
         api_client.criar_backup_local(publicacoes, nome_backup)
         
+        # Itens que falharam temporariamente em envios anteriores vão primeiro
+        pendentes = api_client.reenviar_pendentes()
+        if pendentes['total']:
+            logger.info(f"Outbox reenviada: {pendentes['sucessos']} sucessos, {pendentes['erros']} erros")
+        
         resultado = api_client.enviar_lote_publicacoes(publicacoes)
         
         nome_relatorio = f"data/results/relatorio_api_{timestamp}.json"
         with open(nome_relatorio, 'w', encoding='utf-8') as f:
             json.dump(resultado, f, ensure_ascii=False, indent=2)
         
-        logger.info(f"Envio para API concluído: {resultado['sucessos']} sucessos, {resultado['erros']} erros")
+        logger.info(f"Envio para API concluído: {resultado['sucessos']} sucessos, {resultado['erros']} erros, "
+                    f"{resultado['ja_existentes']} já existentes na API, "
+                    f"{resultado['pendentes_outbox']} pendentes na outbox")
         print(f"Relatório do envio salvo em: {nome_relatorio}")
         
     except Exception as e:
         logger.error(f"Erro no envio para API: {e}")
         print(f"Erro no envio para API: {e}")
 
-def gerenciar_cache():
+def gerenciar_cache(cache_manager: CacheManager):
     """Menu para gerenciar operações de cache."""
-    cache_manager = CacheManager()
-    
     while True:
         print(f"\n--- GERENCIAMENTO DE CACHE ---")
         stats = cache_manager.estatisticas_cache()
@@ -198,6 +213,7 @@ def gerenciar_cache():
         print("1. Relatório detalhado")
         print("2. Limpar cache antigo")
         print("3. Limpar cache com falhas")
+        print("4. Compactar arquivos do formato antigo (.txt)")
         print("0. Voltar")
         
         opcao = input("\nEscolha: ").strip()
@@ -207,9 +223,11 @@ def gerenciar_cache():
         elif opcao == "2":
             dias = input("Limpar arquivos com mais de quantos dias? [30]: ").strip()
             dias = int(dias) if dias.isdigit() else 30
-            cache_manager.limpar_cache_antigo(dias)
+            print(f"{cache_manager.limpar_cache_antigo(dias)} arquivo(s) removido(s)")
         elif opcao == "3":
-            cache_manager.limpar_cache_falhado()
+            print(f"{cache_manager.limpar_cache_falhado()} arquivo(s) removido(s)")
+        elif opcao == "4":
+            print(f"{cache_manager.compactar_cache()} arquivo(s) convertido(s)")
         elif opcao == "0":
             break
         else:
@@ -263,25 +281,45 @@ def configurar_api():
     except Exception as e:
         print(f"Erro ao configurar API: {e}")
 
+def parse_args():
+    """Lê os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="DJE Scraper - Tribunal de Justiça de São Paulo")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos paralelos na extração de texto dos PDFs baixados (padrão: MAX_CONCURRENT_EXTRACTIONS)")
+    parser.add_argument("--sessoes", type=int, default=None,
+                        help="Sessões do navegador que dividem os links da busca no site (padrão: MAX_BROWSER_SESSIONS)")
+    return parser.parse_args()
+
 def main():
     """Função principal"""
+    args = parse_args()
+    if args.workers:
+        Config.MAX_CONCURRENT_EXTRACTIONS = args.workers
+    if args.sessoes:
+        Config.MAX_BROWSER_SESSIONS = args.sessoes
+    
     criar_diretorios()
     mostrar_banner()
     logger.info("Sistema DJE Scraper iniciado")
     
+    # Um único serviço de limite de espaço para downloads e cache, compartilhado por todas as opções
+    limite_espaco = LimiteEspaco.padrao(PASTA_DOWNLOADS)
+    limite_espaco.iniciar()
+    cache_manager = CacheManager(limite_espaco=limite_espaco)
+    
     try:
         while True:
-            mostrar_estatisticas_cache()
+            mostrar_estatisticas_cache(cache_manager)
             mostrar_menu()
             
             opcao = input("\nEscolha uma opção: ").strip()
             
             if opcao == "1":
-                extrair_do_site()
+                extrair_do_site(limite_espaco)
             elif opcao == "2":
-                processar_cache()
+                processar_cache(cache_manager)
             elif opcao == "3":
-                gerenciar_cache()
+                gerenciar_cache(cache_manager)
             elif opcao == "4":
                 testar_api()
             elif opcao == "5":
@@ -304,6 +342,8 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        cache_manager.fechar()
+        limite_espaco.encerrar()
         print("Sistema finalizado.")
 
 
@@ -0,0 +1,158 @@
+"""
+Micro-benchmark do DataExtractor.extrair_dados.
+
+Compara a extração atual (padrões compilados na carga da classe, busca que para no primeiro
+resultado e os três valores em uma só varredura) com a implementação anterior, que recompilava
+os padrões a cada chamada e percorria o texto inteiro uma vez por campo. Confere que as duas
+produzem exatamente os mesmos dados para cada texto do corpus e mostra o tempo por documento.
+
+Corpus padrão: textos salvos em data/cache (arquivos do CacheManager e o cache de textos
+de PDF). Também aceita arquivos .txt/.djec ou pastas como argumentos.
+
+Uso:
+    python scripts/benchmark_extracao.py [caminhos...] [--repeticoes 20]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+
+from utils.config import Config
+from extraction.data_extractor import DataExtractor
+from scraper.cache_manager import CacheManager
+from scraper.text_cache import PDFTextCache
+
+
+class ExtratorReferencia(DataExtractor):
+    """Implementação anterior do extrair_dados (uma varredura por campo), mantida como referência."""
+
+    def _extrair_processo(self, texto: str) -> Optional[str]:
+        for pattern in self.patterns['processo']:
+            matches = re.findall(pattern, texto)
+            if matches:
+                return matches[0]
+        return None
+
+    def _extrair_data(self, texto: str) -> Optional[str]:
+        for pattern in self.patterns['data']:
+            match = re.search(pattern, texto)
+            if match:
+                return match.group(1)
+        return None
+
+    def _extrair_autor(self, texto: str) -> Optional[str]:
+        for pattern in self.patterns['autor']:
+            match = re.search(pattern, texto)
+            if match:
+                nome = match.group(1).strip()
+                if self._is_nome_valido(nome):
+                    return nome
+        return None
+
+    def _extrair_advogados(self, texto: str) -> Optional[str]:
+        advogados = []
+        for pattern in self.patterns['advogados']:
+            for match in re.findall(pattern, texto):
+                nome = match.strip()
+                if 5 <= len(nome) <= 60 and nome not in advogados:
+                    advogados.append(nome)
+        return '; '.join(advogados) if advogados else None
+
+    def _extrair_valores(self, texto: str) -> Dict:
+        valores = {'principal': None, 'juros': None, 'honorarios': None}
+        for campo in valores:
+            for pattern in self.patterns[f'valor_{campo}']:
+                match = re.search(pattern, texto, re.IGNORECASE)
+                if match:
+                    valores[campo] = self._converter_valor(match.group(1))
+                    break
+        return valores
+
+
+def carregar_corpus(caminhos: List[str]) -> List[str]:
+    """Lê os textos do corpus: os caminhos informados ou, por padrão, o que estiver em data/cache."""
+    textos = []
+    if caminhos:
+        arquivos = []
+        for caminho in caminhos:
+            if os.path.isdir(caminho):
+                arquivos.extend(
+                    os.path.join(caminho, nome) for nome in sorted(os.listdir(caminho)) if nome.endswith(CacheManager.EXTENSOES)
+                )
+            else:
+                arquivos.append(caminho)
+        cache = CacheManager(os.path.dirname(arquivos[0]) if arquivos else Config.CACHE_DIR)
+        for arquivo in arquivos:
+            texto = cache.carregar_cache(arquivo)
+            if not texto:
+                with open(arquivo, 'r', encoding='utf-8', errors='ignore') as f:
+                    texto = f.read()
+            textos.append(texto)
+        return [t for t in textos if t.strip()]
+
+    cache = CacheManager(Config.CACHE_DIR)
+    textos.extend(cache.carregar_cache(arquivo) for arquivo in cache.listar_arquivos_cache())
+
+    caminho_db = os.path.join(Config.CACHE_DIR, PDFTextCache.NOME_ARQUIVO)
+    if os.path.exists(caminho_db):
+        cache_textos = PDFTextCache(caminho_db)
+        textos.extend(cache_textos.iterar_textos())
+        cache_textos.fechar()
+
+    return [t for t in textos if t.strip()]
+
+
+def medir(extrator: DataExtractor, textos: List[str], repeticoes: int) -> float:
+    """Melhor tempo total de uma passada pelo corpus, em segundos."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for texto in textos:
+            extrator.extrair_dados(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da extração de dados do DJE")
+    parser.add_argument('caminhos', nargs='*', help="Arquivos .txt/.djec ou pastas com textos do DJE")
+    parser.add_argument('--repeticoes', type=int, default=20, help="Passadas pelo corpus (vale a melhor)")
+    args = parser.parse_args()
+
+    textos = carregar_corpus(args.caminhos)
+    if not textos:
+        print(f"Nenhum texto encontrado (procurado em {Config.CACHE_DIR}).")
+        return 1
+
+    atual = DataExtractor()
+    referencia = ExtratorReferencia()
+
+    divergencias = 0
+    for i, texto in enumerate(textos):
+        esperado = referencia.extrair_dados(texto)
+        obtido = atual.extrair_dados(texto)
+        if obtido != esperado:
+            divergencias += 1
+            print(f"Divergência no texto {i}:\n  referência: {esperado}\n  atual:      {obtido}")
+
+    tempo_referencia = medir(referencia, textos, args.repeticoes)
+    tempo_atual = medir(atual, textos, args.repeticoes)
+    media_caracteres = sum(len(t) for t in textos) / len(textos)
+
+    print(f"Corpus: {len(textos)} textos, {media_caracteres:,.0f} caracteres em média")
+    print(f"Referência (uma varredura por campo): {tempo_referencia / len(textos) * 1000:.3f} ms/documento")
+    print(f"Atual (padrões compilados):           {tempo_atual / len(textos) * 1000:.3f} ms/documento")
+    if tempo_atual > 0:
+        print(f"Ganho: {tempo_referencia / tempo_atual:.2f}x")
+    print(f"Saídas idênticas: {'sim' if not divergencias else f'NÃO ({divergencias} divergências)'}")
+
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
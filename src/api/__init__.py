@@ -1,4 +1,9 @@
 from .api_client import JusAPIClient  # Corrigido de .client para .api_client e APIClient para JusAPIClient
 from .config import APIConfig
+from .rate_limiter import TokenBucket
+from .circuit_breaker import CircuitBreaker, CircuitoAbertoError
+from .outbox import OutboxAPI
+from .fila_envio import FilaEnvio
+from .entregador import EntregadorAPI
 
-__all__ = ['JusAPIClient', 'APIConfig'] # Atualizado para incluir JusAPIClient
\ No newline at end of file
+__all__ = ['JusAPIClient', 'APIConfig', 'TokenBucket', 'CircuitBreaker', 'CircuitoAbertoError', 'OutboxAPI', 'FilaEnvio', 'EntregadorAPI'] # Atualizado para incluir JusAPIClient
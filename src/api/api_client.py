@@ -1,21 +1,136 @@
+import time
+import gzip
+import random
 import requests
 import json
-from typing import List, Dict
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Set, Iterable
+from datetime import datetime, timezone
+
+from requests.adapters import HTTPAdapter
 
 from models.publicacao import Publicacao
+from utils.jsonl import GravadorJSONL
+from .config import APIConfig
+from .rate_limiter import TokenBucket
+from .circuit_breaker import CircuitBreaker, CircuitoAbertoError
+from .outbox import OutboxAPI
 
 class JusAPIClient:
-    def __init__(self, base_url: str = "http://localhost:3000"):
-        self.base_url = base_url
+    # Respostas do endpoint de lote que indicam que o servidor não oferece o modo em lote
+    CODIGOS_LOTE_NAO_SUPORTADO = (404, 405, 415, 501)
+    # Lote recusado como um todo (validação, tamanho): os itens seguem um a um
+    CODIGOS_LOTE_RECUSADO = (400, 413, 422)
+    # Falhas temporárias: a requisição é repetida e, esgotadas as tentativas, o item vai para a outbox
+    CODIGOS_RETENTAVEIS = (408, 429, 500, 502, 503, 504)
+    # Erros de transporte (rede, tempo esgotado, resposta cortada): também são repetidos
+    ERROS_TRANSPORTE = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError)
+    # Números de processo por consulta ao endpoint 'duplicados'
+    TAMANHO_CONSULTA_DUPLICADOS = 500
+    
+    def __init__(self, base_url: Optional[str] = None, max_workers: Optional[int] = None,
+                 rate_limiter: Optional[TokenBucket] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 outbox: Optional[OutboxAPI] = None):
+        self.base_url = (base_url or APIConfig.BASE_URL).rstrip('/')
+        self.timeout = APIConfig.TIMEOUT
+        # Envio concorrente limitado pela rajada permitida e pelo tamanho do lote
+        self.max_workers = max_workers or max(1, min(APIConfig.BATCH_SIZE, APIConfig.BURST_LIMIT))
+        self.rate_limiter = rate_limiter or TokenBucket.from_config()
+        self.usar_lote = APIConfig.BULK_ENABLED
+        self.comprimir_lote = APIConfig.BULK_GZIP
+        self.usar_deduplicacao = APIConfig.DEDUP_ENABLED
+        # Processos que a API já tem (consultados ou enviados por este cliente)
+        self.processos_conhecidos: Set[str] = set()
+        self._lista_processos_carregada = False
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.outbox = outbox
+        if self.outbox is None and APIConfig.OUTBOX_ENABLED:
+            self.outbox = OutboxAPI()
+        
         self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json'
-        })
+        self.session.headers.update(APIConfig.get_headers(include_auth=True))
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def enviar_publicacao(self, publicacao: Publicacao) -> dict:
-        url = f"{self.base_url}/api/publicacoes"
-
+        url = f"{self.base_url}{APIConfig.ENDPOINTS['publicacoes']}"
+        dados = self._montar_payload(publicacao)
+        
+        try:
+            response = self._post(url, json=dados)
+            
+            if response.status_code == 200 or response.status_code == 201:
+                return response.json()
+            else:
+                response.raise_for_status()
+                return {"error": f"HTTP {response.status_code}: {response.text}"}
+                
+        except requests.exceptions.HTTPError as e:
+            return {
+                "error": f"HTTP {e.response.status_code}: {e.response.text}",
+                "retentavel": e.response.status_code in self.CODIGOS_RETENTAVEIS
+            }
+        except (*self.ERROS_TRANSPORTE, CircuitoAbertoError) as e:
+            return {"error": str(e), "retentavel": True}
+        except requests.exceptions.RequestException as e:
+            return {"error": str(e)}
+        except ValueError as e:
+            return {"error": f"Resposta inválida: {e}"}
+    
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        """
+        POST com novas tentativas (até MAX_RETRIES) para erros de transporte e respostas 408/429/5xx,
+        com espera exponencial e jitter, respeitando Retry-After. Passa pelo circuit breaker e pelo
+        token bucket a cada tentativa. Devolve a última resposta; erros de transporte da última
+        tentativa, demais erros do requests (sem nova tentativa) e circuito aberto são lançados.
+        Todo erro do requests conta como falha no circuit breaker.
+        """
+        tentativa = 0
+        while True:
+            self.circuit_breaker.verificar()
+            self.rate_limiter.adquirir()
+            retry_after = None
+            try:
+                response = self.session.post(url, timeout=self.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.circuit_breaker.registrar_falha()
+                if not isinstance(e, self.ERROS_TRANSPORTE) or tentativa >= APIConfig.MAX_RETRIES:
+                    raise
+            else:
+                if response.status_code not in self.CODIGOS_RETENTAVEIS:
+                    self.circuit_breaker.registrar_sucesso()
+                    return response
+                if response.status_code == 429:
+                    self.circuit_breaker.registrar_sucesso() # A API está de pé, só pediu calma
+                else:
+                    self.circuit_breaker.registrar_falha()
+                if tentativa >= APIConfig.MAX_RETRIES:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+            
+            time.sleep(self._calcular_espera(tentativa, retry_after))
+            tentativa += 1
+    
+    def _calcular_espera(self, tentativa: int, retry_after: Optional[str] = None) -> float:
+        """Espera antes da próxima tentativa: Retry-After, se houver, senão backoff exponencial com jitter."""
+        if retry_after:
+            try:
+                espera = float(retry_after)
+            except ValueError:
+                try:
+                    espera = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    espera = None
+            if espera is not None:
+                return min(max(espera, 0.0), APIConfig.RETRY_MAX_DELAY)
+        
+        base = min(APIConfig.RETRY_DELAY * APIConfig.RETRY_BACKOFF_FACTOR ** tentativa, APIConfig.RETRY_MAX_DELAY)
+        return base / 2 + random.uniform(0, base / 2)
+    
+    def _montar_payload(self, publicacao: Publicacao) -> dict:
         data_disponibilizacao = None
         if publicacao.data_disponibilizacao:
             if isinstance(publicacao.data_disponibilizacao, datetime):
@@ -38,20 +153,7 @@ class JusAPIClient:
             "honorarios_advocaticios": publicacao.honorarios
         }
 
-        dados = {k: v for k, v in dados.items() if v is not None}
-        
-        try:
-            response = self.session.post(url, json=dados, timeout=10)
-            
-            if response.status_code == 200 or response.status_code == 201:
-                return response.json()
-            else:
-                response.raise_for_status()
-                
-        except requests.exceptions.HTTPError as e:
-            return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e)}
+        return {k: v for k, v in dados.items() if v is not None}
     
     def _converter_data_portuguesa(self, data_str: str) -> str:
         meses = {
@@ -70,26 +172,255 @@ class JusAPIClient:
         return data_str
     
     def enviar_lote_publicacoes(self, publicacoes: List[Publicacao]) -> dict:
-        sucessos = 0
-        erros = 0
+        """
+        Envia as publicações em lotes de BATCH_SIZE. Com o modo em lote ativo, cada lote vai em
+        uma única requisição ao endpoint 'lote' (gzip opcional); se o servidor não aceitar esse
+        modo, os itens são enviados um a um, em paralelo (até max_workers). O token bucket limita
+        o ritmo nos dois casos. Falhas temporárias são repetidas com backoff e, se persistirem,
+        o item vai para a outbox (ver reenviar_pendentes). Antes do envio, a API é consultada
+        sobre os processos que já tem, e esses não são reenviados ('ja_existentes').
+        Retorna os totais e, em 'resultados', o desfecho de cada publicação na ordem de entrada.
+        """
+        resultados = [None] * len(publicacoes)
+        existentes = self.consultar_existentes(
+            publicacao.numero_processo for publicacao in publicacoes if publicacao.numero_processo
+        )
+        novos = []
+        for indice, publicacao in enumerate(publicacoes):
+            if publicacao.numero_processo in existentes:
+                resultados[indice] = {"indice": indice, "numero_processo": publicacao.numero_processo,
+                                      "sucesso": True, "ja_existente": True}
+            else:
+                novos.append(indice)
         
-        for pub in publicacoes:
-            resultado = self.enviar_publicacao(pub)
-            
-            if "error" not in resultado:
+        tamanho_lote = max(1, APIConfig.BATCH_SIZE)
+        lotes = [novos[inicio:inicio + tamanho_lote] for inicio in range(0, len(novos), tamanho_lote)]
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            if self.usar_lote and lotes:
+                lotes = self._enviar_em_lote(executor, publicacoes, lotes, resultados)
+            self._enviar_individualmente(executor, publicacoes, lotes, resultados)
+        
+        self._atualizar_outbox(publicacoes, resultados)
+        sucessos = 0
+        for publicacao, resultado in zip(publicacoes, resultados):
+            if resultado["sucesso"] and not resultado.get("ja_existente"):
                 sucessos += 1
-            else:
-                erros += 1
+                if publicacao.numero_processo:
+                    self.processos_conhecidos.add(publicacao.numero_processo)
         
         return {
             "total": len(publicacoes),
             "sucessos": sucessos,
-            "erros": erros
+            "erros": len(novos) - sucessos,
+            "ja_existentes": len(publicacoes) - len(novos),
+            "pendentes_outbox": self.outbox.quantidade() if self.outbox else 0,
+            "resultados": resultados
         }
     
+    def consultar_existentes(self, numeros_processo: Iterable[str]) -> Set[str]:
+        """
+        Retorna quais dos números de processo a API já tem. Consulta o endpoint 'duplicados' em
+        blocos, só para os números ainda não vistos; se ele não existir, carrega uma vez a lista
+        completa do endpoint 'processos'. Se nenhum dos dois estiver disponível, a deduplicação
+        fica desativada e tudo é enviado. Uma falha na consulta nunca impede o envio.
+        """
+        numeros = set(numeros_processo)
+        desconhecidos = [numero for numero in numeros if numero not in self.processos_conhecidos]
+        
+        for inicio in range(0, len(desconhecidos), self.TAMANHO_CONSULTA_DUPLICADOS):
+            if not self.usar_deduplicacao or self._lista_processos_carregada:
+                break
+            if not self._consultar_duplicados(desconhecidos[inicio:inicio + self.TAMANHO_CONSULTA_DUPLICADOS]):
+                break
+        
+        return numeros & self.processos_conhecidos
+    
+    def _consultar_duplicados(self, numeros: List[str]) -> bool:
+        """Pergunta à API quais dos números já existem; retorna False se a consulta não foi possível."""
+        url = f"{self.base_url}{APIConfig.ENDPOINTS['duplicados']}"
+        try:
+            response = self._post(url, json={"numeros_processo": numeros})
+        except (requests.exceptions.RequestException, CircuitoAbertoError):
+            return False
+        
+        if response.status_code in self.CODIGOS_LOTE_NAO_SUPORTADO:
+            return self._carregar_lista_processos()
+        if not 200 <= response.status_code < 300:
+            return False
+        try:
+            self.processos_conhecidos.update(self._numeros_resposta(response.json(), 'duplicados'))
+        except ValueError:
+            return False
+        return True
+    
+    def _carregar_lista_processos(self) -> bool:
+        """Carrega todos os números de processo da API (alternativa ao endpoint 'duplicados')."""
+        url = f"{self.base_url}{APIConfig.ENDPOINTS['processos']}"
+        try:
+            self.circuit_breaker.verificar()
+        except CircuitoAbertoError:
+            return False
+        try:
+            self.rate_limiter.adquirir()
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            self.circuit_breaker.registrar_falha()
+            return False
+        if response.status_code in self.CODIGOS_RETENTAVEIS and response.status_code != 429:
+            self.circuit_breaker.registrar_falha()
+        else:
+            self.circuit_breaker.registrar_sucesso()
+        
+        if response.status_code in self.CODIGOS_LOTE_NAO_SUPORTADO:
+            self.usar_deduplicacao = False
+            return False
+        if not 200 <= response.status_code < 300:
+            return False
+        try:
+            self.processos_conhecidos.update(self._numeros_resposta(response.json(), 'processos'))
+        except ValueError:
+            return False
+        self._lista_processos_carregada = True
+        return True
+    
+    def _numeros_resposta(self, conteudo, chave: str) -> Set[str]:
+        """
+        Extrai os números de processo da resposta: uma lista (de números ou de objetos com
+        'numero_processo'), ou um objeto com essa lista em `chave` ou em 'data'.
+        """
+        if isinstance(conteudo, dict):
+            conteudo = conteudo.get(chave, conteudo.get('data', []))
+        if not isinstance(conteudo, list):
+            return set()
+        numeros = set()
+        for item in conteudo:
+            numero = item.get('numero_processo') if isinstance(item, dict) else item
+            if isinstance(numero, str) and numero:
+                numeros.add(numero)
+        return numeros
+    
+    def _enviar_individualmente(self, executor: ThreadPoolExecutor, publicacoes: List[Publicacao],
+                                lotes: List[List[int]], resultados: List[dict]):
+        for n, indices in enumerate(lotes):
+            if n > 0 and APIConfig.BATCH_DELAY > 0:
+                time.sleep(APIConfig.BATCH_DELAY)
+            
+            respostas = executor.map(lambda indice: self.enviar_publicacao(publicacoes[indice]), indices)
+            for indice, resposta in zip(indices, respostas):
+                resultados[indice] = self._resultado_item(indice, publicacoes[indice], resposta)
+    
+    def _enviar_em_lote(self, executor: ThreadPoolExecutor, publicacoes: List[Publicacao],
+                        lotes: List[List[int]], resultados: List[dict]) -> List[List[int]]:
+        """Envia cada lote em uma requisição; retorna os lotes que ainda precisam ir item a item."""
+        enviar = lambda indices: self.enviar_lote_http([publicacoes[indice] for indice in indices])
+        
+        # O primeiro lote vai sozinho: se o servidor recusar o modo em lote, os demais nem são tentados
+        respostas_lotes = [enviar(lotes[0])]
+        if not self.usar_lote:
+            return lotes
+        respostas_lotes.extend(executor.map(enviar, lotes[1:]))
+        
+        pendentes = []
+        for indices, respostas in zip(lotes, respostas_lotes):
+            if respostas is None:
+                pendentes.append(indices)
+                continue
+            for indice, resposta in zip(indices, respostas):
+                resultados[indice] = self._resultado_item(indice, publicacoes[indice], resposta)
+        return pendentes
+    
+    def enviar_lote_http(self, publicacoes: List[Publicacao]) -> Optional[List[dict]]:
+        """
+        Envia várias publicações em uma requisição, no formato {"publicacoes": [...]}.
+        Retorna uma resposta por publicação, ou None se elas precisarem ser enviadas uma a uma
+        (modo em lote não suportado, que fica desativado neste cliente, ou lote recusado).
+        """
+        url = f"{self.base_url}{APIConfig.ENDPOINTS['lote']}"
+        corpo = json.dumps(
+            {"publicacoes": [self._montar_payload(publicacao) for publicacao in publicacoes]}, ensure_ascii=False
+        ).encode('utf-8')
+        headers = {}
+        comprimido = self.comprimir_lote
+        if comprimido:
+            corpo = gzip.compress(corpo)
+            headers['Content-Encoding'] = 'gzip'
+        
+        try:
+            response = self._post(url, data=corpo, headers=headers)
+        except (*self.ERROS_TRANSPORTE, CircuitoAbertoError) as e:
+            return [{"error": str(e), "retentavel": True}] * len(publicacoes)
+        except requests.exceptions.RequestException as e:
+            return [{"error": str(e)}] * len(publicacoes)
+        
+        if response.status_code in self.CODIGOS_LOTE_NAO_SUPORTADO:
+            if response.status_code == 415 and comprimido:
+                # O servidor pode aceitar o lote, mas não o corpo comprimido
+                self.comprimir_lote = False
+                return self.enviar_lote_http(publicacoes)
+            self.usar_lote = False
+            return None
+        if response.status_code in self.CODIGOS_LOTE_RECUSADO:
+            return None
+        if not 200 <= response.status_code < 300:
+            return [{
+                "error": f"HTTP {response.status_code}: {response.text}",
+                "retentavel": response.status_code in self.CODIGOS_RETENTAVEIS
+            }] * len(publicacoes)
+        
+        try:
+            conteudo = response.json()
+        except ValueError:
+            conteudo = {}
+        return self._respostas_lote(conteudo, len(publicacoes))
+    
+    def _respostas_lote(self, conteudo, quantidade: int) -> List[dict]:
+        """
+        Distribui a resposta do lote entre os itens: aceita {"resultados": [...]} ou uma lista,
+        com um objeto por publicação (com "error" se ela falhou). Sem detalhe por item, a
+        resposta geral vale para todos.
+        """
+        itens = conteudo.get('resultados') if isinstance(conteudo, dict) else conteudo
+        if isinstance(itens, list) and len(itens) == quantidade:
+            return [item if isinstance(item, dict) else {"resultado": item} for item in itens]
+        return [conteudo if isinstance(conteudo, dict) else {"resultado": conteudo}] * quantidade
+    
+    def _resultado_item(self, indice: int, publicacao: Publicacao, resposta: dict) -> dict:
+        resultado = {
+            "indice": indice,
+            "numero_processo": publicacao.numero_processo,
+            "sucesso": "error" not in resposta
+        }
+        if resultado["sucesso"]:
+            resultado["resposta"] = resposta
+        else:
+            resultado["erro"] = resposta["error"]
+            resultado["retentavel"] = bool(resposta.get("retentavel"))
+        return resultado
+    
+    def reenviar_pendentes(self, limite: Optional[int] = None) -> dict:
+        """
+        Reenvia as publicações guardadas na outbox por falhas temporárias anteriores. As que
+        forem aceitas saem da outbox; as que falharem de novo continuam lá.
+        """
+        if not self.outbox:
+            return {"total": 0, "sucessos": 0, "erros": 0, "ja_existentes": 0, "resultados": []}
+        publicacoes = [publicacao for publicacao, _ in self.outbox.listar(limite)]
+        return self.enviar_lote_publicacoes(publicacoes)
+    
+    def _atualizar_outbox(self, publicacoes: List[Publicacao], resultados: List[dict]):
+        """Guarda na outbox só os itens com falha temporária e retira os que foram aceitos."""
+        if not self.outbox:
+            return
+        for publicacao, resultado in zip(publicacoes, resultados):
+            if resultado["sucesso"]:
+                self.outbox.remover(publicacao) # Inclui os que a API já tinha
+            elif resultado.get("retentavel"):
+                self.outbox.adicionar(publicacao, resultado["erro"])
+    
     def testar_conexao(self) -> bool:
         try:
-            url = f"{self.base_url}/health"
+            url = f"{self.base_url}{APIConfig.ENDPOINTS['health']}"
             response = self.session.get(url, timeout=5)
             response.raise_for_status()
             return True
@@ -99,17 +430,11 @@ class JusAPIClient:
     def criar_backup_local(self, publicacoes: List[Publicacao], nome_arquivo: str = None) -> str:
         if not nome_arquivo:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            nome_arquivo = f"data/backups/backup_pre_api_{timestamp}.json"
+            nome_arquivo = f"data/backups/backup_pre_api_{timestamp}.jsonl"
         
         try:
-            import os
-            os.makedirs(os.path.dirname(nome_arquivo), exist_ok=True)
-            
-            dados = [pub.to_dict() for pub in publicacoes]
-            
-            with open(nome_arquivo, 'w', encoding='utf-8') as f:
-                json.dump(dados, f, ensure_ascii=False, indent=2)
-            
-            return nome_arquivo
+            with GravadorJSONL(nome_arquivo) as gravador:
+                gravador.adicionar(publicacoes)
+            return gravador.caminho
         except Exception:
             return ""
\ No newline at end of file
@@ -0,0 +1,68 @@
+import time
+import threading
+from typing import Optional
+
+from .config import APIConfig
+
+
+class CircuitoAbertoError(Exception):
+    """Requisição não enviada porque o circuito da API está aberto."""
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para chamadas à API. Depois de `limite_falhas` falhas seguidas o circuito abre e
+    as chamadas são recusadas na hora; passado `tempo_recuperacao`, uma única chamada de teste é
+    liberada (meio-aberto): se der certo o circuito fecha, se falhar volta a abrir. Uma chamada
+    de teste sem desfecho registrado depois de `tempo_recuperacao` é dada como perdida e outra é liberada.
+    """
+
+    FECHADO = 'fechado'
+    ABERTO = 'aberto'
+    MEIO_ABERTO = 'meio_aberto'
+
+    def __init__(self, limite_falhas: Optional[int] = None, tempo_recuperacao: Optional[float] = None):
+        self.limite_falhas = limite_falhas or APIConfig.CIRCUIT_FAILURE_THRESHOLD
+        self.tempo_recuperacao = APIConfig.CIRCUIT_RESET_TIMEOUT if tempo_recuperacao is None else tempo_recuperacao
+        self.estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._teste_iniciado_em = 0.0
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        """Indica se uma requisição pode ser feita agora."""
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            if self.estado == self.ABERTO:
+                if time.monotonic() - self._aberto_em < self.tempo_recuperacao:
+                    return False
+                self.estado = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+            agora = time.monotonic()
+            if self._teste_em_andamento and agora - self._teste_iniciado_em < self.tempo_recuperacao:
+                return False
+            self._teste_em_andamento = True
+            self._teste_iniciado_em = agora
+            return True
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self.estado = self.FECHADO
+            self._falhas = 0
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self.estado == self.MEIO_ABERTO or self._falhas >= self.limite_falhas:
+                self.estado = self.ABERTO
+                self._aberto_em = time.monotonic()
+                self._teste_em_andamento = False
+
+    def verificar(self):
+        """Lança CircuitoAbertoError se a requisição não puder ser feita."""
+        if not self.permitir():
+            raise CircuitoAbertoError(f"Circuito da API aberto após {self._falhas} falhas seguidas")
@@ -8,6 +8,7 @@ class APIConfig:
     ENDPOINTS = {
         'health': '/health',
         'publicacoes': '/api/publicacoes',
+        'lote': '/api/publicacoes/lote',
         'processos': '/api/publicacoes/processos',
         'duplicados': '/api/publicacoes/duplicados',
         'stats': '/api/publicacoes/stats',
@@ -24,12 +25,22 @@ class APIConfig:
     MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '3'))
     RETRY_DELAY = float(os.getenv('API_RETRY_DELAY', '1.0'))
     RETRY_BACKOFF_FACTOR = float(os.getenv('API_RETRY_BACKOFF_FACTOR', '2.0'))
+    RETRY_MAX_DELAY = float(os.getenv('API_RETRY_MAX_DELAY', '60'))
+    
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('API_CIRCUIT_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('API_CIRCUIT_RESET_TIMEOUT', '30'))
+    OUTBOX_ENABLED = os.getenv('API_OUTBOX_ENABLED', 'true').lower() == 'true'
     
     REQUESTS_PER_MINUTE = int(os.getenv('API_REQUESTS_PER_MINUTE', '60'))
     BURST_LIMIT = int(os.getenv('API_BURST_LIMIT', '10'))
     
     BATCH_SIZE = int(os.getenv('API_BATCH_SIZE', '20'))
     BATCH_DELAY = float(os.getenv('API_BATCH_DELAY', '0.1'))
+    # Envio de vários registros por requisição (com queda automática para POSTs individuais)
+    BULK_ENABLED = os.getenv('API_BULK_ENABLED', 'true').lower() == 'true'
+    BULK_GZIP = os.getenv('API_BULK_GZIP', 'true').lower() == 'true'
+    # Consulta prévia dos processos que a API já tem, para não reenviá-los
+    DEDUP_ENABLED = os.getenv('API_DEDUP_ENABLED', 'true').lower() == 'true'
     
     API_KEY = os.getenv('API_KEY', None)
     API_SECRET = os.getenv('API_SECRET', None)
@@ -102,9 +113,15 @@ class APIConfig:
             'timeout': cls.TIMEOUT,
             'max_retries': cls.MAX_RETRIES,
             'retry_delay': cls.RETRY_DELAY,
+            'retry_backoff_factor': cls.RETRY_BACKOFF_FACTOR,
+            'circuit_failure_threshold': cls.CIRCUIT_FAILURE_THRESHOLD,
+            'outbox_enabled': cls.OUTBOX_ENABLED,
+            'dedup_enabled': cls.DEDUP_ENABLED,
             'requests_per_minute': cls.REQUESTS_PER_MINUTE,
             'batch_size': cls.BATCH_SIZE,
             'batch_delay': cls.BATCH_DELAY,
+            'bulk_enabled': cls.BULK_ENABLED,
+            'bulk_gzip': cls.BULK_GZIP,
             'has_api_key': bool(cls.API_KEY),
             'has_api_secret': bool(cls.API_SECRET)
         }
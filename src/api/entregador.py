@@ -0,0 +1,94 @@
+import os
+import threading
+from typing import Optional
+
+from utils.config import Config
+from utils.jsonl import GravadorJSONL
+from .api_client import JusAPIClient
+from .config import APIConfig
+from .fila_envio import FilaEnvio
+
+
+class EntregadorAPI:
+    """
+    Esvazia a FilaEnvio em segundo plano, enviando as publicações em lotes pelo JusAPIClient,
+    enquanto a extração continua enfileirando. Cada lote só é confirmado na fila depois de
+    processado pelo cliente: enviados com sucesso saem da fila, falhas temporárias ficam na
+    outbox do cliente (ou, sem outbox, voltam para a fila mais tarde) e as recusadas pela API
+    (erros definitivos) saem da fila depois de gravadas em `caminho_rejeitadas` (JSONL).
+    """
+
+    INTERVALO_ESPERA = 1.0
+    NOME_REJEITADAS = 'rejeitadas_api.jsonl'
+
+    def __init__(self, cliente: JusAPIClient, fila: FilaEnvio, tamanho_lote: Optional[int] = None,
+                 caminho_rejeitadas: Optional[str] = None):
+        self.cliente = cliente
+        self.fila = fila
+        self.tamanho_lote = tamanho_lote or max(1, APIConfig.BATCH_SIZE)
+        self.caminho_rejeitadas = caminho_rejeitadas or os.path.join(Config.DATA_DIR, self.NOME_REJEITADAS)
+        self.totais = {"total": 0, "sucessos": 0, "erros": 0, "ja_existentes": 0}
+        self._encerrar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        """Recupera reservas de uma execução interrompida e começa a entregar em segundo plano."""
+        self.fila.recuperar_reservas()
+        self._encerrar.clear()
+        self._thread = threading.Thread(target=self._executar, name="entregador-api", daemon=True)
+        self._thread.start()
+
+    def encerrar(self, timeout: Optional[float] = None) -> dict:
+        """Aguarda a entrega do que ainda está disponível na fila e retorna os totais."""
+        self._encerrar.set()
+        if self._thread:
+            self._thread.join(timeout)
+        return self.totais
+
+    def entregar_disponiveis(self) -> int:
+        """Envia os itens disponíveis até a fila ficar vazia; retorna quantos foram processados."""
+        processados = 0
+        while True:
+            itens = self.fila.reservar(self.tamanho_lote)
+            if not itens:
+                return processados
+            self._entregar(itens)
+            processados += len(itens)
+
+    def _executar(self):
+        while True:
+            encerrando = self._encerrar.is_set()
+            if self.entregar_disponiveis() == 0:
+                if encerrando:
+                    return
+                self._encerrar.wait(self.INTERVALO_ESPERA)
+
+    def _entregar(self, itens):
+        ids = [id_item for id_item, _ in itens]
+        try:
+            resultado = self.cliente.enviar_lote_publicacoes([publicacao for _, publicacao in itens])
+        except Exception:
+            # Falha inesperada do cliente: os itens continuam na fila para a próxima tentativa
+            self.fila.devolver(ids, atraso=APIConfig.CIRCUIT_RESET_TIMEOUT)
+            return
+
+        devolvidos = set()
+        if not self.cliente.outbox:
+            devolvidos = {ids[item["indice"]] for item in resultado["resultados"]
+                          if not item["sucesso"] and item.get("retentavel")}
+        rejeitadas = [itens[item["indice"]][1] for item in resultado["resultados"]
+                      if not item["sucesso"] and not item.get("retentavel")]
+        if rejeitadas:
+            try:
+                with GravadorJSONL(self.caminho_rejeitadas, comprimir=False) as gravador:
+                    gravador.adicionar(rejeitadas)
+            except OSError:
+                # Sem onde guardar as recusadas, elas ficam na fila para não se perderem
+                devolvidos.update(ids[item["indice"]] for item in resultado["resultados"]
+                                  if not item["sucesso"] and not item.get("retentavel"))
+        self.fila.confirmar(id_item for id_item in ids if id_item not in devolvidos)
+        if devolvidos:
+            self.fila.devolver(devolvidos, atraso=APIConfig.CIRCUIT_RESET_TIMEOUT)
+
+        for campo in self.totais:
+            self.totais[campo] += resultado[campo]
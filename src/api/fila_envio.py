@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from models.publicacao import Publicacao
+from utils.config import Config
+from .outbox import chave_publicacao
+
+
+class FilaEnvio:
+    """
+    Fila persistente (SQLite em modo WAL) entre a extração e o envio à API.
+    A extração enfileira as publicações à medida que saem dos PDFs; o entregador reserva
+    itens por um prazo, envia e confirma. Itens reservados e não confirmados (ex.: o processo
+    caiu no meio do envio) voltam para a fila quando o prazo vence ou em recuperar_reservas().
+    """
+
+    NOME_ARQUIVO = 'fila_envio.db'
+    PRAZO_RESERVA = 300
+
+    def __init__(self, caminho_db: Optional[str] = None):
+        self.caminho_db = caminho_db or os.path.join(Config.DATA_DIR, self.NOME_ARQUIVO)
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS fila (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chave TEXT NOT NULL UNIQUE,
+                    publicacao TEXT NOT NULL,
+                    reservado_ate REAL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    criado_em TEXT NOT NULL
+                )
+            """)
+
+    def enfileirar(self, publicacoes: Iterable[Publicacao]) -> int:
+        """
+        Acrescenta as publicações ao fim da fila e retorna quantas entraram. Uma publicação
+        cujo processo já está na fila, aguardando envio, é ignorada.
+        """
+        agora = datetime.now().isoformat()
+        linhas = [(chave_publicacao(publicacao), json.dumps(publicacao.to_dict(), ensure_ascii=False), agora)
+                  for publicacao in publicacoes]
+        if not linhas:
+            return 0
+        with self._lock, self._conexao:
+            antes = self._conexao.total_changes
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO fila (chave, publicacao, criado_em) VALUES (?, ?, ?)", linhas
+            )
+            return self._conexao.total_changes - antes
+
+    def reservar(self, limite: int, prazo: Optional[float] = None) -> List[Tuple[int, Publicacao]]:
+        """
+        Reserva até `limite` itens disponíveis, na ordem de chegada, por `prazo` segundos.
+        Retorna pares (id, publicação); o id é usado em confirmar() e devolver().
+        """
+        agora = time.time()
+        with self._lock, self._conexao:
+            linhas = self._conexao.execute(
+                "SELECT id, publicacao FROM fila WHERE reservado_ate IS NULL OR reservado_ate <= ? ORDER BY id LIMIT ?",
+                (agora, limite)
+            ).fetchall()
+            self._conexao.executemany(
+                "UPDATE fila SET reservado_ate = ?, tentativas = tentativas + 1 WHERE id = ?",
+                [(agora + (prazo or self.PRAZO_RESERVA), id_item) for id_item, _ in linhas]
+            )
+        return [(id_item, Publicacao.from_dict(json.loads(dados))) for id_item, dados in linhas]
+
+    def confirmar(self, ids: Iterable[int]):
+        """Retira da fila os itens já tratados pelo entregador."""
+        with self._lock, self._conexao:
+            self._conexao.executemany("DELETE FROM fila WHERE id = ?", [(id_item,) for id_item in ids])
+
+    def devolver(self, ids: Iterable[int], atraso: float = 0):
+        """Libera os itens reservados; com `atraso`, eles só voltam a ser entregues depois desse tempo."""
+        reservado_ate = time.time() + atraso if atraso > 0 else None
+        with self._lock, self._conexao:
+            self._conexao.executemany(
+                "UPDATE fila SET reservado_ate = ? WHERE id = ?", [(reservado_ate, id_item) for id_item in ids]
+            )
+
+    def recuperar_reservas(self) -> int:
+        """Libera todas as reservas pendentes (deixadas por uma execução interrompida)."""
+        with self._lock, self._conexao:
+            return self._conexao.execute(
+                "UPDATE fila SET reservado_ate = NULL WHERE reservado_ate IS NOT NULL"
+            ).rowcount
+
+    def quantidade(self) -> int:
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM fila").fetchone()[0]
+
+    def fechar(self):
+        try:
+            self._conexao.close()
+        except Exception:
+            pass
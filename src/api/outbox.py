@@ -0,0 +1,83 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from models.publicacao import Publicacao
+from utils.config import Config
+
+
+def chave_publicacao(publicacao: Publicacao) -> str:
+    """Identifica a publicação pelo número do processo (ou pelo hash do conteúdo, se não houver)."""
+    if publicacao.numero_processo:
+        return publicacao.numero_processo
+    conteudo = (publicacao.conteudo_completo or '').encode('utf-8')
+    return f"sem_processo:{hashlib.sha1(conteudo).hexdigest()}"
+
+
+class OutboxAPI:
+    """
+    Caixa de saída persistente (SQLite) das publicações que não chegaram à API por falha
+    temporária (rede, 429/5xx, circuito aberto). Só esses itens são reenviados depois,
+    sem repetir o lote inteiro. Cada processo fica com uma única entrada.
+    """
+
+    NOME_ARQUIVO = 'outbox_api.db'
+
+    def __init__(self, caminho_db: Optional[str] = None):
+        self.caminho_db = caminho_db or os.path.join(Config.DATA_DIR, self.NOME_ARQUIVO)
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS pendentes (
+                    chave TEXT PRIMARY KEY,
+                    publicacao TEXT NOT NULL,
+                    erro TEXT,
+                    tentativas INTEGER NOT NULL DEFAULT 1,
+                    criado_em TEXT NOT NULL,
+                    atualizado_em TEXT NOT NULL
+                )
+            """)
+
+    def adicionar(self, publicacao: Publicacao, erro: str):
+        """Guarda (ou atualiza) a publicação pendente, contando mais uma tentativa."""
+        agora = datetime.now().isoformat()
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                INSERT INTO pendentes (chave, publicacao, erro, tentativas, criado_em, atualizado_em)
+                VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    publicacao = excluded.publicacao, erro = excluded.erro,
+                    tentativas = tentativas + 1, atualizado_em = excluded.atualizado_em
+            """, (chave_publicacao(publicacao), json.dumps(publicacao.to_dict(), ensure_ascii=False), erro, agora, agora))
+
+    def remover(self, publicacao: Publicacao):
+        """Retira a publicação da caixa de saída (ex.: depois de enviada com sucesso)."""
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM pendentes WHERE chave = ?", (chave_publicacao(publicacao),))
+
+    def listar(self, limite: Optional[int] = None) -> List[Tuple[Publicacao, int]]:
+        """Publicações pendentes, das mais antigas para as mais novas, com o número de tentativas."""
+        consulta = "SELECT publicacao, tentativas FROM pendentes ORDER BY criado_em"
+        parametros = ()
+        if limite:
+            consulta += " LIMIT ?"
+            parametros = (limite,)
+        with self._lock:
+            linhas = self._conexao.execute(consulta, parametros).fetchall()
+        return [(Publicacao.from_dict(json.loads(dados)), tentativas) for dados, tentativas in linhas]
+
+    def quantidade(self) -> int:
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM pendentes").fetchone()[0]
+
+    def fechar(self):
+        try:
+            self._conexao.close()
+        except Exception:
+            pass
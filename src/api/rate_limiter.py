@@ -0,0 +1,53 @@
+import time
+import threading
+from typing import Optional
+
+from .config import APIConfig
+
+
+class TokenBucket:
+    """
+    Limitador de taxa (token bucket) compartilhado entre threads.
+    A taxa sustentada é de `taxa_por_segundo` requisições, com rajadas de até `capacidade`.
+    """
+
+    def __init__(self, taxa_por_segundo: float, capacidade: int):
+        self.taxa_por_segundo = taxa_por_segundo
+        self.capacidade = max(1, capacidade)
+        self._tokens = float(self.capacidade)
+        self._ultima_recarga = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> 'TokenBucket':
+        """Cria o limitador com REQUESTS_PER_MINUTE e BURST_LIMIT do APIConfig."""
+        return cls(APIConfig.REQUESTS_PER_MINUTE / 60.0, APIConfig.BURST_LIMIT)
+
+    def adquirir(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Bloqueia até haver `tokens` disponíveis e os consome. Retorna False se o `timeout`
+        expirar antes disso. Taxa <= 0 desativa o limite.
+        """
+        if self.taxa_por_segundo <= 0:
+            return True
+
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._recarregar()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                espera = (tokens - self._tokens) / self.taxa_por_segundo
+
+            if limite is not None:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return False
+                espera = min(espera, restante)
+            time.sleep(espera)
+
+    def _recarregar(self):
+        agora = time.monotonic()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._ultima_recarga) * self.taxa_por_segundo)
+        self._ultima_recarga = agora
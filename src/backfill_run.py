@@ -0,0 +1,97 @@
+import os
+import sys
+import argparse
+
+# Adicionar src ao sys.path se não estiver (para ambiente Docker)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scraper.backfill import gerar_jobs, executar_backfill, LedgerJobs
+from scraper.limite_espaco import LimiteEspaco
+from scraper.pdf_index import PDFIndex
+from api.api_client import JusAPIClient
+from api.fila_envio import FilaEnvio
+from api.entregador import EntregadorAPI
+from utils.config import Config
+from utils.logger import setup_logger
+from utils.jsonl import GravadorJSONL
+
+
+logger = setup_logger(log_file="backfill.log")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="DJE Scraper - Backfill de um período")
+    parser.add_argument("inicio", help="Data inicial (DD/MM/AAAA)")
+    parser.add_argument("fim", help="Data final (DD/MM/AAAA)")
+    parser.add_argument("--granularidade", choices=["dia", "semana"], default="dia",
+                        help="Um job por dia ou por semana (padrão: dia)")
+    parser.add_argument("--paralelo", type=int, default=Config.MAX_BROWSER_SESSIONS,
+                        help="Jobs executados ao mesmo tempo (padrão: MAX_BROWSER_SESSIONS)")
+    parser.add_argument("--incluir-fins-de-semana", action="store_true",
+                        help="Inclui sábados e domingos nos jobs diários")
+    parser.add_argument("--sem-envio", action="store_true", help="Só extrai, sem enviar à API")
+    parser.add_argument("--pasta-download", default="./downloads_dje/backfill")
+    return parser.parse_args()
+
+def salvar_resultado_job(data_inicio: str, data_fim: str, publicacoes):
+    nome = data_inicio.replace('/', '-') + ('' if data_fim == data_inicio else f"_{data_fim.replace('/', '-')}")
+    os.makedirs(Config.RESULTS_DIR, exist_ok=True)
+    arquivo = os.path.join(Config.RESULTS_DIR, f"backfill_{nome}.jsonl")
+    if os.path.exists(arquivo):
+        os.remove(arquivo) # Job refeito: o arquivo é regravado com o resultado completo
+    with GravadorJSONL(arquivo) as gravador:
+        gravador.adicionar(publicacoes)
+    logger.info(f"Job {data_inicio} - {data_fim}: {len(publicacoes)} publicações salvas em {gravador.caminho}")
+
+def run_backfill():
+    args = parse_args()
+    jobs = gerar_jobs(args.inicio, args.fim, args.granularidade, args.incluir_fins_de_semana)
+    logger.info(f"Backfill de {args.inicio} a {args.fim}: {len(jobs)} jobs ({args.granularidade}), "
+                f"até {args.paralelo} em paralelo.")
+
+    ledger = LedgerJobs()
+    # Um único índice de PDFs para todos os jobs e para o descarte do limite de espaço
+    indice = PDFIndex(args.pasta_download)
+    limite_espaco = LimiteEspaco.padrao(args.pasta_download, indice=indice)
+    limite_espaco.iniciar()
+    fila = None
+    entregador = None
+    if not args.sem_envio:
+        fila = FilaEnvio()
+        api_client = JusAPIClient()
+        if api_client.testar_conexao():
+            if api_client.outbox and api_client.outbox.quantidade():
+                logger.info(f"Replaying {api_client.outbox.quantidade()} publications pending in the outbox...")
+                replay = api_client.reenviar_pendentes()
+                logger.info(f"Outbox replay results: Successes={replay['sucessos']}, Errors={replay['erros']}")
+            entregador = EntregadorAPI(api_client, fila)
+            entregador.iniciar()
+        else:
+            logger.error("API connection failed. Publications will stay in the delivery queue for the next run.")
+
+    try:
+        totais = executar_backfill(jobs, args.pasta_download, args.paralelo, ledger,
+                                   ao_extrair=fila.enfileirar if fila else None,
+                                   ao_concluir_job=salvar_resultado_job, limite_espaco=limite_espaco,
+                                   indice=indice)
+        logger.info(f"Backfill finalizado: {totais['concluidos']} concluídos, {totais['incompletos']} incompletos, "
+                    f"{totais['pulados']} já concluídos antes.")
+    finally:
+        if entregador:
+            result = entregador.encerrar()
+            logger.info(f"API submission results: Successes={result['sucessos']}, Errors={result['erros']}, "
+                        f"Already in API={result['ja_existentes']}")
+        if fila:
+            logger.info(f"Publications waiting in the delivery queue: {fila.quantidade()}")
+            fila.fechar()
+        logger.info(f"Ledger: {ledger.resumo()}")
+        ledger.fechar()
+        limite_espaco.encerrar()
+        indice.fechar()
+
+if __name__ == "__main__":
+    run_backfill()
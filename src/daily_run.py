@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 from datetime import datetime
 
 # Adicionar src ao sys.path se não estiver (para ambiente Docker)
@@ -14,9 +13,16 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from scraper.dje_scraper import DJEScraperDownload
+from scraper.limite_espaco import LimiteEspaco
+from scraper.pdf_index import PDFIndex
 from api.api_client import JusAPIClient
+from api.fila_envio import FilaEnvio
+from api.entregador import EntregadorAPI
+from api.outbox import chave_publicacao
 from utils.logger import setup_logger
+from utils.jsonl import GravadorJSONL
 from models.publicacao import Publicacao
+from models.publicacao_batch import PublicacaoBatch
 
 
 logger = setup_logger(log_file="daily_run.log")
@@ -33,43 +39,74 @@ def run_daily_scrape_and_send():
     # O VOLUME /app no Dockerfile mapeará a pasta do projeto.
     pasta_download = "/app/downloads_dje" 
     
-    try:
-        scraper = DJEScraperDownload(pasta_download=pasta_download)
+    # Mantém downloads e cache dentro do orçamento de espaço enquanto a execução roda;
+    # o índice de PDFs é o mesmo do scraper, para os PDFs descartados saírem dele
+    indice = PDFIndex(pasta_download)
+    limite_espaco = LimiteEspaco.padrao(pasta_download, indice=indice)
+    limite_espaco.iniciar()
+    publicacoes = None
 
-        logger.info(f"Starting web scraping for {today_date}...")
-        publicacoes = scraper.executar(today_date)
+    try:
+        scraper = DJEScraperDownload(pasta_download=pasta_download, indice=indice, limite_espaco=limite_espaco)
+        api_client = JusAPIClient()
+        # A extração enfileira cada publicação assim que sai do PDF; o entregador envia em paralelo
+        fila = FilaEnvio()
+        entregador = None
+
+        if fila.quantidade():
+            logger.info(f"{fila.quantidade()} publications left in the delivery queue by previous runs.")
+
+        if api_client.testar_conexao():
+            if api_client.outbox and api_client.outbox.quantidade():
+                logger.info(f"Replaying {api_client.outbox.quantidade()} publications pending in the outbox...")
+                replay = api_client.reenviar_pendentes()
+                logger.info(f"Outbox replay results: Successes={replay['sucessos']}, Errors={replay['erros']}")
+
+            logger.info("API connection successful. Publications will be sent as they are extracted.")
+            entregador = EntregadorAPI(api_client, fila)
+            entregador.iniciar()
+        else:
+            logger.error("API connection failed. Publications will stay in the delivery queue for the next run.")
+
+        # Cada publicação vai para o arquivo de resultados assim que é extraída
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        resultados = GravadorJSONL(f"/app/data/results/daily_run_results_{timestamp}.jsonl",
+                                   deduplicar_por=chave_publicacao)
+
+        def ao_extrair(novas):
+            fila.enfileirar(novas)
+            resultados.adicionar(novas)
+
+        try:
+            logger.info(f"Starting web scraping for {today_date}...")
+            publicacoes = scraper.executar(today_date, ao_extrair=ao_extrair)
+            # Publicações retomadas do checkpoint de uma execução anterior entram aqui
+            resultados.adicionar(publicacoes)
+        finally:
+            resultados.fechar()
+            if entregador:
+                result = entregador.encerrar()
+                logger.info(f"API submission results: Successes={result['sucessos']}, Errors={result['erros']}, "
+                            f"Already in API={result['ja_existentes']}, "
+                            f"Pending in outbox={api_client.outbox.quantidade() if api_client.outbox else 0}")
+            logger.info(f"Publications waiting in the delivery queue: {fila.quantidade()}")
+            fila.fechar()
 
         if publicacoes:
             logger.info(f"Scraping completed. Found {len(publicacoes)} relevant publications.")
-
-            api_client = JusAPIClient()
-
-            if not api_client.testar_conexao():
-                logger.error("API connection failed. Publications will not be sent.")
-                # Opcional: criar backup local mesmo que a API falhe
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_file = f"/app/data/backups/daily_run_failed_api_{timestamp}.json"
-                api_client.criar_backup_local(publicacoes, backup_file)
-                logger.info(f"Local backup created: {backup_file}")
-                return
-
-            logger.info(f"API connection successful. Sending {len(publicacoes)} publications...")
-
-            result = api_client.enviar_lote_publicacoes(publicacoes)
-
-            logger.info(f"API submission results: Successes={result['sucessos']}, Errors={result['erros']}")
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            results_file = f"/app/data/results/daily_run_results_{timestamp}.json"
-            with open(results_file, 'w', encoding='utf-8') as f:
-                json.dump([pub.to_dict() for pub in publicacoes], f, ensure_ascii=False, indent=2)
-            logger.info(f"Local results saved to: {results_file}")
+            logger.info(f"Local results saved to: {resultados.caminho}")
 
         else:
             logger.info(f"No relevant publications found for {today_date}.")
 
     except Exception as e:
         logger.exception("An unhandled error occurred during the daily run.")
+    finally:
+        # O lote guarda o conteúdo das publicações num arquivo temporário
+        if isinstance(publicacoes, PublicacaoBatch):
+            publicacoes.fechar()
+        limite_espaco.encerrar()
+        indice.fechar()
 
     logger.info("Daily scrape and API submission finished.")
 
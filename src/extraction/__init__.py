@@ -1,3 +1,4 @@
-from .data_extractor import DataExtractor
+from .data_extractor import DataExtractor, VerificadorRelevancia
+from .pdf_reader import iterar_paginas, ler_pdf
 
-__all__ = ['DataExtractor']
\ No newline at end of file
+__all__ = ['DataExtractor', 'VerificadorRelevancia', 'iterar_paginas', 'ler_pdf']
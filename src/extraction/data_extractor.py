@@ -1,81 +1,166 @@
 import re
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+_VALOR = r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*-\s*'
+_SUFIXOS_VALOR = {
+    'principal': r'principal\s+bruto[/\\]líquido',
+    'juros': r'juros\s+moratórios',
+    'honorarios': r'honorários\s+advocatícios'
+}
+
+
+class VerificadorRelevancia:
+    """
+    Aplica os critérios de DataExtractor.is_conteudo_relevante a um texto recebido em partes
+    (ex.: páginas de um PDF). Cada indicador deixa de ser procurado quando aparece, e a decisão
+    positiva sai assim que todos os critérios são atendidos, sem olhar o restante do documento.
+    """
+
+    TAMANHO_MINIMO = 6000
+    QUALIDADE_MINIMA = 3
+    MARCADOR_FALHA = "EXTRAÇÃO FALHOU"
+    INDICADORES_OBRIGATORIOS = (
+        "Publicação Oficial do Tribunal",
+        "Diário da Justiça Eletrônico",
+        "Processo "
+    )
+    INDICADORES_QUALIDADE = (
+        "ADV:",
+        "Vistos",
+        "R$",
+        "Cumprimento de Sentença",
+        "Fazenda Pública"
+    )
+    TERMOS_JUDICIAIS = (
+        "homologo", "Homologação", "decisão", "sentença",
+        "despacho", "determino", "defiro"
+    )
 
-class DataExtractor:
     def __init__(self):
-        self.patterns = {
-            'processo': [
-                r'Processo\s*[:\s]*(\d{7}-\d{2}\.\d{4}\.\d{1}\.\d{2}\.\d{4}(?:/\d{2})?)',
-                r'\b(\d{7}-\d{2}\.\d{4}\.\d{1}\.\d{2}\.\d{4}(?:/\d{2})?)\b'
-            ],
-            'autor': [
-                r'-\s*([A-ZÁÊÇÕÂÍÓÚ][A-Za-záêçõâíóú\s]{8,50}?)\s*-\s*Vistos',
-                r'Auxílio-Acidente[^-]+-\s*([A-ZÁÊÇÕÂÍÓÚ][A-Za-záêçõâíóú\s]{8,50}?)\s*-\s*Vistos'
-            ],
-            'advogados': [
-                r'ADV:\s*([A-ZÁÊÇÕÂÍÓÚ][A-Za-záêçõâíóú\s]+?)\s*\(OAB\s+\d+/[A-Z]{2}\)'
-            ],
-            'valor_principal': [
-                r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*-\s*principal\s+bruto[/\\]líquido'
-            ],
-            'valor_juros': [
-                r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*-\s*juros\s+moratórios'
-            ],
-            'valor_honorarios': [
-                r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*-\s*honorários\s+advocatícios'
-            ],
-            'data': [
-                r'Disponibilização:\s*[^,]*,\s*(\d{1,2}\s+de\s+\w+\s+de\s+\d{4})'
-            ]
-        }
+        self.decisao: Optional[bool] = None
+        self._obrigatorios = list(self.INDICADORES_OBRIGATORIOS)
+        self._qualidade = list(self.INDICADORES_QUALIDADE)
+        self._qualidade_encontrados = 0
+        self._estrutura_judicial = False
+        # Tamanho equivalente a len(texto.strip()) sobre tudo o que já foi recebido
+        self._tamanho = 0
+        self._iniciado = False
+        self._espacos_pendentes = 0
+        # Final da parte anterior, para achar indicadores cortados entre duas partes
+        self._cauda = ''
+        self._sobreposicao = max(len(termo) for termo in (
+            self.INDICADORES_OBRIGATORIOS + self.INDICADORES_QUALIDADE + self.TERMOS_JUDICIAIS + (self.MARCADOR_FALHA,)
+        )) - 1
 
-    def is_conteudo_relevante(self, texto: str) -> bool:
-        """
-        Verifica se o conteúdo é relevante para processamento com base em critérios de tamanho e indicadores.
-        """
-        if not texto:
-            return False
+    def alimentar(self, parte: str) -> Optional[bool]:
+        """Processa mais uma parte do texto; retorna a decisão, ou None enquanto ela estiver em aberto."""
+        if self.decisao is not None or not parte:
+            return self.decisao
         
-        if "EXTRAÇÃO FALHOU" in texto:
-            return False
+        self._somar_tamanho(parte)
+        janela = self._cauda + parte
+        self._cauda = janela[-self._sobreposicao:]
         
-        tamanho_texto = len(texto.strip())
-        if tamanho_texto < 6000:
-            return False
+        if self.MARCADOR_FALHA in janela:
+            self.decisao = False
+            return self.decisao
         
-        indicadores_obrigatorios = [
-            "Publicação Oficial do Tribunal",
-            "Diário da Justiça Eletrônico",
-            "Processo "
-        ]
+        self._obrigatorios = [ind for ind in self._obrigatorios if ind not in janela]
+        if self._qualidade_encontrados < self.QUALIDADE_MINIMA:
+            pendentes = [ind for ind in self._qualidade if ind not in janela]
+            self._qualidade_encontrados += len(self._qualidade) - len(pendentes)
+            self._qualidade = pendentes
+        if not self._estrutura_judicial:
+            self._estrutura_judicial = any(termo in janela for termo in self.TERMOS_JUDICIAIS)
         
-        for indicador in indicadores_obrigatorios:
-            if indicador not in texto:
-                return False
+        if self._criterios_atendidos():
+            self.decisao = True
+        return self.decisao
+
+    def concluir(self) -> bool:
+        """Decisão final, depois de recebido todo o texto."""
+        if self.decisao is None:
+            self.decisao = self._criterios_atendidos()
+        return self.decisao
+
+    def _criterios_atendidos(self) -> bool:
+        return (
+            self._tamanho >= self.TAMANHO_MINIMO
+            and not self._obrigatorios
+            and self._qualidade_encontrados >= self.QUALIDADE_MINIMA
+            and self._estrutura_judicial
+        )
+
+    def _somar_tamanho(self, parte: str):
+        if not self._iniciado:
+            parte = parte.lstrip()
+            if not parte:
+                return
+            self._iniciado = True
         
-        indicadores_qualidade = [
-            "ADV:",
-            "Vistos",
-            "R$",
-            "Cumprimento de Sentença",
-            "Fazenda Pública"
+        conteudo = parte.rstrip()
+        if conteudo:
+            self._tamanho += self._espacos_pendentes + len(conteudo)
+            self._espacos_pendentes = len(parte) - len(conteudo)
+        else:
+            self._espacos_pendentes += len(parte)
+
+
+class DataExtractor:
+    patterns = {
+        'processo': [
+            r'Processo\s*[:\s]*(\d{7}-\d{2}\.\d{4}\.\d{1}\.\d{2}\.\d{4}(?:/\d{2})?)',
+            r'\b(\d{7}-\d{2}\.\d{4}\.\d{1}\.\d{2}\.\d{4}(?:/\d{2})?)\b'
+        ],
+        'autor': [
+            r'-\s*([A-ZÁÊÇÕÂÍÓÚ][A-Za-záêçõâíóú\s]{8,50}?)\s*-\s*Vistos',
+            r'Auxílio-Acidente[^-]+-\s*([A-ZÁÊÇÕÂÍÓÚ][A-Za-záêçõâíóú\s]{8,50}?)\s*-\s*Vistos'
+        ],
+        'advogados': [
+            r'ADV:\s*([A-ZÁÊÇÕÂÍÓÚ][A-Za-záêçõâíóú\s]+?)\s*\(OAB\s+\d+/[A-Z]{2}\)'
+        ],
+        'valor_principal': [_VALOR + _SUFIXOS_VALOR['principal']],
+        'valor_juros': [_VALOR + _SUFIXOS_VALOR['juros']],
+        'valor_honorarios': [_VALOR + _SUFIXOS_VALOR['honorarios']],
+        'data': [
+            r'Disponibilização:\s*[^,]*,\s*(\d{1,2}\s+de\s+\w+\s+de\s+\d{4})'
         ]
-        
-        contador_qualidade = sum(1 for ind in indicadores_qualidade if ind in texto)
-        
-        if contador_qualidade < 3:
-            return False
-        
-        tem_estrutura_judicial = any(termo in texto for termo in [
-            "homologo", "Homologação", "decisão", "sentença", 
-            "despacho", "determino", "defiro"
-        ])
-        
-        if not tem_estrutura_judicial:
+    }
+
+    # Padrões compilados uma única vez, na carga da classe
+    _processo = [re.compile(p) for p in patterns['processo']]
+    _autor = [re.compile(p) for p in patterns['autor']]
+    _advogados = [re.compile(p) for p in patterns['advogados']]
+    _data = [re.compile(p) for p in patterns['data']]
+    _valores = {
+        'principal': [re.compile(p, re.IGNORECASE) for p in patterns['valor_principal']],
+        'juros': [re.compile(p, re.IGNORECASE) for p in patterns['valor_juros']],
+        'honorarios': [re.compile(p, re.IGNORECASE) for p in patterns['valor_honorarios']]
+    }
+    # Os três valores em uma só varredura: o grupo nomeado que casou indica o campo
+    _valores_combinados = re.compile(
+        _VALOR + '(?:' + '|'.join(f'(?P<{campo}>{sufixo})' for campo, sufixo in _SUFIXOS_VALOR.items()) + ')',
+        re.IGNORECASE
+    )
+    # Cada publicação da página começa em uma linha 'Processo NNNNNNN-NN.AAAA.J.TR.OOOO'
+    _inicio_publicacao = re.compile(
+        r'^[ \t]*Processo\s*[:\s]*\d{7}-\d{2}\.\d{4}\.\d{1}\.\d{2}\.\d{4}', re.MULTILINE
+    )
+    TERMOS_PUBLICACAO = ('RPV', 'INSS')
+    # Quanto do texto anterior é relido a cada página, para achar uma abertura cortada entre páginas
+    SOBREPOSICAO_SEGMENTOS = 100
+
+    def is_conteudo_relevante(self, texto: str) -> bool:
+        """
+        Verifica se o conteúdo é relevante para processamento com base em critérios de tamanho e indicadores.
+        """
+        if not texto:
             return False
         
-        return True
+        verificador = VerificadorRelevancia()
+        verificador.alimentar(texto)
+        return verificador.concluir()
 
     def extrair_dados(self, texto: str) -> Dict:
         """Extrai todos os dados estruturados do texto."""
@@ -102,26 +187,105 @@ class DataExtractor:
         
         return dados
 
+    def segmentar_publicacoes(self, texto: Union[str, Iterable[str]]) -> Iterator[str]:
+        """
+        Divide o texto do DJE em publicações, cortando em cada linha que abre com
+        'Processo NNNNNNN-NN...'. Aceita o texto inteiro ou as páginas uma a uma; nesse caso só a
+        publicação em andamento fica em memória. O cabeçalho antes do primeiro processo é
+        descartado; se não houver nenhuma abertura reconhecível, o texto inteiro vira um segmento.
+        A cada página, a busca recomeça perto do fim do texto anterior (já varrido), não do início
+        da publicação em andamento.
+        """
+        paginas = [texto] if isinstance(texto, str) else texto
+        buffer = ''
+        em_publicacao = False
+        
+        for pagina in paginas:
+            buffer += pagina
+            # Aberturas já encontradas viraram cortes: a publicação em andamento começa em 0
+            inicio_busca = max(len(buffer) - len(pagina) - self.SOBREPOSICAO_SEGMENTOS, 1 if em_publicacao else 0)
+            cortes = [m.start() for m in self._inicio_publicacao.finditer(buffer, inicio_busca)]
+            if not cortes:
+                continue
+            
+            if not em_publicacao:
+                buffer = buffer[cortes[0]:]
+                cortes = [corte - cortes[0] for corte in cortes[1:]]
+                em_publicacao = True
+            
+            inicio = 0
+            for corte in cortes:
+                yield buffer[inicio:corte]
+                inicio = corte
+            buffer = buffer[inicio:]
+        
+        yield buffer
+
+    def extrair_publicacoes(self, texto: Union[str, Iterable[str]]) -> Iterator[Dict]:
+        """
+        Extrai os dados de cada publicação de RPV/INSS do texto (inteiro ou página a página).
+        A data de disponibilização vem do cabeçalho da página e vale para todas as publicações;
+        'conteudo' traz o texto da própria publicação.
+        """
+        if not texto:
+            return
+        
+        paginas = [texto] if isinstance(texto, str) else texto
+        data_pagina = None
+        
+        def paginas_com_data():
+            nonlocal data_pagina
+            for pagina in paginas:
+                if data_pagina is None:
+                    data_pagina = self._extrair_data(pagina)
+                yield pagina
+        
+        for segmento in self.segmentar_publicacoes(paginas_com_data()):
+            if not all(termo in segmento for termo in self.TERMOS_PUBLICACAO):
+                continue
+            
+            dados = self.extrair_dados(segmento)
+            dados['data'] = dados['data'] or data_pagina
+            if self.validar_extracao_completa(dados):
+                dados['conteudo'] = segmento
+                yield dados
+
+    def extrair_publicacoes_relevantes(self, texto: Union[str, Iterable[str]]) -> List[Dict]:
+        """
+        Verifica a relevância do documento e extrai suas publicações em uma única leitura, com o
+        texto inteiro ou vindo página a página. Se o documento não for relevante, retorna [].
+        """
+        paginas = [texto] if isinstance(texto, str) else texto
+        verificador = VerificadorRelevancia()
+        
+        def paginas_verificadas():
+            for pagina in paginas:
+                verificador.alimentar(pagina)
+                yield pagina
+        
+        publicacoes = list(self.extrair_publicacoes(paginas_verificadas()))
+        return publicacoes if verificador.concluir() else []
+
     def _extrair_processo(self, texto: str) -> Optional[str]:
         """Extrai número do processo."""
-        for pattern in self.patterns['processo']:
-            matches = re.findall(pattern, texto)
-            if matches:
-                return matches[0]
+        for pattern in self._processo:
+            match = pattern.search(texto)
+            if match:
+                return match.group(1)
         return None
 
     def _extrair_data(self, texto: str) -> Optional[str]:
         """Extrai data de disponibilização."""
-        for pattern in self.patterns['data']:
-            match = re.search(pattern, texto)
+        for pattern in self._data:
+            match = pattern.search(texto)
             if match:
                 return match.group(1)
         return None
 
     def _extrair_autor(self, texto: str) -> Optional[str]:
         """Extrai nome do autor."""
-        for pattern in self.patterns['autor']:
-            match = re.search(pattern, texto)
+        for pattern in self._autor:
+            match = pattern.search(texto)
             if match:
                 nome = match.group(1).strip()
                 if self._is_nome_valido(nome):
@@ -132,8 +296,8 @@ class DataExtractor:
         """Extrai nomes dos advogados."""
         advogados = []
         
-        for pattern in self.patterns['advogados']:
-            matches = re.findall(pattern, texto)
+        for pattern in self._advogados:
+            matches = pattern.findall(texto)
             for match in matches:
                 nome = match.strip()
                 if 5 <= len(nome) <= 60 and nome not in advogados:
@@ -142,26 +306,27 @@ class DataExtractor:
         return '; '.join(advogados) if advogados else None
 
     def _extrair_valores(self, texto: str) -> Dict:
-        """Extrai valores monetários."""
+        """Extrai valores monetários, os três em uma só varredura do texto."""
         valores = {'principal': None, 'juros': None, 'honorarios': None}
+        encontrados = set()
         
-        for pattern in self.patterns['valor_principal']:
-            match = re.search(pattern, texto, re.IGNORECASE)
-            if match:
-                valores['principal'] = self._converter_valor(match.group(1))
-                break
+        for match in self._valores_combinados.finditer(texto):
+            campo = match.lastgroup
+            if campo not in encontrados:
+                valores[campo] = self._converter_valor(match.group(1))
+                encontrados.add(campo)
+                if len(encontrados) == len(valores):
+                    break
         
-        for pattern in self.patterns['valor_juros']:
-            match = re.search(pattern, texto, re.IGNORECASE)
-            if match:
-                valores['juros'] = self._converter_valor(match.group(1))
-                break
-        
-        for pattern in self.patterns['valor_honorarios']:
-            match = re.search(pattern, texto, re.IGNORECASE)
-            if match:
-                valores['honorarios'] = self._converter_valor(match.group(1))
-                break
+        # Padrões alternativos (além do primeiro de cada campo) só para o que faltou
+        for campo, padroes in self._valores.items():
+            if campo in encontrados:
+                continue
+            for pattern in padroes[1:]:
+                match = pattern.search(texto)
+                if match:
+                    valores[campo] = self._converter_valor(match.group(1))
+                    break
         
         return valores
 
@@ -0,0 +1,53 @@
+from typing import Iterator
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+
+def iterar_paginas(caminho_arquivo: str) -> Iterator[str]:
+    """
+    Lê o PDF página a página, devolvendo o texto de cada uma (terminado em '\\n') sob demanda.
+    Usa o PyPDF2 e, se ele falhar ou não encontrar texto, continua com o pdfplumber a partir
+    da página em que parou. Nunca lança exceção: um PDF ilegível simplesmente não gera páginas.
+    """
+    proxima_pagina = 0
+    encontrou_texto = False
+
+    if PyPDF2:
+        try:
+            with open(caminho_arquivo, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                for page in pdf_reader.pages:
+                    texto = page.extract_text() or ""
+                    proxima_pagina += 1
+                    if texto.strip():
+                        encontrou_texto = True
+                    yield texto + "\n"
+            if encontrou_texto:
+                return
+        except Exception:
+            pass
+
+    if pdfplumber:
+        if not encontrou_texto:
+            proxima_pagina = 0
+        try:
+            with pdfplumber.open(caminho_arquivo) as pdf:
+                for page in pdf.pages[proxima_pagina:]:
+                    texto = page.extract_text()
+                    page.flush_cache() # Libera os objetos da página já lida
+                    if texto:
+                        yield texto + "\n"
+        except Exception:
+            pass
+
+
+def ler_pdf(caminho_arquivo: str) -> str:
+    """Lê o texto completo do PDF (para quem precisa dele inteiro, ex.: o cache de textos)."""
+    return "".join(iterar_paginas(caminho_arquivo))
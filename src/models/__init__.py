@@ -1,3 +1,4 @@
 from .publicacao import Publicacao
+from .publicacao_batch import PublicacaoBatch, PublicacaoView
 
-__all__ = ['Publicacao']
\ No newline at end of file
+__all__ = ['Publicacao', 'PublicacaoBatch', 'PublicacaoView']
\ No newline at end of file
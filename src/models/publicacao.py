@@ -1,4 +1,4 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from typing import Optional
 from datetime import datetime
 
@@ -26,7 +26,8 @@ class Publicacao:
             self.created_at = datetime.now()
     
     def to_dict(self) -> dict:
-        data = asdict(self)
+        # Cópia rasa: todos os campos são valores simples, sem o deepcopy de asdict
+        data = {campo: getattr(self, campo) for campo in CAMPOS_PUBLICACAO}
         if self.created_at:
             data['created_at'] = self.created_at.isoformat()
         return data
@@ -152,4 +153,7 @@ class Publicacao:
         return self.resumo()
     
     def __repr__(self) -> str:
-        return self.debug_info()
\ No newline at end of file
+        return self.debug_info()
+
+
+CAMPOS_PUBLICACAO = tuple(campo.name for campo in fields(Publicacao))
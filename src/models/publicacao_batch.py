@@ -0,0 +1,191 @@
+import zlib
+import tempfile
+import threading
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from .publicacao import Publicacao
+
+COLUNAS_TEXTO = ('numero_processo', 'data_disponibilizacao', 'autores', 'advogados',
+                 'url_publicacao', 'arquivo_cache', 'fonte')
+COLUNAS_VALOR = ('valor_principal', 'valor_juros', 'honorarios')
+# Colunas com poucos valores distintos (mesma data, PDF, URL ou escritório em várias linhas)
+COLUNAS_REPETIDAS = ('data_disponibilizacao', 'advogados', 'url_publicacao', 'arquivo_cache', 'fonte')
+
+_EPOCA = datetime(1970, 1, 1)
+_SEM_DATA = -(2 ** 63)
+
+
+class ArmazemConteudo:
+    """
+    Textos completos das publicações fora da memória: cada texto é comprimido e acrescentado a um
+    arquivo temporário (apagado ao fechar), e só é lido e descomprimido quando alguém o pede.
+    """
+
+    NIVEL_COMPRESSAO = 6
+
+    def __init__(self, pasta: Optional[str] = None):
+        self._arquivo = tempfile.TemporaryFile(dir=pasta)
+        self._lock = threading.Lock()
+        self._fim = 0
+
+    def guardar(self, texto: str) -> Tuple[int, int]:
+        """Guarda o texto e retorna sua referência (posição, tamanho) no arquivo."""
+        comprimido = zlib.compress(texto.encode('utf-8'), self.NIVEL_COMPRESSAO)
+        with self._lock:
+            posicao = self._fim
+            self._arquivo.seek(posicao)
+            self._arquivo.write(comprimido)
+            self._fim += len(comprimido)
+        return posicao, len(comprimido)
+
+    def ler(self, posicao: int, tamanho: int) -> str:
+        with self._lock:
+            self._arquivo.seek(posicao)
+            comprimido = self._arquivo.read(tamanho)
+        return zlib.decompress(comprimido).decode('utf-8')
+
+    def fechar(self):
+        try:
+            self._arquivo.close()
+        except Exception:
+            pass
+
+
+class PublicacaoBatch(Sequence):
+    """
+    Lote de publicações em colunas, para guardar muitas de uma vez (ex.: backfill) com pouca memória:
+    valores em arrays de float, datas de criação em array de inteiros, strings repetidas
+    compartilhadas entre as linhas e o conteúdo completo num ArmazemConteudo, fora da memória.
+    Cada item é um PublicacaoView, com a mesma interface de leitura de Publicacao; `to_publicacoes`
+    devolve objetos Publicacao comuns quando for preciso alterá-los.
+    """
+
+    def __init__(self, publicacoes: Iterable[Publicacao] = (), pasta_conteudo: Optional[str] = None):
+        self._texto = {coluna: [] for coluna in COLUNAS_TEXTO}
+        self._valores = {coluna: array('d') for coluna in COLUNAS_VALOR}
+        self._criado_em = array('q')
+        self._conteudo_posicao = array('q')
+        self._conteudo_tamanho = array('q')
+        self._compartilhadas = {}
+        self._armazem = ArmazemConteudo(pasta_conteudo)
+        self.extend(publicacoes)
+
+    def append(self, publicacao: Publicacao):
+        for coluna in COLUNAS_TEXTO:
+            valor = getattr(publicacao, coluna)
+            if valor is not None and coluna in COLUNAS_REPETIDAS:
+                valor = self._compartilhadas.setdefault(valor, valor)
+            self._texto[coluna].append(valor)
+        for coluna in COLUNAS_VALOR:
+            valor = getattr(publicacao, coluna)
+            self._valores[coluna].append(float('nan') if valor is None else valor)
+        self._criado_em.append(_microssegundos(publicacao.created_at))
+        if publicacao.conteudo_completo is None:
+            posicao, tamanho = -1, -1
+        else:
+            posicao, tamanho = self._armazem.guardar(publicacao.conteudo_completo)
+        self._conteudo_posicao.append(posicao)
+        self._conteudo_tamanho.append(tamanho)
+
+    def extend(self, publicacoes: Iterable[Publicacao]):
+        for publicacao in publicacoes:
+            self.append(publicacao)
+
+    def __len__(self) -> int:
+        return len(self._criado_em)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [PublicacaoView(self, i) for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fora do lote")
+        return PublicacaoView(self, indice)
+
+    def texto(self, coluna: str, indice: int):
+        return self._texto[coluna][indice]
+
+    def valor(self, coluna: str, indice: int) -> Optional[float]:
+        valor = self._valores[coluna][indice]
+        return None if valor != valor else valor
+
+    def criado_em(self, indice: int) -> Optional[datetime]:
+        microssegundos = self._criado_em[indice]
+        return None if microssegundos == _SEM_DATA else _EPOCA + timedelta(microseconds=microssegundos)
+
+    def conteudo(self, indice: int) -> Optional[str]:
+        """Lê do armazém o conteúdo completo da publicação (None se ela não tinha conteúdo)."""
+        tamanho = self._conteudo_tamanho[indice]
+        if tamanho < 0:
+            return None
+        return self._armazem.ler(self._conteudo_posicao[indice], tamanho)
+
+    def to_publicacoes(self) -> List[Publicacao]:
+        return [view.to_publicacao() for view in self]
+
+    def fechar(self):
+        """Apaga o arquivo com os conteúdos; as linhas deixam de ter `conteudo_completo` legível."""
+        self._armazem.fechar()
+
+
+def _microssegundos(momento: Optional[datetime]) -> int:
+    if momento is None:
+        return _SEM_DATA
+    if momento.tzinfo is not None:
+        momento = momento.astimezone().replace(tzinfo=None)
+    return (momento - _EPOCA) // timedelta(microseconds=1)
+
+
+class PublicacaoView:
+    """Linha de um PublicacaoBatch: lê os campos das colunas do lote, sem copiar os dados."""
+
+    __slots__ = ('_lote', '_indice')
+
+    def __init__(self, lote: PublicacaoBatch, indice: int):
+        self._lote = lote
+        self._indice = indice
+
+    @property
+    def conteudo_completo(self) -> Optional[str]:
+        return self._lote.conteudo(self._indice)
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        return self._lote.criado_em(self._indice)
+
+    def to_publicacao(self) -> Publicacao:
+        return Publicacao(**{
+            **{coluna: self._lote.texto(coluna, self._indice) for coluna in COLUNAS_TEXTO},
+            **{coluna: self._lote.valor(coluna, self._indice) for coluna in COLUNAS_VALOR},
+            'conteudo_completo': self.conteudo_completo, 'created_at': self.created_at
+        })
+
+    # Os métodos de Publicacao só leem atributos, então servem também para a view
+    to_dict = Publicacao.to_dict
+    to_api_format = Publicacao.to_api_format
+    tem_dados_validos = Publicacao.tem_dados_validos
+    tem_dados_completos = Publicacao.tem_dados_completos
+    calcular_valor_total = Publicacao.calcular_valor_total
+    validar_para_api = Publicacao.validar_para_api
+    resumo = Publicacao.resumo
+    resumo_detalhado = Publicacao.resumo_detalhado
+    debug_info = Publicacao.debug_info
+    __str__ = Publicacao.__str__
+    __repr__ = Publicacao.__repr__
+
+    def __eq__(self, outra) -> bool:
+        if isinstance(outra, (Publicacao, PublicacaoView)):
+            return self.to_dict() == outra.to_dict()
+        return NotImplemented
+
+    __hash__ = None
+
+
+for _coluna in COLUNAS_TEXTO:
+    setattr(PublicacaoView, _coluna, property(lambda self, coluna=_coluna: self._lote.texto(coluna, self._indice)))
+for _coluna in COLUNAS_VALOR:
+    setattr(PublicacaoView, _coluna, property(lambda self, coluna=_coluna: self._lote.valor(coluna, self._indice)))
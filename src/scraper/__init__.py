@@ -1,5 +1,13 @@
-from .dje_scraper import DJEScraperOtimizado
+from .dje_scraper import DJEScraperDownload
 from .cache_manager import CacheManager
 from .frame_handler import FrameHandler
+from .pdf_downloader import PDFDownloader
+from .pdf_index import PDFIndex
+from .text_cache import PDFTextCache
+from .checkpoint import CheckpointBusca
+from .link_resultado import LinkResultado
+from .driver_pool import DriverPool
+from .limite_espaco import LimiteEspaco
+from .backfill import LedgerJobs, gerar_jobs, executar_backfill
 
-__all__ = ['DJEScraperOtimizado', 'CacheManager', 'FrameHandler']
\ No newline at end of file
+__all__ = ['DJEScraperDownload', 'CacheManager', 'FrameHandler', 'PDFDownloader', 'PDFIndex', 'PDFTextCache', 'CheckpointBusca', 'LinkResultado', 'DriverPool', 'LimiteEspaco', 'LedgerJobs', 'gerar_jobs', 'executar_backfill']
\ No newline at end of file
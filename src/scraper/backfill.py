@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.publicacao import Publicacao
+from models.publicacao_batch import PublicacaoBatch
+from utils.config import Config
+from .dje_scraper import DJEScraperDownload
+from .driver_pool import DriverPool
+from .limite_espaco import LimiteEspaco
+from .pdf_index import PDFIndex
+
+FORMATO_DATA = "%d/%m/%Y"
+
+
+def gerar_jobs(inicio: str, fim: str, granularidade: str = 'dia',
+               incluir_fins_de_semana: bool = False) -> List[Tuple[str, str]]:
+    """
+    Divide o período (datas DD/MM/AAAA, inclusivas) em jobs (data_inicio, data_fim): um por dia
+    ou um por semana (segunda a domingo, recortada nos limites do período). Por padrão os
+    sábados e domingos ficam de fora dos jobs diários, já que o DJE não circula neles.
+    """
+    data_inicio = datetime.strptime(inicio, FORMATO_DATA).date()
+    data_fim = datetime.strptime(fim, FORMATO_DATA).date()
+    if data_fim < data_inicio:
+        raise ValueError("A data final deve ser igual ou posterior à inicial")
+
+    jobs = []
+    if granularidade == 'dia':
+        dia = data_inicio
+        while dia <= data_fim:
+            if incluir_fins_de_semana or dia.weekday() < 5:
+                jobs.append((_formatar(dia), _formatar(dia)))
+            dia += timedelta(days=1)
+    elif granularidade == 'semana':
+        dia = data_inicio
+        while dia <= data_fim:
+            fim_semana = min(dia + timedelta(days=6 - dia.weekday()), data_fim)
+            jobs.append((_formatar(dia), _formatar(fim_semana)))
+            dia = fim_semana + timedelta(days=1)
+    else:
+        raise ValueError(f"Granularidade inválida: {granularidade} (use 'dia' ou 'semana')")
+    return jobs
+
+
+def _formatar(dia: date) -> str:
+    return dia.strftime(FORMATO_DATA)
+
+
+class LedgerJobs:
+    """
+    Registro (SQLite) dos jobs de backfill: estado, publicações encontradas e tentativas.
+    Jobs 'concluido' são pulados nas próximas execuções; os demais são tentados de novo e
+    retomam do checkpoint da busca.
+    """
+
+    NOME_ARQUIVO = 'backfill_jobs.db'
+
+    EM_ANDAMENTO = 'em_andamento'
+    CONCLUIDO = 'concluido'
+    INCOMPLETO = 'incompleto'
+
+    def __init__(self, caminho_db: Optional[str] = None):
+        self.caminho_db = caminho_db or os.path.join(Config.DATA_DIR, self.NOME_ARQUIVO)
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    data_inicio TEXT NOT NULL,
+                    data_fim TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    publicacoes INTEGER NOT NULL DEFAULT 0,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    erro TEXT,
+                    atualizado_em TEXT NOT NULL,
+                    PRIMARY KEY (data_inicio, data_fim)
+                )
+            """)
+
+    def concluido(self, data_inicio: str, data_fim: str) -> bool:
+        return self.estado(data_inicio, data_fim) == self.CONCLUIDO
+
+    def estado(self, data_inicio: str, data_fim: str) -> Optional[str]:
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT estado FROM jobs WHERE data_inicio = ? AND data_fim = ?", (data_inicio, data_fim)
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def iniciar(self, data_inicio: str, data_fim: str):
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                INSERT INTO jobs (data_inicio, data_fim, estado, tentativas, atualizado_em) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(data_inicio, data_fim) DO UPDATE SET
+                    estado = excluded.estado, tentativas = tentativas + 1, erro = NULL,
+                    atualizado_em = excluded.atualizado_em
+            """, (data_inicio, data_fim, self.EM_ANDAMENTO, datetime.now().isoformat()))
+
+    def finalizar(self, data_inicio: str, data_fim: str, estado: str, publicacoes: int = 0,
+                  erro: Optional[str] = None):
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "UPDATE jobs SET estado = ?, publicacoes = ?, erro = ?, atualizado_em = ? "
+                "WHERE data_inicio = ? AND data_fim = ?",
+                (estado, publicacoes, erro, datetime.now().isoformat(), data_inicio, data_fim)
+            )
+
+    def resumo(self) -> Dict[str, int]:
+        """Quantidade de jobs por estado."""
+        with self._lock:
+            return dict(self._conexao.execute("SELECT estado, COUNT(*) FROM jobs GROUP BY estado").fetchall())
+
+    def fechar(self):
+        try:
+            self._conexao.close()
+        except Exception:
+            pass
+
+
+def executar_backfill(jobs: List[Tuple[str, str]], pasta_download: str, paralelo: int = 1,
+                      ledger: Optional[LedgerJobs] = None,
+                      ao_extrair: Optional[Callable[[List[Publicacao]], None]] = None,
+                      ao_concluir_job: Optional[Callable[[str, str, List[Publicacao]], None]] = None,
+                      limite_espaco: Optional[LimiteEspaco] = None,
+                      indice: Optional[PDFIndex] = None) -> Dict[str, int]:
+    """
+    Executa os jobs com até `paralelo` buscas simultâneas, cada uma em sua sessão do navegador e
+    em uma subpasta própria de `pasta_download`. Jobs já concluídos no ledger são pulados; um
+    job só é marcado como concluído se todos os links da busca foram processados.
+    `ao_extrair` é repassado a DJEScraperDownload.executar e `ao_concluir_job` recebe as
+    publicações de cada job ao final (o lote é fechado logo depois da chamada). Os jobs compartilham um DriverPool com `paralelo`
+    navegadores, então cada job começa num Chrome já aberto em vez de iniciar um novo.
+    Com `limite_espaco`, os PDFs baixados são registrados nele para o descarte por LRU.
+    Todos os jobs usam o mesmo PDFIndex (`indice`, ou o de `pasta_download`), então um PDF já
+    baixado por outro job é reconhecido como duplicata.
+    Retorna a contagem de jobs por desfecho.
+    """
+    ledger = ledger or LedgerJobs()
+    pendentes = [job for job in jobs if not ledger.concluido(*job)]
+    totais = {"jobs": len(jobs), "pulados": len(jobs) - len(pendentes), "concluidos": 0, "incompletos": 0}
+    lock = threading.Lock()
+    pool = DriverPool(tamanho=max(1, min(paralelo, len(pendentes) or 1)))
+    indice_proprio = indice is None
+    indice = indice or PDFIndex(pasta_download)
+
+    def executar_job(job: Tuple[str, str]):
+        data_inicio, data_fim = job
+        nome = data_inicio.replace('/', '-') + ('' if data_fim == data_inicio else f"_{data_fim.replace('/', '-')}")
+        ledger.iniciar(data_inicio, data_fim)
+        try:
+            scraper = DJEScraperDownload(os.path.join(pasta_download, f"job_{nome}"), indice=indice,
+                                         pool=pool, limite_espaco=limite_espaco)
+            publicacoes = scraper.executar(data_inicio, sessoes=1, ao_extrair=ao_extrair, data_fim=data_fim)
+            if ao_concluir_job:
+                ao_concluir_job(data_inicio, data_fim, publicacoes)
+        except Exception as e:
+            ledger.finalizar(data_inicio, data_fim, LedgerJobs.INCOMPLETO, erro=str(e))
+            desfecho = "incompletos"
+        else:
+            estado = LedgerJobs.CONCLUIDO if scraper.busca_concluida else LedgerJobs.INCOMPLETO
+            ledger.finalizar(data_inicio, data_fim, estado, len(publicacoes))
+            desfecho = "concluidos" if scraper.busca_concluida else "incompletos"
+            if isinstance(publicacoes, PublicacaoBatch):
+                publicacoes.fechar()
+        with lock:
+            totais[desfecho] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, paralelo)) as executor:
+            list(executor.map(executar_job, pendentes))
+    finally:
+        pool.encerrar()
+        if indice_proprio:
+            indice.fechar()
+    return totais
@@ -1,13 +1,69 @@
 import os
 import re
+import json
 import time
-from datetime import datetime
-from typing import List, Optional, Tuple
+import zlib
+import struct
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.config import Config
+from .limite_espaco import LimiteEspaco
+
+# Cabeçalho fixo do formato compacto: assinatura, versão, flags, reservado, início e tamanho do
+# texto comprimido, tamanho do texto (caracteres, sem espaços nas pontas) e data de criação.
+# Entre o cabeçalho e o texto comprimido vão os metadados (URL, link, status) em JSON.
+CABECALHO = struct.Struct('<4sBBHIIId')
+ASSINATURA = b'DJEC'
+VERSAO_FORMATO = 1
+FLAG_FALHA = 0x01
 
 class CacheManager:
-    def __init__(self, cache_dir: str = "cache_pdfs"):
-        self.cache_dir = cache_dir
+    """
+    Cache dos textos extraídos (um arquivo por página do diário), com um índice SQLite na própria
+    pasta que guarda status, tamanhos, URL e data de cada arquivo. O índice é atualizado por
+    `salvar_cache`; arquivos criados ou alterados por fora são detectados por tamanho/mtime e lidos
+    uma única vez. Estatísticas, listagens e limpezas consultam o índice em vez de reler os textos.
+
+    Os arquivos são gravados no formato compacto (.djec): cabeçalho binário fixo com a posição do
+    texto, que fica comprimido com zlib. Arquivos .txt do formato antigo continuam sendo lidos e
+    podem ser convertidos com `compactar_cache`.
+    """
+
+    NOME_INDICE = '.indice_cache.db'
+    VERSAO_INDICE = 2
+    EXTENSAO = '.djec'
+    EXTENSOES = ('.txt', EXTENSAO)
+    NIVEL_COMPRESSAO = 6
+    MARCADOR_CONTEUDO = "CONTEÚDO EXTRAÍDO:"
+
+    def __init__(self, cache_dir: Optional[str] = None, limite_espaco: Optional[LimiteEspaco] = None):
+        self.cache_dir = cache_dir or Config.CACHE_DIR
+        self.limite_espaco = limite_espaco
         self._criar_diretorio()
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(os.path.join(self.cache_dir, self.NOME_INDICE), check_same_thread=False)
+        with self._lock, self._conexao:
+            if self._conexao.execute("PRAGMA user_version").fetchone()[0] != self.VERSAO_INDICE:
+                # O índice só espelha os arquivos: com outro esquema, é recriado pela sincronização
+                self._conexao.execute("DROP TABLE IF EXISTS arquivos")
+                self._conexao.execute(f"PRAGMA user_version = {self.VERSAO_INDICE}")
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS arquivos (
+                    arquivo TEXT PRIMARY KEY,
+                    status TEXT,
+                    existe INTEGER NOT NULL,
+                    valido INTEGER NOT NULL,
+                    tamanho_arquivo INTEGER NOT NULL,
+                    tamanho_conteudo INTEGER NOT NULL,
+                    url TEXT,
+                    link_text TEXT,
+                    mtime REAL NOT NULL
+                )
+            """)
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_arquivos_valido ON arquivos(valido)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_arquivos_mtime ON arquivos(mtime)")
 
     def _criar_diretorio(self):
         if not os.path.exists(self.cache_dir):
@@ -18,17 +74,40 @@ class CacheManager:
             match = re.search(r'Página\s+(\d+)', link_text)
             if match:
                 pagina = match.group(1)
-                nome = f"pdf_pagina_{pagina}_{index}.txt"
+                nome = f"pdf_pagina_{pagina}_{index}{self.EXTENSAO}"
             else:
-                nome = f"pdf_item_{index}_{int(time.time())}.txt"
+                nome = f"pdf_item_{index}_{int(time.time())}{self.EXTENSAO}"
             return os.path.join(self.cache_dir, nome)
         except Exception:
-            return os.path.join(self.cache_dir, f"pdf_erro_{index}_{int(time.time())}.txt")
+            return os.path.join(self.cache_dir, f"pdf_erro_{index}_{int(time.time())}{self.EXTENSAO}")
+
+    def _ler_cabecalho(self, nome_arquivo: str) -> Optional[Dict]:
+        """Lê cabeçalho e metadados de um arquivo no formato compacto (None se for do formato antigo)."""
+        try:
+            with open(nome_arquivo, 'rb') as f:
+                bruto = f.read(CABECALHO.size)
+                if len(bruto) < CABECALHO.size or not bruto.startswith(ASSINATURA):
+                    return None
+                _, versao, flags, _, inicio, tamanho_payload, tamanho_conteudo, criado_em = CABECALHO.unpack(bruto)
+                if versao != VERSAO_FORMATO:
+                    return None
+                metadados = json.loads(f.read(inicio - CABECALHO.size).decode('utf-8'))
+        except (OSError, ValueError):
+            return None
+        metadados.update(falha=bool(flags & FLAG_FALHA), inicio=inicio, tamanho_payload=tamanho_payload,
+                         tamanho_conteudo=tamanho_conteudo, criado_em=criado_em)
+        return metadados
 
     def arquivo_existe(self, nome_arquivo: str) -> bool:
+        cabecalho = self._ler_cabecalho(nome_arquivo)
+        if cabecalho:
+            return cabecalho['tamanho_conteudo'] > 0
         return os.path.exists(nome_arquivo) and os.path.getsize(nome_arquivo) > 500
 
     def arquivo_e_valido(self, nome_arquivo: str) -> bool:
+        cabecalho = self._ler_cabecalho(nome_arquivo)
+        if cabecalho:
+            return not cabecalho['falha'] and cabecalho['tamanho_conteudo'] > 6000
         if not self.arquivo_existe(nome_arquivo):
             return False
         try:
@@ -51,19 +130,25 @@ class CacheManager:
             return False
 
     def carregar_cache(self, nome_arquivo: str) -> str:
+        cabecalho = self._ler_cabecalho(nome_arquivo)
+        if cabecalho:
+            try:
+                with open(nome_arquivo, 'rb') as f:
+                    f.seek(cabecalho['inicio'])
+                    conteudo = zlib.decompress(f.read(cabecalho['tamanho_payload'])).decode('utf-8')
+                if self.limite_espaco:
+                    self.limite_espaco.tocar(nome_arquivo)
+                return conteudo
+            except (OSError, zlib.error, UnicodeDecodeError):
+                return ""
         if not self.arquivo_existe(nome_arquivo):
             return ""
         try:
             with open(nome_arquivo, 'r', encoding='utf-8') as f:
-                linhas = f.readlines()
-                inicio_conteudo = -1
-                for i, linha in enumerate(linhas):
-                    if "CONTEÚDO EXTRAÍDO:" in linha:
-                        inicio_conteudo = i + 2
-                        break
-                if inicio_conteudo > 0:
-                    conteudo = ''.join(linhas[inicio_conteudo:])
-                    return conteudo
+                for linha in f:
+                    if self.MARCADOR_CONTEUDO in linha:
+                        f.readline()
+                        return f.read()
         except Exception as e:
             pass
         return ""
@@ -71,104 +156,199 @@ class CacheManager:
     def salvar_cache(self, conteudo: str, nome_arquivo: str, url: str, link_text: str) -> bool:
         try:
             tamanho_conteudo = len(conteudo.strip())
-            if "EXTRAÇÃO FALHOU" in conteudo or tamanho_conteudo < 500:
+            falha = "EXTRAÇÃO FALHOU" in conteudo
+            if falha or tamanho_conteudo < 500:
                 status = "❌ FALHA"
             elif tamanho_conteudo < 6000:
                 status = "⚠️ PEQUENO"
             else:
                 status = "✅ VÁLIDO"
             
-            with open(nome_arquivo, 'w', encoding='utf-8') as f:
-                f.write(f"CACHE PDF - DJE SCRAPER\n")
-                f.write("=" * 70 + "\n")
-                f.write(f"Data/Hora: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"URL: {url}\n")
-                f.write(f"Link Text: {link_text}\n")
-                f.write(f"Tamanho: {tamanho_conteudo} caracteres\n")
-                f.write(f"Status: {status}\n")
-                f.write("=" * 70 + "\n\n")
-                f.write("CONTEÚDO EXTRAÍDO:\n")
-                f.write("-" * 70 + "\n")
-                f.write(conteudo)
+            metadados = json.dumps({"url": url, "link_text": link_text, "status": status},
+                                   ensure_ascii=False).encode('utf-8')
+            comprimido = zlib.compress(conteudo.encode('utf-8'), self.NIVEL_COMPRESSAO)
+            inicio = CABECALHO.size + len(metadados)
+            with open(nome_arquivo, 'wb') as f:
+                f.write(CABECALHO.pack(ASSINATURA, VERSAO_FORMATO, FLAG_FALHA if falha else 0, 0, inicio,
+                                       len(comprimido), tamanho_conteudo, time.time()))
+                f.write(metadados)
+                f.write(comprimido)
+            self._indexar(nome_arquivo, status, tamanho_conteudo > 0, not falha and tamanho_conteudo > 6000,
+                          tamanho_conteudo, url, link_text)
+            if self.limite_espaco:
+                self.limite_espaco.registrar(nome_arquivo)
             return True
         except Exception as e:
             return False
 
+    def compactar_cache(self) -> int:
+        """Converte os arquivos .txt do formato antigo para o formato compacto. Retorna quantos foram convertidos."""
+        convertidos = 0
+        for arquivo, url, link_text in self._consultar(
+            "SELECT arquivo, url, link_text FROM arquivos WHERE arquivo LIKE '%.txt'"
+        ):
+            caminho = os.path.join(self.cache_dir, arquivo)
+            if self._ler_cabecalho(caminho):
+                continue
+            conteudo = self.carregar_cache(caminho)
+            if not conteudo:
+                continue
+            novo = os.path.splitext(caminho)[0] + self.EXTENSAO
+            if self.salvar_cache(conteudo, novo, url, link_text):
+                self._remover([arquivo])
+                convertidos += 1
+        return convertidos
+
+    def _indexar(self, nome_arquivo: str, status: Optional[str], existe: bool, valido: bool,
+                 tamanho_conteudo: int, url: Optional[str], link_text: Optional[str]):
+        stat = os.stat(nome_arquivo)
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.basename(nome_arquivo), status, int(existe), int(existe and valido), stat.st_size,
+                 tamanho_conteudo, url, link_text, stat.st_mtime)
+            )
+
+    def _indexar_arquivo_existente(self, caminho: str):
+        """Lê o cabeçalho de um arquivo que não passou por salvar_cache e o registra no índice."""
+        compacto = self._ler_cabecalho(caminho)
+        if compacto:
+            self._indexar(caminho, compacto.get('status'), compacto['tamanho_conteudo'] > 0,
+                          not compacto['falha'] and compacto['tamanho_conteudo'] > 6000,
+                          compacto['tamanho_conteudo'], compacto.get('url'), compacto.get('link_text'))
+            return
+        cabecalho = {}
+        tamanho_conteudo = 0
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    if linha.startswith(self.MARCADOR_CONTEUDO):
+                        f.readline()
+                        tamanho_conteudo = len(f.read().strip())
+                        break
+                    chave, separador, valor = linha.partition(': ')
+                    if separador:
+                        cabecalho.setdefault(chave, valor.strip())
+        except Exception:
+            pass
+        self._indexar(caminho, cabecalho.get('Status'), self.arquivo_existe(caminho), self.arquivo_e_valido(caminho),
+                      tamanho_conteudo, cabecalho.get('URL'), cabecalho.get('Link Text'))
+
+    def sincronizar_indice(self):
+        """
+        Confere o índice com a pasta usando apenas os metadados dos arquivos (stat): remove entradas
+        de arquivos apagados e indexa os novos ou alterados fora de salvar_cache.
+        """
+        try:
+            em_disco = {}
+            with os.scandir(self.cache_dir) as entradas:
+                for entrada in entradas:
+                    if entrada.name.endswith(self.EXTENSOES) and entrada.is_file():
+                        stat = entrada.stat()
+                        em_disco[entrada.name] = (stat.st_size, stat.st_mtime)
+        except OSError:
+            return
+        with self._lock:
+            indexados = {arquivo: (tamanho, mtime) for arquivo, tamanho, mtime in
+                         self._conexao.execute("SELECT arquivo, tamanho_arquivo, mtime FROM arquivos")}
+        removidos = [(arquivo,) for arquivo in indexados if arquivo not in em_disco]
+        if removidos:
+            with self._lock, self._conexao:
+                self._conexao.executemany("DELETE FROM arquivos WHERE arquivo = ?", removidos)
+        for arquivo, metadados in em_disco.items():
+            if indexados.get(arquivo) != metadados:
+                self._indexar_arquivo_existente(os.path.join(self.cache_dir, arquivo))
+
+    def _consultar(self, sql: str, parametros: Tuple = ()) -> List[Tuple]:
+        self.sincronizar_indice()
+        with self._lock:
+            return self._conexao.execute(sql, parametros).fetchall()
+
+    def _remover(self, arquivos: List[str]) -> int:
+        removidos = 0
+        for arquivo in arquivos:
+            try:
+                os.remove(os.path.join(self.cache_dir, arquivo))
+                removidos += 1
+            except FileNotFoundError:
+                pass
+        with self._lock, self._conexao:
+            self._conexao.executemany("DELETE FROM arquivos WHERE arquivo = ?", [(a,) for a in arquivos])
+        return removidos
+
+    def consultar_entrada(self, nome_arquivo: str) -> Optional[Dict]:
+        """Metadados indexados de um arquivo do cache (status, tamanhos, URL, link, mtime)."""
+        self.sincronizar_indice()
+        with self._lock:
+            cursor = self._conexao.execute(
+                "SELECT * FROM arquivos WHERE arquivo = ?", (os.path.basename(nome_arquivo),)
+            )
+            linha = cursor.fetchone()
+            colunas = [coluna[0] for coluna in cursor.description]
+        return dict(zip(colunas, linha)) if linha else None
+
+    def fechar(self):
+        try:
+            self._conexao.close()
+        except Exception:
+            pass
+
     def listar_arquivos_cache(self) -> List[str]:
         try:
-            arquivos = []
-            for arquivo in os.listdir(self.cache_dir):
-                if arquivo.endswith('.txt'):
-                    caminho_completo = os.path.join(self.cache_dir, arquivo)
-                    if self.arquivo_existe(caminho_completo):
-                        arquivos.append(caminho_completo)
-            return sorted(arquivos)
+            linhas = self._consultar("SELECT arquivo FROM arquivos WHERE existe = 1 ORDER BY arquivo")
+            return [os.path.join(self.cache_dir, arquivo) for arquivo, in linhas]
         except Exception:
             return []
 
     def listar_arquivos_validos(self) -> List[str]:
         try:
-            arquivos_validos = []
-            for arquivo in os.listdir(self.cache_dir):
-                if arquivo.endswith('.txt'):
-                    caminho_completo = os.path.join(self.cache_dir, arquivo)
-                    if self.arquivo_e_valido(caminho_completo):
-                        arquivos_validos.append(caminho_completo)
-            return sorted(arquivos_validos)
+            linhas = self._consultar("SELECT arquivo FROM arquivos WHERE valido = 1 ORDER BY arquivo")
+            return [os.path.join(self.cache_dir, arquivo) for arquivo, in linhas]
         except Exception:
             return []
 
-    def limpar_cache_antigo(self, dias: int = 30):
+    def limpar_cache_antigo(self, dias: int = 30) -> int:
+        """Remove os arquivos do cache com mais de `dias` dias. Retorna quantos foram removidos."""
+        removidos = 0
         try:
             limite_tempo = time.time() - (dias * 24 * 60 * 60)
-            removidos = 0
+            antigos = [arquivo for arquivo, in self._consultar("SELECT arquivo FROM arquivos WHERE mtime < ?", (limite_tempo,))]
+            removidos = self._remover(antigos)
+            # Outros arquivos da pasta (não indexados) continuam sendo limpos pela data de modificação
             for arquivo in os.listdir(self.cache_dir):
                 caminho = os.path.join(self.cache_dir, arquivo)
-                if os.path.isfile(caminho):
-                    if os.path.getmtime(caminho) < limite_tempo:
-                        os.remove(caminho)
-                        removidos += 1
+                if arquivo.endswith(self.EXTENSOES) or arquivo.startswith(self.NOME_INDICE) or not os.path.isfile(caminho):
+                    continue
+                if os.path.getmtime(caminho) < limite_tempo:
+                    os.remove(caminho)
+                    removidos += 1
         except Exception:
             pass
+        return removidos
 
-    def limpar_cache_falhado(self):
+    def limpar_cache_falhado(self) -> int:
+        """Remove os arquivos de extrações que falharam. Retorna quantos foram removidos."""
         try:
-            removidos = 0
-            for arquivo in os.listdir(self.cache_dir):
-                if arquivo.endswith('.txt'):
-                    caminho = os.path.join(self.cache_dir, arquivo)
-                    if not self.arquivo_e_valido(caminho):
-                        os.remove(caminho)
-                        removidos += 1
+            return self._remover([arquivo for arquivo, in self._consultar("SELECT arquivo FROM arquivos WHERE valido = 0")])
         except Exception:
-            pass
+            return 0
 
     def estatisticas_cache(self) -> dict:
         try:
-            arquivos_todos = []
-            arquivos_validos = []
-            arquivos_falhados = []
-            for arquivo in os.listdir(self.cache_dir):
-                if arquivo.endswith('.txt'):
-                    caminho = os.path.join(self.cache_dir, arquivo)
-                    if os.path.exists(caminho):
-                        arquivos_todos.append(caminho)
-                        if self.arquivo_e_valido(caminho):
-                            arquivos_validos.append(caminho)
-                        else:
-                            arquivos_falhados.append(caminho)
-            
-            tamanho_total = sum(os.path.getsize(f) for f in arquivos_todos)
-            tamanho_validos = sum(os.path.getsize(f) for f in arquivos_validos)
+            total, validos, tamanho_total, tamanho_validos, mais_recente = self._consultar("""
+                SELECT COUNT(*), COALESCE(SUM(valido), 0), COALESCE(SUM(tamanho_arquivo), 0),
+                       COALESCE(SUM(CASE WHEN valido = 1 THEN tamanho_arquivo ELSE 0 END), 0), MAX(mtime)
+                FROM arquivos
+            """)[0]
             
             return {
-                "total": len(arquivos_todos),
-                "validos": len(arquivos_validos),
-                "falhados": len(arquivos_falhados),
+                "total": total,
+                "validos": validos,
+                "falhados": total - validos,
                 "tamanho_mb": round(tamanho_total / (1024 * 1024), 2),
                 "tamanho_validos_mb": round(tamanho_validos / (1024 * 1024), 2),
-                "mais_recente": max(os.path.getmtime(f) for f in arquivos_todos) if arquivos_todos else 0,
-                "taxa_sucesso": round((len(arquivos_validos) / len(arquivos_todos)) * 100, 1) if arquivos_todos else 0
+                "mais_recente": mais_recente or 0,
+                "taxa_sucesso": round((validos / total) * 100, 1) if total else 0
             }
         except Exception:
             return {"total": 0, "validos": 0, "falhados": 0, "tamanho_mb": 0}
@@ -0,0 +1,100 @@
+import os
+import json
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.publicacao import Publicacao
+from utils.config import Config
+
+
+class CheckpointBusca:
+    """
+    Registro em disco do andamento da busca de uma data (ou período): um arquivo JSONL por busca,
+    com uma linha por link concluído (chave do link, sua posição na lista e publicações extraídas).
+    Cada linha é gravada e sincronizada assim que o link termina, então uma execução interrompida
+    perde no máximo o link em andamento; a próxima execução para a mesma busca pula os links
+    registrados. Os links são reconhecidos pela chave (URL, onclick ou texto da linha; ver
+    LinkResultado.chave), não pela posição, que muda se a lista do DJE ganhar itens; a posição
+    só serve para ordenar.
+    Junto de cada link vai o SHA-256 dos PDFs das publicações, para que o arquivo seja encontrado
+    mesmo depois de movido ou renomeado (ex.: PDFs das sessões paralelas levados à pasta principal).
+    """
+
+    def __init__(self, data_busca: str, data_fim: Optional[str] = None, pasta: Optional[str] = None):
+        self.data_busca = data_busca
+        self.data_fim = data_fim
+        self.pasta = pasta or Config.CHECKPOINTS_DIR
+        os.makedirs(self.pasta, exist_ok=True)
+        nome = data_busca.replace('/', '-')
+        if data_fim and data_fim != data_busca:
+            nome += f"_{data_fim.replace('/', '-')}"
+        self.caminho = os.path.join(self.pasta, f"busca_{nome}.jsonl")
+        self._lock = threading.Lock()
+        # chave do link -> (posição na lista, publicações, PDFs por arquivo_cache)
+        self._concluidos: Dict[str, Tuple[int, List[dict], Dict[str, str]]] = self._carregar()
+
+    def _carregar(self) -> Dict[str, Tuple[int, List[dict], Dict[str, str]]]:
+        concluidos = {}
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                        if not isinstance(registro['link'], str):
+                            continue
+                        concluidos[registro['link']] = (int(registro['indice']), registro.get('publicacoes', []),
+                                                        registro.get('pdfs') or {})
+                    except (ValueError, KeyError, TypeError):
+                        continue # Linha incompleta de uma gravação interrompida
+        except FileNotFoundError:
+            pass
+        return concluidos
+
+    def concluido(self, chave: str) -> bool:
+        return chave in self._concluidos
+
+    def registrar(self, chave: str, indice: int, publicacoes: List[Publicacao],
+                  pdfs: Optional[Dict[str, str]] = None):
+        """
+        Marca o link `chave` (na posição `indice` da lista) como concluído, gravando as publicações
+        que ele gerou (pode ser nenhuma). `pdfs` associa o arquivo_cache das publicações ao SHA-256 do PDF.
+        """
+        dados = [publicacao.to_dict() for publicacao in publicacoes]
+        pdfs = {arquivo: sha256 for arquivo, sha256 in (pdfs or {}).items() if sha256}
+        linha = json.dumps({"link": chave, "indice": indice, "publicacoes": dados, "pdfs": pdfs}, ensure_ascii=False)
+        with self._lock:
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(linha + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._concluidos[chave] = (indice, dados, pdfs)
+
+    def publicacoes(self, localizar_pdf: Optional[Callable[[str], Optional[str]]] = None) -> List[Tuple[int, Publicacao]]:
+        """
+        Publicações já registradas, como pares (posição do link, publicação), na ordem da lista.
+        Com `localizar_pdf` (SHA-256 -> arquivo_cache atual), o arquivo_cache gravado é trocado pelo
+        local atual do PDF.
+        """
+        with self._lock:
+            itens = sorted(self._concluidos.values(), key=lambda item: item[0])
+        resultado = []
+        for indice, lista, pdfs in itens:
+            for dados in lista:
+                publicacao = Publicacao.from_dict(dict(dados))
+                sha256 = pdfs.get(publicacao.arquivo_cache or '')
+                if sha256 and localizar_pdf:
+                    publicacao.arquivo_cache = localizar_pdf(sha256) or publicacao.arquivo_cache
+                resultado.append((indice, publicacao))
+        return resultado
+
+    def quantidade_links(self) -> int:
+        return len(self._concluidos)
+
+    def remover(self):
+        """Apaga o checkpoint (a próxima execução para a data recomeça do zero)."""
+        with self._lock:
+            self._concluidos = {}
+            try:
+                os.remove(self.caminho)
+            except FileNotFoundError:
+                pass
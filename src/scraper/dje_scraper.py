@@ -1,13 +1,13 @@
 import time
 import os
-import json
+import zlib
 import shutil
-from typing import List, Dict, Optional
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator, Sequence, Union, Callable
 from datetime import datetime
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -15,30 +15,85 @@ from selenium.webdriver.support import expected_conditions as EC
 # Importações para a API e modelos
 from api.api_client import JusAPIClient
 from models.publicacao import Publicacao
+from models.publicacao_batch import PublicacaoBatch
 from extraction.data_extractor import DataExtractor
-
-try:
-    import PyPDF2
-except ImportError:
-    PyPDF2 = None
-try:
-    import pdfplumber
-except ImportError:
-    pdfplumber = None
+from extraction.pdf_reader import iterar_paginas, ler_pdf
+from utils.config import Config
+from utils.jsonl import GravadorJSONL
+from utils.logger import get_logger
+from .checkpoint import CheckpointBusca
+from .link_resultado import LinkResultado
+from .driver_pool import DriverPool, SessaoNavegador, criar_driver_chrome
+from .limite_espaco import LimiteEspaco
 
 try:
     from .frame_handler import FrameHandler
+    from .wait_policy import WaitPolicy
+    from .pdf_index import PDFIndex
+    from .text_cache import PDFTextCache
 except ImportError:
     print("Erro: frame_handler.py não encontrado. Certifique-se de que está na pasta correta ou o caminho de importação está certo.")
     exit(1)
 
 
 DJE_BASE_URL = 'https://dje.tjsp.jus.br/cdje/index.do'
+# Link para a próxima página da lista de resultados ("Próxima>")
+XPATH_PROXIMA_PAGINA = "//a[starts-with(normalize-space(.), 'Próxima')]"
+
+_data_extractor_processo = None
+
+
+def _extrair_dados_texto(conteudo: Union[str, Iterable[str]]) -> List[Dict]:
+    """
+    Extrai as publicações de RPV/INSS de um PDF (uma página do DJE costuma ter várias), a partir
+    do texto inteiro ou das páginas uma a uma. Retorna apenas tipos simples (dict/str/float) para
+    que o resultado possa voltar de um processo do pool; lista vazia se o texto não for aproveitável.
+    """
+    global _data_extractor_processo
+    if _data_extractor_processo is None:
+        _data_extractor_processo = DataExtractor()
+    
+    return [{
+        'numero_processo': dados['processo'],
+        'data_disponibilizacao': dados['data'],
+        'autores': dados['autores'],
+        'advogados': dados['advogados'],
+        'valor_principal': dados['valores']['principal'],
+        'valor_juros': dados['valores']['juros'],
+        'honorarios': dados['valores']['honorarios'],
+        'conteudo_completo': dados['conteudo']
+    } for dados in _data_extractor_processo.extrair_publicacoes_relevantes(conteudo)]
+
+
+def _extrair_dados_pdf(caminho_arquivo: str) -> Tuple[bytes, List[Dict]]:
+    """
+    Lê e extrai um único PDF página a página, sem montar o texto inteiro em memória.
+    Retorna (texto comprimido com zlib, publicações); o texto vai para o cache de textos e é
+    vazio se o PDF não tiver texto.
+    """
+    compressor = zlib.compressobj(PDFTextCache.NIVEL_COMPRESSAO)
+    partes = []
+    tem_texto = False
+    
+    def paginas():
+        nonlocal tem_texto
+        for pagina in iterar_paginas(caminho_arquivo):
+            tem_texto = tem_texto or bool(pagina.strip())
+            partes.append(compressor.compress(pagina.encode('utf-8')))
+            yield pagina
+    
+    publicacoes = _extrair_dados_texto(paginas())
+    partes.append(compressor.flush())
+    return (b''.join(partes) if tem_texto else b''), publicacoes
 
 
 class DJEScraperDownload:
-    def __init__(self, pasta_download="./downloads_dje"):
+    def __init__(self, pasta_download="./downloads_dje", indice: Optional['PDFIndex'] = None,
+                 pool: Optional[DriverPool] = None, limite_espaco: Optional[LimiteEspaco] = None):
         self.driver = None
+        self.pool = pool
+        self.limite_espaco = limite_espaco
+        self.sessao_navegador: Optional[SessaoNavegador] = None
         self.wait = None
         self.pasta_download = os.path.abspath(pasta_download)
         self.janelas_abertas = []
@@ -46,41 +101,40 @@ class DJEScraperDownload:
         os.makedirs(self.pasta_download, exist_ok=True)
         os.makedirs(os.path.join(self.pasta_download, "duplicatas"), exist_ok=True)
 
-        self.frame_handler = FrameHandler(pasta_download)
+        self.espera = WaitPolicy()
+        self.frame_handler = FrameHandler(pasta_download, espera=self.espera, indice=indice,
+                                          limite_espaco=limite_espaco)
+        self.indice = self.frame_handler.indice
+        self.cache_texto = None
         self.data_extractor = DataExtractor()
+        self.busca_concluida = False
+        self.links_com_falha = 0
+        self.prefetch_paginas = Config.RESULTS_PREFETCH
+        self.janela_resultados = None
+        self.janela_prefetch = None
+        self._busca = None
+        self.logger = get_logger('dje_scraper')
 
     def _setup_driver(self):
-        """Configura o navegador Chrome para automação e downloads."""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        prefs = {
-            "download.default_directory": self.pasta_download,
-            "download.prompt_for_download": False,
-            "plugins.always_open_pdf_externally": True,
-            "profile.default_content_settings.popups": 0,
-            "profile.default_content_setting_values.automatic_downloads": 1,
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        
-        service = Service()
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        """
+        Configura o navegador Chrome para automação e downloads. Com um DriverPool, usa uma
+        sessão já aberta do pool em vez de iniciar um Chrome novo.
+        """
+        if self.pool:
+            self.sessao_navegador = self.pool.adquirir()
+            self.driver = self.sessao_navegador.driver
+        else:
+            self.driver = criar_driver_chrome(self.pasta_download)
         self.wait = WebDriverWait(self.driver, 30)
         self.frame_handler.set_driver(self.driver, self.wait)
 
-    def _configurar_busca(self, data: str):
-        """Preenche o formulário de busca no site do DJE."""
+    def _configurar_busca(self, data: str, data_fim: Optional[str] = None):
+        """Preenche o formulário de busca no site do DJE (período de `data` a `data_fim`, se informada)."""
+        data_fim = data_fim or data
         self.wait.until(EC.presence_of_element_located((By.NAME, "dadosConsulta.dtInicio")))
         self.driver.execute_script(f"""
             document.getElementsByName('dadosConsulta.dtInicio')[0].value = '{data}';
-            document.getElementsByName('dadosConsulta.dtFim')[0].value = '{data}';
+            document.getElementsByName('dadosConsulta.dtFim')[0].value = '{data_fim}';
             var select = document.getElementsByName('dadosConsulta.cdCaderno')[0];
             for(var i = 0; i < select.options.length; i++) {{
                 if(select.options[i].text.includes('caderno 3') && 
@@ -98,74 +152,230 @@ class DJEScraperDownload:
             EC.element_to_be_clickable((By.XPATH, "//input[@value='Pesquisar']"))
         )
         btn_pesquisar.click()
-        time.sleep(5)
+        pagina_recarregada = EC.staleness_of(btn_pesquisar)
+        self.espera.aguardar(
+            'resultado_busca',
+            lambda d: pagina_recarregada(d) or d.find_elements(By.XPATH, "//a[@title='Visualizar']"),
+            Config.PAGE_LOAD_TIMEOUT
+        )
+        self.espera.documento_pronto('resultado_busca', Config.PAGE_LOAD_TIMEOUT)
 
     def _encontrar_links(self) -> List:
         """Encontra todos os links de 'Visualizar' na página de resultados."""
         links = self.driver.find_elements(By.XPATH, "//a[@title='Visualizar']")
         return links
 
-    def _processar_link(self, link, index: int) -> Optional[Publicacao]:
+    def _capturar_links(self, pagina: int, deslocamento: int) -> List[LinkResultado]:
+        """
+        Lê de uma vez, como dados simples, os links de 'Visualizar' da página de resultados atual:
+        href, onclick e o texto do link e da linha (que identifica o link quando não há URL).
+        """
+        dados = self.driver.execute_script("""
+            return Array.prototype.map.call(document.querySelectorAll("a[title='Visualizar']"), function(a, i) {
+                var linha = a.closest('tr') || a.parentElement;
+                return {posicao: i, href: a.getAttribute('href'), onclick: a.getAttribute('onclick'),
+                        texto: a.textContent, linha: linha ? linha.textContent : ''};
+            });
+        """) or []
+        url_base = self.driver.current_url
+        return [LinkResultado.from_dados(item, url_base, deslocamento + n, pagina) for n, item in enumerate(dados)]
+
+    def _paginas_resultado(self) -> Iterator[Tuple[int, List[LinkResultado]]]:
+        """
+        Percorre as páginas da lista de resultados, devolvendo (número da página, links) assim que
+        cada uma fica disponível. Os índices dos links são contínuos entre páginas (a página 2
+        começa depois do último link da 1). Antes de entregar uma página, a seguinte já começa a
+        carregar em outra aba (prefetch), então ao terminar os links atuais a próxima lista já está
+        pronta. Se o prefetch não for possível, avança na própria aba depois de processar a página.
+        """
+        pagina = 1
+        deslocamento = 0
+        self.janela_resultados = self.driver.current_window_handle
+        while True:
+            prefetch = self._carregar_proxima_pagina_em_segundo_plano() if self.prefetch_paginas else None
+            if prefetch is False:
+                # A navegação atingiu a própria aba: refaz a busca até esta página, sem prefetch
+                self.prefetch_paginas = False
+                self._reabrir_pagina(pagina)
+            links = self._capturar_links(pagina, deslocamento)
+            self._contar_paginas()
+            
+            yield pagina, links
+            
+            deslocamento += len(links)
+            if prefetch and self._trocar_para_prefetch():
+                pass
+            elif not self._avancar_pagina():
+                return
+            pagina += 1
+
+    def _carregar_proxima_pagina_em_segundo_plano(self):
+        """
+        Abre a próxima página de resultados em uma aba nomeada, sem sair da atual. Links com URL
+        são abertos direto; links em JavaScript (que enviam o formulário da busca) são acionados
+        com os formulários apontando para a aba nova. Retorna o handle da aba, None se não houver
+        próxima página, ou False se a aba atual acabou navegando.
+        """
+        proximos = self.driver.find_elements(By.XPATH, XPATH_PROXIMA_PAGINA)
+        if not proximos:
+            return None
+        
+        antes = set(self.driver.window_handles)
+        marca = f"dje_{time.time()}"
+        self.driver.execute_script("window.__djeMarca = arguments[0];", marca)
+        self.driver.execute_script("""
+            var link = arguments[0], alvo = 'dje_proxima_pagina';
+            var href = link.getAttribute('href') || '';
+            if (href && href !== '#' && href.indexOf('javascript:') !== 0) { window.open(link.href, alvo); return; }
+            window.open('about:blank', alvo);
+            var formularios = Array.prototype.slice.call(document.forms);
+            var anteriores = formularios.map(function(f) { return f.target; });
+            formularios.forEach(function(f) { f.target = alvo; });
+            try { link.click(); } finally { formularios.forEach(function(f, i) { f.target = anteriores[i]; }); }
+        """, proximos[0])
+        
+        nova = self.espera.aguardar('nova_janela', lambda d: set(d.window_handles) - antes, 5)
+        self.driver.switch_to.window(self.janela_resultados)
+        if self.driver.execute_script("return window.__djeMarca;") != marca:
+            if nova:
+                self._fechar_janela(next(iter(nova)))
+            return False
+        if not nova:
+            return None
+        self.janela_prefetch = next(iter(nova))
+        return self.janela_prefetch
+
+    def _trocar_para_prefetch(self) -> bool:
         """
-        Processa um único link, baixa o PDF, extrai o conteúdo e retorna um objeto Publicacao.
+        Passa a usar a aba carregada em segundo plano como lista de resultados, depois de ela sair
+        de about:blank e mostrar a lista (links de 'Visualizar' ou a paginação). Se isso não
+        acontecer no prazo, descarta a aba, volta para a lista atual e retorna False.
+        """
+        anterior, prefetch, self.janela_prefetch = self.janela_resultados, self.janela_prefetch, None
+        self.driver.switch_to.window(prefetch)
+        if not self.espera.aguardar('resultado_busca', self._lista_resultados_pronta, Config.PAGE_LOAD_TIMEOUT):
+            self._fechar_janela(prefetch)
+            self.driver.switch_to.window(anterior)
+            return False
+        self.janela_resultados = prefetch
+        self._fechar_janela(anterior)
+        return True
+
+    @staticmethod
+    def _lista_resultados_pronta(driver) -> bool:
+        return driver.execute_script("""
+            if (location.href === 'about:blank' || document.readyState !== 'complete') return false;
+            return document.querySelector("a[title='Visualizar']") !== null ||
+                Array.prototype.some.call(document.links, function(a) {
+                    return /^(Próxima|Anterior)/.test(a.textContent.trim());
+                });
+        """)
+
+    def _avancar_pagina(self) -> bool:
+        """Clica em 'Próxima' na aba atual e aguarda a nova lista; False se não houver próxima página."""
+        proximos = self.driver.find_elements(By.XPATH, XPATH_PROXIMA_PAGINA)
+        if not proximos:
+            return False
+        self.driver.execute_script("arguments[0].click();", proximos[0])
+        self.espera.aguardar('resultado_busca', EC.staleness_of(proximos[0]), Config.PAGE_LOAD_TIMEOUT)
+        self.espera.documento_pronto('resultado_busca', Config.PAGE_LOAD_TIMEOUT)
+        return True
+
+    def _reabrir_pagina(self, pagina: int):
+        """Refaz a busca e avança, na própria aba, até a página informada."""
+        self.driver.get(DJE_BASE_URL)
+        self._configurar_busca(*self._busca)
+        self._executar_busca()
+        for _ in range(pagina - 1):
+            if not self._avancar_pagina():
+                break
+        self.janela_resultados = self.driver.current_window_handle
+
+    def _fechar_janela(self, janela: str):
+        try:
+            self.driver.switch_to.window(janela)
+            self.driver.close()
+        except Exception:
+            pass
+        if self.janela_resultados and janela != self.janela_resultados:
+            self.driver.switch_to.window(self.janela_resultados)
+
+    def _processar_link(self, link: LinkResultado) -> Optional[List[Publicacao]]:
+        """
+        Processa um único link, baixa o PDF, extrai o conteúdo e retorna uma Publicacao para
+        cada publicação relevante da página. Retorna None se o link não pôde ser lido (janela
+        não abriu, erro, download falhou), para distinguir de uma página sem publicações relevantes.
+        Com a URL do link conhecida, o PDF é baixado direto por HTTP; se não der certo (ou sem
+        URL), o link é aberto no navegador, pela URL ou clicando de novo no link da mesma posição.
         """
         original_window = self.driver.current_window_handle
+        self._contar_paginas()
         conteudo = ""
+        if link.url:
+            conteudo = self.frame_handler.extrair_conteudo_url(link.url, referer=self.driver.current_url) or ""
         
         try:
-            self.frame_handler._registrar_arquivos_existentes()
-            self.driver.execute_script("arguments[0].click();", link)
-            
-            start_time = time.time()
-            while len(self.driver.window_handles) <= 1 and time.time() - start_time < 15:
-                time.sleep(0.5)
-            
-            if len(self.driver.window_handles) <= 1:
-                return None
-            
-            nova_janela = None
-            for window in self.driver.window_handles:
-                if window != original_window:
-                    nova_janela = window
-                    break
-            
-            if nova_janela:
-                self.driver.switch_to.window(nova_janela)
-                self.janelas_abertas.append(nova_janela)
-                
-                conteudo = self.frame_handler.extrair_conteudo_pdf()
-                time.sleep(2)
-                
-                self.driver.close()
-                if nova_janela in self.janelas_abertas:
-                    self.janelas_abertas.remove(nova_janela)
-            
-            self.driver.switch_to.window(original_window)
-            
+            if not conteudo:
+                conteudo = self._abrir_link_no_navegador(link, original_window)
         except Exception:
+            self.espera.registrar_resultado('entre_links', False, Config.EXTRACTION_PAUSE)
             try:
                 self.driver.switch_to.window(original_window)
             except:
                 pass
             return None
         
-        if self.data_extractor.is_conteudo_relevante(conteudo):
-            dados = self.data_extractor.extrair_dados(conteudo)
-            arquivo_pdf_nome = self._identificar_ultimo_pdf_por_tempo()
-            
-            return Publicacao(
-                numero_processo=dados['processo'],
-                data_disponibilizacao=dados['data'],
-                autores=dados['autores'],
-                advogados=dados['advogados'],
-                valor_principal=dados['valores']['principal'],
-                valor_juros=dados['valores']['juros'],
-                honorarios=dados['valores']['honorarios'],
-                conteudo_completo=conteudo, # Passando o conteúdo completo aqui
-                url_publicacao=self.driver.current_url,
-                arquivo_cache=arquivo_pdf_nome # Usando arquivo_cache como no modelo
+        lido = bool(conteudo) and not conteudo.startswith('DOWNLOAD_FALHOU')
+        self.espera.registrar_resultado('entre_links', lido, Config.EXTRACTION_PAUSE)
+        if not lido:
+            return None
+        
+        # O conteúdo devolvido pelo frame_handler só valida o download: as publicações saem do
+        # PDF lido página a página, sem montar o texto inteiro em memória
+        caminho_pdf = os.path.join(self.pasta_download, self.frame_handler.ultimo_arquivo or '')
+        if self.frame_handler.ultimo_arquivo and os.path.isfile(caminho_pdf):
+            publicacoes = _extrair_dados_texto(iterar_paginas(caminho_pdf))
+        else:
+            publicacoes = _extrair_dados_texto(conteudo)
+        if not publicacoes:
+            return []
+        
+        arquivo_pdf_nome = self.frame_handler.ultimo_arquivo or self._identificar_ultimo_pdf_por_tempo()
+        if arquivo_pdf_nome:
+            self.indice.atualizar_processo(
+                os.path.join(self.pasta_download, arquivo_pdf_nome), publicacoes[0]['numero_processo']
             )
-        return None
+        
+        url_publicacao = link.url or self.driver.current_url
+        return [Publicacao(url_publicacao=url_publicacao, arquivo_cache=arquivo_pdf_nome, **dados)
+                for dados in publicacoes]
+
+    def _abrir_link_no_navegador(self, link: LinkResultado, original_window: str) -> Optional[str]:
+        """Abre o link em uma nova janela, extrai o conteúdo do PDF e volta à lista de resultados."""
+        self.frame_handler._registrar_arquivos_existentes()
+        janelas_antes = set(self.driver.window_handles)
+        if link.url:
+            self.driver.execute_script("window.open(arguments[0], '_blank');", link.url)
+        else:
+            # Sem URL conhecida: o elemento é localizado de novo agora, pela posição na página
+            elemento = self._encontrar_links()[link.posicao]
+            self.driver.execute_script("arguments[0].click();", elemento)
+        
+        novas = self.espera.aguardar('nova_janela', lambda d: set(d.window_handles) - janelas_antes, 15)
+        if not novas:
+            return None
+        
+        nova_janela = next(iter(novas))
+        self.driver.switch_to.window(nova_janela)
+        self.janelas_abertas.append(nova_janela)
+        
+        conteudo = self.frame_handler.extrair_conteudo_pdf()
+        
+        self.driver.close()
+        if nova_janela in self.janelas_abertas:
+            self.janelas_abertas.remove(nova_janela)
+        self.driver.switch_to.window(original_window)
+        return conteudo
 
     def _identificar_ultimo_pdf_por_tempo(self) -> Optional[str]:
         """Identifica o PDF mais recente por data de modificação na pasta de downloads."""
@@ -191,44 +401,228 @@ class DJEScraperDownload:
         except Exception:
             return None
 
-    def executar(self, data_busca: str) -> List[Publicacao]:
-        """Executa o processo completo de scraping do site, incluindo download e extração."""
+    def executar(self, data_busca: str, sessoes: Optional[int] = None,
+                 ao_extrair: Optional[Callable[[List[Publicacao]], None]] = None,
+                 retomar: bool = True, data_fim: Optional[str] = None) -> Sequence[Publicacao]:
+        """
+        Executa o processo completo de scraping do site, incluindo download e extração.
+        Com sessoes > 1 (padrão: MAX_BROWSER_SESSIONS) os links são divididos entre várias
+        sessões independentes do navegador.
+        `ao_extrair`, se informado, recebe as publicações de cada link assim que são extraídas
+        (ex.: FilaEnvio.enfileirar), sem esperar o fim da busca; pode ser chamado de várias threads.
+        Com `retomar`, cada link concluído fica registrado no CheckpointBusca da data: uma nova
+        execução pula esses links e reaproveita suas publicações. Se a execução falhar no meio,
+        retorna o que já foi extraído. Com `data_fim`, a busca cobre o período inteiro.
+        Ao final, `busca_concluida` indica se todos os links foram processados sem falha; nesse
+        caso o checkpoint é apagado, e uma nova execução para a mesma busca consulta o DJE de novo.
+        """
+        checkpoint = CheckpointBusca(data_busca, data_fim) if retomar else None
+        sessoes = sessoes or Config.MAX_BROWSER_SESSIONS
+        if sessoes > 1:
+            publicacoes = self._executar_paralelo(data_busca, sessoes, ao_extrair, checkpoint, data_fim)
+        else:
+            publicacoes = self._executar_sessao_unica(data_busca, ao_extrair, checkpoint, data_fim)
+        if checkpoint and self.busca_concluida:
+            checkpoint.remover()
+        return publicacoes
+
+    def _executar_sessao_unica(self, data_busca: str,
+                               ao_extrair: Optional[Callable[[List[Publicacao]], None]] = None,
+                               checkpoint: Optional[CheckpointBusca] = None,
+                               data_fim: Optional[str] = None) -> Sequence[Publicacao]:
+        """Executa a busca em uma única sessão do navegador, processando todos os links."""
+        resultados = checkpoint.publicacoes(self._localizar_pdf) if checkpoint else []
+        self.busca_concluida = False
+        self.links_com_falha = 0
         try:
-            self._setup_driver()
-            self.driver.get(DJE_BASE_URL)
-            self._configurar_busca(data_busca)
-            self._executar_busca()
-            
-            links = self._encontrar_links()
-            publicacoes = []
-            processos_encontrados = set()
-            
+            self._iniciar_sessao(data_busca, data_fim)
             self.frame_handler.reset_contador()
             
-            for i, link in enumerate(links):
-                if i > 0 and i % 3 == 0: self._limpar_janelas_extras(); time.sleep(2)
-                
-                publicacao = self._processar_link(link, i)
-                
-                if publicacao:
-                    numero_processo = publicacao.numero_processo #
-                    if numero_processo and numero_processo in processos_encontrados:
-                        if publicacao.arquivo_cache: self._mover_pdf_duplicado(publicacao.arquivo_cache) #
-                        continue
-                    
-                    if numero_processo: processos_encontrados.add(numero_processo)
-                    publicacoes.append(publicacao)
-                
-                time.sleep(4) # Pausa maior entre processamentos para estabilidade
-            
-            return publicacoes
+            self._processar_paginas(lambda i: True, ao_extrair, checkpoint, resultados)
+            self.busca_concluida = self.links_com_falha == 0
+        except Exception:
+            pass
+        finally:
+            self._encerrar_sessao()
+        return self._consolidar_resultados(resultados)
+
+    def _iniciar_sessao(self, data_busca: str, data_fim: Optional[str] = None):
+        """Abre o navegador, acessa o DJE e executa a busca para a data (ou período) informada."""
+        self._busca = (data_busca, data_fim)
+        self._setup_driver()
+        if not (self.sessao_navegador and self.sessao_navegador.na_pagina_inicial):
+            self.driver.get(DJE_BASE_URL)
+        if self.sessao_navegador:
+            self.sessao_navegador.na_pagina_inicial = False
+        self._configurar_busca(data_busca, data_fim)
+        self._executar_busca()
+
+    def _encerrar_sessao(self):
+        """Fecha janelas extras e encerra o navegador (ou o devolve ao pool)."""
+        self._limpar_janelas_extras()
+        if self.sessao_navegador:
+            self.pool.devolver(self.sessao_navegador)
+        elif self.driver:
+            self.driver.quit()
+        self.sessao_navegador = None
+        self.driver = None
+        self.janela_resultados = None
+        self.janela_prefetch = None
+        self.frame_handler.fechar()
+        self.espera.registrar_relatorio()
+        self._mostrar_resumo_downloads()
+
+    def _contar_paginas(self, quantidade: int = 1):
+        """Contabiliza páginas carregadas na sessão do pool (usado para decidir a reciclagem)."""
+        if self.sessao_navegador:
+            self.sessao_navegador.contar_pagina(quantidade)
+
+    def _processar_paginas(self, selecionar: Callable[[int], bool],
+                           ao_extrair: Optional[Callable[[List[Publicacao]], None]] = None,
+                           checkpoint: Optional[CheckpointBusca] = None,
+                           resultados: Optional[List[Tuple[int, Publicacao]]] = None) -> List[Tuple[int, Publicacao]]:
+        """
+        Processa os links de todas as páginas de resultados, à medida que cada página carrega.
+        Os índices são contínuos entre páginas (a página 2 começa depois do último link da 1);
+        `selecionar(indice)` define quais links esta sessão processa.
+        """
+        resultados = [] if resultados is None else resultados
+        for _, links in self._paginas_resultado():
+            self._processar_links([link for link in links if selecionar(link.indice)],
+                                  ao_extrair, checkpoint, resultados)
+        return resultados
+
+    def _processar_links(self, links: List[LinkResultado],
+                         ao_extrair: Optional[Callable[[List[Publicacao]], None]] = None,
+                         checkpoint: Optional[CheckpointBusca] = None,
+                         resultados: Optional[List[Tuple[int, Publicacao]]] = None) -> List[Tuple[int, Publicacao]]:
+        """
+        Processa os links informados (exceto os já concluídos no checkpoint), acrescentando
+        pares (índice, publicação) a `resultados` à medida que avança.
+        """
+        resultados = [] if resultados is None else resultados
+        if checkpoint:
+            links = [link for link in links if not checkpoint.concluido(link.chave)]
+        for n, link in enumerate(links):
+            if n > 0 and n % 3 == 0: self._limpar_janelas_extras()
+            if n > 0: self.espera.pausa('entre_links', Config.EXTRACTION_PAUSE)
             
+            i = link.indice
+            publicacoes = self._processar_link(link)
+            if publicacoes is None:
+                self.links_com_falha += 1
+                continue # Falhou: fica fora do checkpoint para ser tentado de novo
+            if publicacoes and ao_extrair:
+                ao_extrair(publicacoes)
+            if checkpoint:
+                checkpoint.registrar(link.chave, i, publicacoes, self._hashes_pdfs(publicacoes))
+            resultados.extend((i, publicacao) for publicacao in publicacoes)
+        return resultados
+
+    def _hashes_pdfs(self, publicacoes: List[Publicacao]) -> Dict[str, Optional[str]]:
+        """SHA-256 dos PDFs das publicações, por arquivo_cache (referência estável para o checkpoint)."""
+        arquivos = {publicacao.arquivo_cache for publicacao in publicacoes if publicacao.arquivo_cache}
+        return {arquivo: self.indice.hash_arquivo(os.path.join(self.pasta_download, arquivo)) for arquivo in arquivos}
+
+    def _localizar_pdf(self, sha256: str) -> Optional[str]:
+        """arquivo_cache (relativo a esta pasta) do PDF com o hash informado, onde quer que ele esteja agora."""
+        caminho = self.indice.caminho_do_hash(sha256)
+        return os.path.relpath(caminho, self.pasta_download) if caminho else None
+
+    def _consolidar_resultados(self, resultados: List[Tuple[int, Publicacao]]) -> PublicacaoBatch:
+        """
+        Ordena os resultados pela posição do link e remove duplicatas por número de processo.
+        O resultado vai para um PublicacaoBatch (colunas, conteúdo fora da memória), que é o que
+        fica guardado até o fim da execução.
+        """
+        resultados.sort(key=lambda r: r[0])
+        return PublicacaoBatch(self.verificar_duplicatas_existentes([publicacao for _, publicacao in resultados]))
+
+    def _executar_paralelo(self, data_busca: str, quantidade: int,
+                           ao_extrair: Optional[Callable[[List[Publicacao]], None]] = None,
+                           checkpoint: Optional[CheckpointBusca] = None,
+                           data_fim: Optional[str] = None) -> Sequence[Publicacao]:
+        """
+        Distribui os links entre N sessões do navegador, cada uma com sua pasta de download e
+        seu FrameHandler. Os PDFs são trazidos para a pasta principal e os resultados consolidados.
+        """
+        sessoes = [DJEScraperDownload(os.path.join(self.pasta_download, f"sessao_{n + 1}"),
+                                      indice=self.indice, pool=self.pool, limite_espaco=self.limite_espaco)
+                   for n in range(quantidade)]
+        resultados = checkpoint.publicacoes(self._localizar_pdf) if checkpoint else []
+        
+        with ThreadPoolExecutor(max_workers=quantidade) as executor:
+            futuros = [executor.submit(sessao._executar_fatia, data_busca, n, quantidade, ao_extrair, checkpoint, data_fim)
+                       for n, sessao in enumerate(sessoes)]
+            for n, (sessao, futuro) in enumerate(zip(sessoes, futuros)):
+                try:
+                    parciais = futuro.result()
+                except Exception:
+                    parciais = []
+                self._incorporar_downloads(sessao, [publicacao for _, publicacao in parciais], n + 1)
+                sessao._remover_pastas_vazias()
+                resultados.extend(parciais)
+        
+        self.busca_concluida = all(sessao.busca_concluida for sessao in sessoes)
+        self._mostrar_resumo_downloads()
+        return self._consolidar_resultados(resultados)
+
+    def _executar_fatia(self, data_busca: str, fatia: int, total_fatias: int,
+                        ao_extrair: Optional[Callable[[List[Publicacao]], None]] = None,
+                        checkpoint: Optional[CheckpointBusca] = None,
+                        data_fim: Optional[str] = None) -> List[Tuple[int, Publicacao]]:
+        """Executa a busca em uma sessão própria e processa apenas os links desta fatia."""
+        resultados = []
+        self.busca_concluida = False
+        self.links_com_falha = 0
+        try:
+            self._iniciar_sessao(data_busca, data_fim)
+            self.frame_handler.reset_contador()
+            self._processar_paginas(lambda i: i % total_fatias == fatia, ao_extrair, checkpoint, resultados)
+            self.busca_concluida = self.links_com_falha == 0
         except Exception:
-            return []
+            pass
         finally:
-            self._limpar_janelas_extras()
-            if self.driver: self.driver.quit()
-            self._mostrar_resumo_downloads()
+            self._encerrar_sessao()
+        return resultados
+
+    def _incorporar_downloads(self, sessao: 'DJEScraperDownload', publicacoes: List[Publicacao], numero_sessao: int):
+        """Move os PDFs de uma sessão paralela para a pasta principal, evitando conflito de nomes."""
+        try:
+            arquivos = [f for f in os.listdir(sessao.pasta_download)
+                        if f.endswith('.pdf') and os.path.isfile(os.path.join(sessao.pasta_download, f))]
+        except Exception:
+            return
+        
+        nomes_finais = {}
+        for arquivo in arquivos:
+            try:
+                nome_final = arquivo
+                if os.path.exists(os.path.join(self.pasta_download, nome_final)):
+                    nome_base, ext = os.path.splitext(arquivo)
+                    nome_final = f"{nome_base}_s{numero_sessao}{ext}"
+                origem = os.path.join(sessao.pasta_download, arquivo)
+                destino = os.path.join(self.pasta_download, nome_final)
+                shutil.move(origem, destino)
+                self.indice.renomear(origem, destino)
+                nomes_finais[arquivo] = nome_final
+            except Exception:
+                continue
+        
+        for publicacao in publicacoes:
+            if not publicacao.arquivo_cache: continue
+            if publicacao.arquivo_cache in nomes_finais:
+                publicacao.arquivo_cache = nomes_finais[publicacao.arquivo_cache]
+            else:
+                # PDF idêntico a um que já estava na pasta principal (ver FrameHandler._indexar_arquivo)
+                caminho = os.path.join(sessao.pasta_download, publicacao.arquivo_cache)
+                publicacao.arquivo_cache = os.path.relpath(caminho, self.pasta_download)
+
+    def _remover_pastas_vazias(self):
+        """Remove a pasta de download da sessão (e a de duplicatas) se estiverem vazias."""
+        for pasta in (os.path.join(self.pasta_download, "duplicatas"), self.pasta_download):
+            try: os.rmdir(pasta)
+            except OSError: pass
 
     def _mover_pdf_duplicado(self, nome_arquivo: str):
         """Move um PDF duplicado para uma pasta de duplicatas."""
@@ -245,7 +639,9 @@ class DJEScraperDownload:
                 novo_nome = f"{nome_base}_dup_{timestamp}{ext}"
                 destino = os.path.join(pasta_duplicatas, novo_nome)
             
-            if os.path.exists(origem): shutil.move(origem, destino)
+            if os.path.exists(origem):
+                shutil.move(origem, destino)
+                self.indice.remover(origem)
         except Exception:
             pass # Log errors
             
@@ -253,48 +649,98 @@ class DJEScraperDownload:
         """Remove duplicatas de uma lista de publicações baseado no número do processo."""
         processos_vistos = set()
         publicacoes_unicas = []
+        duplicadas = []
         for publicacao in publicacoes:
             numero_processo = publicacao.numero_processo #
             if numero_processo and numero_processo in processos_vistos:
-                if publicacao.arquivo_cache: self._mover_pdf_duplicado(publicacao.arquivo_cache) #
+                duplicadas.append(publicacao)
             else:
                 if numero_processo: processos_vistos.add(numero_processo)
                 publicacoes_unicas.append(publicacao)
+        
+        # Um mesmo PDF (mesmo hash) pode ter originado uma publicação mantida; esse não é movido
+        arquivos_mantidos = {pub.arquivo_cache for pub in publicacoes_unicas if pub.arquivo_cache}
+        for publicacao in duplicadas:
+            if publicacao.arquivo_cache and publicacao.arquivo_cache not in arquivos_mantidos:
+                self._mover_pdf_duplicado(publicacao.arquivo_cache) #
         return publicacoes_unicas
 
-    def processar_pdfs_baixados(self) -> List[Publicacao]:
-        """Processa PDFs já baixados na pasta de download."""
+    def processar_pdfs_baixados(self, workers: Optional[int] = None) -> Sequence[Publicacao]:
+        """
+        Processa PDFs já baixados na pasta de download.
+        Com workers > 1 a leitura e a extração rodam em um pool de processos; a deduplicação
+        continua no processo principal, então o resultado é o mesmo do modo sequencial.
+        """
         try:
             arquivos_pdf = [f for f in os.listdir(self.pasta_download) 
                            if f.endswith('.pdf') and os.path.isfile(os.path.join(self.pasta_download, f))]
             publicacoes = []
             if not arquivos_pdf: return []
             
-            for arquivo in arquivos_pdf:
-                caminho_completo = os.path.join(self.pasta_download, arquivo)
-                conteudo = self._ler_pdf_arquivo(caminho_completo)
-                
-                if self.data_extractor.is_conteudo_relevante(conteudo):
-                    dados = self.data_extractor.extrair_dados(conteudo)
-                    if self.data_extractor.validar_extracao_completa(dados):
-                        publicacao = Publicacao(
-                            numero_processo=dados['processo'],
-                            data_disponibilizacao=dados['data'],
-                            autores=dados['autores'],
-                            advogados=dados['advogados'],
-                            valor_principal=dados['valores']['principal'],
-                            valor_juros=dados['valores']['juros'],
-                            honorarios=dados['valores']['honorarios'],
-                            conteudo_completo=conteudo,
-                            arquivo_cache=arquivo
-                        )
-                        publicacoes.append(publicacao)
+            arquivos_pdf = self._descartar_copias_identicas(arquivos_pdf)
+            caminhos = [os.path.join(self.pasta_download, arquivo) for arquivo in arquivos_pdf]
+            workers = workers or Config.MAX_CONCURRENT_EXTRACTIONS
+            resultados = self._extrair_pdfs_com_cache(caminhos, workers)
+            
+            for arquivo, caminho, lista_dados in zip(arquivos_pdf, caminhos, resultados):
+                publicacoes.extend(Publicacao(arquivo_cache=arquivo, **dados) for dados in lista_dados)
+                if lista_dados:
+                    self.indice.atualizar_processo(caminho, lista_dados[0]['numero_processo'])
             
             publicacoes_unicas = self.verificar_duplicatas_existentes(publicacoes)
-            return publicacoes_unicas
+            return PublicacaoBatch(publicacoes_unicas)
         except Exception:
             return []
 
+    def _descartar_copias_identicas(self, arquivos_pdf: List[str]) -> List[str]:
+        """Registra os PDFs no índice SHA-256 e move cópias idênticas antes de qualquer extração."""
+        arquivos_unicos = []
+        for arquivo in arquivos_pdf:
+            try:
+                _, existente = self.indice.registrar(os.path.join(self.pasta_download, arquivo))
+            except Exception:
+                existente = None
+            if existente:
+                self._mover_pdf_duplicado(arquivo)
+            else:
+                arquivos_unicos.append(arquivo)
+        return arquivos_unicos
+
+    def _extrair_pdfs_com_cache(self, caminhos: List[str], workers: int) -> List[List[Dict]]:
+        """
+        Consulta o cache de textos antes de abrir cada PDF; só os PDFs sem texto em cache são lidos
+        (no pool, se houver) e o texto deles é gravado no cache para as próximas execuções.
+        """
+        if self.cache_texto is None:
+            self.cache_texto = PDFTextCache()
+        
+        textos = [self.cache_texto.obter(caminho, self.indice.hash_arquivo(caminho)) for caminho in caminhos]
+        pendentes = [caminho for caminho, texto in zip(caminhos, textos) if texto is None]
+        extraidos = dict(zip(pendentes, self._extrair_pdfs(pendentes, workers)))
+        
+        resultados = []
+        for caminho, texto in zip(caminhos, textos):
+            if texto is None:
+                comprimido, dados = extraidos[caminho]
+                self.cache_texto.salvar_comprimido(caminho, comprimido, self.indice.hash_arquivo(caminho))
+            else:
+                dados = _extrair_dados_texto(texto)
+            resultados.append(dados)
+        return resultados
+
+    def _extrair_pdfs(self, caminhos: List[str], workers: int) -> List[Tuple[bytes, List[Dict]]]:
+        """Extrai os PDFs em sequência ou em um pool de processos, preservando a ordem de entrada."""
+        if workers > 1 and len(caminhos) > 1:
+            try:
+                max_workers = min(workers, len(caminhos))
+                chunksize = max(1, len(caminhos) // (max_workers * 4))
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    return list(executor.map(_extrair_dados_pdf, caminhos, chunksize=chunksize))
+            except (BrokenProcessPool, OSError, NotImplementedError) as e:
+                # Pool indisponível (ex.: ambiente sem fork ou sem semáforos) ou processo morto no meio
+                self.logger.warning(f"Pool de processos indisponível ({e!r}); extraindo {len(caminhos)} PDF(s) em sequência")
+        return [_extrair_dados_pdf(caminho) for caminho in caminhos]
+
     def _mostrar_resumo_downloads(self):
         """Exibe um resumo dos arquivos baixados na pasta de downloads."""
         try:
@@ -318,10 +764,11 @@ class DJEScraperDownload:
             pass
 
     def _limpar_janelas_extras(self):
-        """Fecha janelas extras do navegador, voltando para a janela principal."""
+        """Fecha janelas extras do navegador (menos a aba de prefetch), voltando para a janela principal."""
         try:
-            janela_principal = self.driver.window_handles[0]
-            for janela in self.driver.window_handles[1:]:
+            janela_principal = self.janela_resultados or self.driver.window_handles[0]
+            for janela in self.driver.window_handles:
+                if janela in (janela_principal, self.janela_prefetch): continue
                 try: self.driver.switch_to.window(janela); self.driver.close()
                 except: pass
             self.driver.switch_to.window(janela_principal)
@@ -331,25 +778,7 @@ class DJEScraperDownload:
 
     def _ler_pdf_arquivo(self, caminho_arquivo: str) -> str:
         """Lê o conteúdo textual de um arquivo PDF."""
-        try:
-            if PyPDF2:
-                try:
-                    with open(caminho_arquivo, 'rb') as file:
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        texto = "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
-                        if texto.strip(): return texto
-                except Exception: pass
-            
-            if pdfplumber:
-                try:
-                    with pdfplumber.open(caminho_arquivo) as pdf:
-                        texto = "".join(page.extract_text() + "\n" for page in pdf.pages if page.extract_text())
-                        if texto.strip(): return texto
-                except Exception: pass
-            
-            return ""
-        except Exception:
-            return ""
+        return ler_pdf(caminho_arquivo)
 
     def listar_downloads(self):
         """Lista os arquivos baixados na pasta de downloads."""
@@ -375,6 +804,17 @@ class DJEScraperDownload:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="DJE Scraper - Processamento de PDFs e Envio à API")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos paralelos na extração de texto dos PDFs baixados (padrão: MAX_CONCURRENT_EXTRACTIONS)")
+    parser.add_argument("--sessoes", type=int, default=None,
+                        help="Sessões do navegador que dividem os links da busca no site (padrão: MAX_BROWSER_SESSIONS)")
+    args = parser.parse_args()
+    if args.workers:
+        Config.MAX_CONCURRENT_EXTRACTIONS = args.workers
+    if args.sessoes:
+        Config.MAX_BROWSER_SESSIONS = args.sessoes
+    
     print("DJE Scraper - Processamento de PDFs e Envio à API")
     print("="*60)
     
@@ -418,13 +858,13 @@ def main():
 
     if publicacoes:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_arquivo_json = f"resultados_download_{timestamp}.json"
+        nome_arquivo_json = f"resultados_download_{timestamp}.jsonl"
         
         # O arquivo será salvo no diretório atual
-        with open(nome_arquivo_json, 'w', encoding='utf-8') as f:
-            json.dump([pub.to_dict() for pub in publicacoes], f, ensure_ascii=False, indent=2)
+        with GravadorJSONL(nome_arquivo_json) as gravador:
+            gravador.adicionar(publicacoes)
         
-        print(f"Resultados salvos em: {nome_arquivo_json}")
+        print(f"Resultados salvos em: {gravador.caminho}")
         
         # --- ENVIO PARA A API ---
         if publicacoes and (opcao == "1" or opcao == "2" or opcao == "5"):
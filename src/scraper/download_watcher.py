@@ -0,0 +1,189 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from typing import Optional, Set, List
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o0004000
+IN_CLOEXEC = 0o2000000
+
+_EVENTO_INOTIFY = struct.Struct('iIII')
+
+
+def _carregar_libc():
+    """Carrega a libc com suporte a inotify (apenas Linux)."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if hasattr(libc, 'inotify_init1') and hasattr(libc, 'inotify_add_watch'):
+            return libc
+    except OSError:
+        pass
+    return None
+
+
+_libc = _carregar_libc()
+
+
+class DownloadWatcher:
+    """
+    Detecta a conclusão de downloads em uma pasta.
+    No Linux usa inotify e é avisado no instante em que o '.crdownload' é renomeado para o
+    arquivo final; nos demais sistemas compara listagens via os.scandir.
+    """
+
+    EXTENSOES_TEMPORARIAS = ('.crdownload', '.tmp', '.part')
+
+    def __init__(self, pasta_download: str, tamanho_minimo: int = 1000,
+                 intervalo_estabilidade: float = 0.5, intervalo_varredura: float = 0.5):
+        self.pasta_download = os.path.abspath(pasta_download)
+        self.tamanho_minimo = tamanho_minimo
+        self.intervalo_estabilidade = intervalo_estabilidade
+        self.intervalo_varredura = intervalo_varredura
+        self.usa_inotify = _libc is not None
+
+        self._fd = None
+        self._ativo = False
+        self._arquivos_antes: Set[str] = set()
+        self._ignorados: Set[str] = set()
+        self._pendentes: List[str] = []
+
+    def iniciar(self):
+        """Começa a observar a pasta; só arquivos que surgirem a partir daqui serão reportados."""
+        self.parar()
+        self._ignorados.clear()
+        self._pendentes.clear()
+        # Listagem de referência também no modo inotify: é com ela que a varredura feita após
+        # um estouro da fila (IN_Q_OVERFLOW) separa os downloads novos dos arquivos que já existiam
+        self._arquivos_antes = self._listar_nomes()
+
+        if self.usa_inotify:
+            try:
+                fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+                if fd < 0:
+                    raise OSError(ctypes.get_errno(), "inotify_init1")
+                wd = _libc.inotify_add_watch(fd, os.fsencode(self.pasta_download), IN_CLOSE_WRITE | IN_MOVED_TO)
+                if wd < 0:
+                    os.close(fd)
+                    raise OSError(ctypes.get_errno(), "inotify_add_watch")
+                self._fd = fd
+                self._ativo = True
+                return
+            except OSError:
+                self.usa_inotify = False
+
+        self._ativo = True
+
+    def ignorar(self, nome_arquivo: Optional[str]):
+        """Marca um arquivo para não ser reportado (ex.: renomeações feitas pelo próprio scraper)."""
+        if nome_arquivo:
+            self._ignorados.add(nome_arquivo)
+            if nome_arquivo in self._pendentes:
+                self._pendentes.remove(nome_arquivo)
+
+    def aguardar(self, timeout: float = 10) -> Optional[str]:
+        """Aguarda até `timeout` segundos por um download concluído e retorna o nome do arquivo."""
+        if not self._ativo:
+            self.iniciar()
+
+        limite = time.time() + timeout
+        while True:
+            arquivo = self._verificar_pendentes()
+            if arquivo:
+                return arquivo
+
+            restante = limite - time.time()
+            if restante <= 0:
+                return None
+
+            espera = min(restante, self.intervalo_varredura)
+            if self._fd is not None:
+                self._ler_eventos(espera)
+            else:
+                time.sleep(espera)
+                self._varrer_pasta()
+
+    def parar(self):
+        """Encerra a observação e libera o descritor do inotify."""
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+        self._ativo = False
+        self._arquivos_antes = set()
+
+    def _ler_eventos(self, espera: float):
+        """Lê eventos do inotify, esperando no máximo `espera` segundos pelo primeiro."""
+        try:
+            prontos, _, _ = select.select([self._fd], [], [], espera)
+            if not prontos:
+                return
+            dados = os.read(self._fd, 64 * 1024)
+        except (OSError, ValueError):
+            return
+
+        offset = 0
+        while offset + _EVENTO_INOTIFY.size <= len(dados):
+            _, mascara, _, tamanho_nome = _EVENTO_INOTIFY.unpack_from(dados, offset)
+            offset += _EVENTO_INOTIFY.size
+            nome = dados[offset:offset + tamanho_nome].rstrip(b'\0').decode('utf-8', errors='replace')
+            offset += tamanho_nome
+
+            if mascara & IN_Q_OVERFLOW:
+                self._varrer_pasta()
+            elif nome:
+                self._adicionar_candidato(nome)
+
+    def _varrer_pasta(self):
+        """Compara a listagem atual com a inicial (modo sem inotify ou após estouro da fila)."""
+        atuais = self._listar_nomes()
+        for nome in atuais - self._arquivos_antes:
+            self._adicionar_candidato(nome)
+        self._arquivos_antes |= atuais
+
+    def _adicionar_candidato(self, nome: str):
+        if nome.startswith('.') or nome.endswith(self.EXTENSOES_TEMPORARIAS):
+            return
+        if nome in self._ignorados or nome in self._pendentes:
+            return
+        self._pendentes.append(nome)
+
+    def _verificar_pendentes(self) -> Optional[str]:
+        """Retorna o primeiro candidato com tamanho mínimo e tamanho estável."""
+        for nome in list(self._pendentes):
+            caminho = os.path.join(self.pasta_download, nome)
+            if not os.path.isfile(caminho):
+                self._pendentes.remove(nome)
+                continue
+            if self._tamanho_estavel(caminho):
+                self._pendentes.remove(nome)
+                self._ignorados.add(nome)
+                return nome
+        return None
+
+    def _tamanho_estavel(self, caminho: str) -> bool:
+        """Confere se o arquivo passou do tamanho mínimo e não cresceu durante o intervalo."""
+        try:
+            tamanho = os.path.getsize(caminho)
+            if tamanho <= self.tamanho_minimo:
+                return False
+            time.sleep(self.intervalo_estabilidade)
+            return os.path.getsize(caminho) == tamanho
+        except OSError:
+            return False
+
+    def _listar_nomes(self) -> Set[str]:
+        try:
+            with os.scandir(self.pasta_download) as entradas:
+                return {entrada.name for entrada in entradas}
+        except OSError:
+            return set()
@@ -0,0 +1,230 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+from utils.config import Config
+from utils.logger import get_logger
+
+
+def criar_driver_chrome(pasta_download: str):
+    """Cria o Chrome headless configurado para automação e downloads na pasta informada."""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--window-size=1920,1080")
+
+    prefs = {
+        "download.default_directory": pasta_download,
+        "download.prompt_for_download": False,
+        "plugins.always_open_pdf_externally": True,
+        "profile.default_content_settings.popups": 0,
+        "profile.default_content_setting_values.automatic_downloads": 1,
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+    chrome_options.add_argument("--disable-web-security")
+    chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+
+    service = Service()
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+
+class SessaoNavegador:
+    """Um Chrome do pool, com os dados usados para decidir quando reciclá-lo."""
+
+    def __init__(self, driver, tempo_inicializacao: float):
+        self.driver = driver
+        self.criado_em = time.monotonic()
+        self.tempo_inicializacao = tempo_inicializacao
+        self.paginas = 0
+        self.usos = 0
+        self.memoria_inicial_mb: Optional[float] = None
+        self.na_pagina_inicial = False
+
+    def contar_pagina(self, quantidade: int = 1):
+        self.paginas += quantidade
+
+    def memoria_mb(self) -> Optional[float]:
+        """Heap JavaScript em uso na aba atual (performance.memory do Chrome), em MB."""
+        try:
+            usado = self.driver.execute_script(
+                "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null;"
+            )
+            return usado / (1024 * 1024) if usado else None
+        except Exception:
+            return None
+
+
+class DriverPool:
+    """
+    Pool de navegadores Chrome já abertos e na página inicial do DJE, para não pagar a
+    inicialização do Chrome e o primeiro carregamento a cada busca. Uma sessão devolvida é
+    limpa (janelas extras fechadas) e volta a ser aquecida em segundo plano; ela é reciclada
+    (fechada e substituída) depois de `max_paginas` páginas, se o heap crescer mais que
+    `max_crescimento_mb` desde a criação, ou se o navegador parar de responder.
+    A pasta de download é definida a cada aquisição, via CDP, pelo FrameHandler.
+    """
+
+    def __init__(self, tamanho: Optional[int] = None, max_paginas: Optional[int] = None,
+                 max_crescimento_mb: Optional[float] = None, url_inicial: Optional[str] = None,
+                 fabrica: Optional[Callable[[str], object]] = None):
+        self.tamanho = max(1, tamanho or Config.DRIVER_POOL_SIZE)
+        self.max_paginas = Config.DRIVER_MAX_PAGES if max_paginas is None else max_paginas
+        self.max_crescimento_mb = Config.DRIVER_MAX_MEMORY_GROWTH_MB if max_crescimento_mb is None else max_crescimento_mb
+        self.url_inicial = url_inicial or Config.DJE_BASE_URL
+        self.fabrica = fabrica or criar_driver_chrome
+        self.logger = get_logger('driver_pool')
+
+        self._livres: List[Future] = []
+        self._em_uso = 0
+        self._condicao = threading.Condition()
+        self._aquecedor = ThreadPoolExecutor(max_workers=self.tamanho, thread_name_prefix="driver-pool")
+        self._encerrado = False
+        self._lock_estatisticas = threading.Lock()
+        self._estatisticas = {"criadas": 0, "reutilizacoes": 0, "recicladas": {}, "tempo_inicializacao": 0.0,
+                              "tempos_de_vida": [], "paginas_por_sessao": []}
+
+    def aquecer(self, quantidade: Optional[int] = None):
+        """Abre sessões antecipadamente (até o tamanho do pool) para a primeira busca não esperar."""
+        with self._condicao:
+            faltam = min(quantidade or self.tamanho, self.tamanho - len(self._livres) - self._em_uso)
+            for _ in range(max(0, faltam)):
+                self._livres.append(self._aquecedor.submit(self._criar_sessao))
+
+    def adquirir(self, timeout: Optional[float] = None) -> SessaoNavegador:
+        """Entrega uma sessão aquecida (esperando uma ficar livre, se o pool estiver todo em uso)."""
+        with self._condicao:
+            if not self._condicao.wait_for(
+                lambda: self._encerrado or self._livres or self._em_uso < self.tamanho, timeout
+            ):
+                raise TimeoutError("Nenhuma sessão do navegador ficou livre a tempo")
+            if self._encerrado:
+                raise RuntimeError("Pool de navegadores encerrado")
+            futuro = self._livres.pop(0) if self._livres else self._aquecedor.submit(self._criar_sessao)
+            self._em_uso += 1
+
+        try:
+            sessao = futuro.result()
+        except Exception:
+            with self._condicao:
+                self._em_uso -= 1
+                self._condicao.notify()
+            raise
+        sessao.usos += 1
+        if sessao.usos > 1:
+            with self._lock_estatisticas:
+                self._estatisticas["reutilizacoes"] += 1
+        return sessao
+
+    def devolver(self, sessao: SessaoNavegador):
+        """Devolve a sessão ao pool, reciclando-a se ela atingiu algum limite."""
+        motivo = self._motivo_reciclagem(sessao)
+        with self._condicao:
+            self._em_uso -= 1
+            if self._encerrado:
+                motivo = motivo or "encerramento"
+            if motivo:
+                self._descartar(sessao, motivo)
+                if not self._encerrado:
+                    self._livres.append(self._aquecedor.submit(self._criar_sessao))
+            else:
+                self._livres.append(self._aquecedor.submit(self._preparar_reuso, sessao))
+            self._condicao.notify()
+
+    def encerrar(self):
+        """Fecha todos os navegadores livres e registra as estatísticas do pool."""
+        with self._condicao:
+            self._encerrado = True
+            livres, self._livres = self._livres, []
+            self._condicao.notify_all()
+        for futuro in livres:
+            try:
+                self._descartar(futuro.result(), "encerramento")
+            except Exception:
+                pass
+        self._aquecedor.shutdown(wait=True)
+        self.logger.info(self.relatorio())
+
+    def estatisticas(self) -> Dict:
+        """Sessões criadas, reutilizações, reciclagens por motivo e tempo de vida/páginas médios."""
+        with self._lock_estatisticas:
+            e = dict(self._estatisticas)
+            vidas, paginas = list(e["tempos_de_vida"]), list(e["paginas_por_sessao"])
+        return {
+            "sessoes_criadas": e["criadas"],
+            "reutilizacoes": e["reutilizacoes"],
+            "recicladas": dict(e["recicladas"]),
+            "inicializacao_media_s": round(e["tempo_inicializacao"] / e["criadas"], 2) if e["criadas"] else 0.0,
+            "vida_media_s": round(sum(vidas) / len(vidas), 1) if vidas else 0.0,
+            "paginas_media": round(sum(paginas) / len(paginas), 1) if paginas else 0.0,
+        }
+
+    def relatorio(self) -> str:
+        e = self.estatisticas()
+        recicladas = ', '.join(f"{motivo}: {n}" for motivo, n in e["recicladas"].items()) or 'nenhuma'
+        return (f"Pool de navegadores: {e['sessoes_criadas']} sessões criadas "
+                f"(inicialização média {e['inicializacao_media_s']}s), {e['reutilizacoes']} reutilizações, "
+                f"vida média {e['vida_media_s']}s / {e['paginas_media']} páginas; recicladas: {recicladas}")
+
+    def _criar_sessao(self) -> SessaoNavegador:
+        inicio = time.monotonic()
+        driver = self.fabrica(Config.DATA_DIR)
+        sessao = SessaoNavegador(driver, 0.0)
+        self._ir_para_pagina_inicial(sessao)
+        sessao.tempo_inicializacao = time.monotonic() - inicio
+        sessao.memoria_inicial_mb = sessao.memoria_mb()
+        with self._lock_estatisticas:
+            self._estatisticas["criadas"] += 1
+            self._estatisticas["tempo_inicializacao"] += sessao.tempo_inicializacao
+        return sessao
+
+    def _preparar_reuso(self, sessao: SessaoNavegador) -> SessaoNavegador:
+        """Fecha janelas extras e volta para a página inicial, deixando a sessão pronta."""
+        try:
+            handles = sessao.driver.window_handles
+            for janela in handles[1:]:
+                sessao.driver.switch_to.window(janela)
+                sessao.driver.close()
+            sessao.driver.switch_to.window(handles[0])
+            self._ir_para_pagina_inicial(sessao)
+            return sessao
+        except Exception:
+            self._descartar(sessao, "falha")
+            return self._criar_sessao()
+
+    def _ir_para_pagina_inicial(self, sessao: SessaoNavegador):
+        sessao.na_pagina_inicial = False
+        sessao.driver.get(self.url_inicial)
+        sessao.contar_pagina()
+        sessao.na_pagina_inicial = True
+
+    def _motivo_reciclagem(self, sessao: SessaoNavegador) -> Optional[str]:
+        if self.max_paginas and sessao.paginas >= self.max_paginas:
+            return "paginas"
+        try:
+            sessao.driver.window_handles
+        except Exception:
+            return "falha"
+        memoria = sessao.memoria_mb()
+        if (self.max_crescimento_mb and memoria is not None and sessao.memoria_inicial_mb is not None
+                and memoria - sessao.memoria_inicial_mb > self.max_crescimento_mb):
+            return "memoria"
+        return None
+
+    def _descartar(self, sessao: SessaoNavegador, motivo: str):
+        with self._lock_estatisticas:
+            recicladas = self._estatisticas["recicladas"]
+            recicladas[motivo] = recicladas.get(motivo, 0) + 1
+            self._estatisticas["tempos_de_vida"].append(time.monotonic() - sessao.criado_em)
+            self._estatisticas["paginas_por_sessao"].append(sessao.paginas)
+        try:
+            sessao.driver.quit()
+        except Exception:
+            pass
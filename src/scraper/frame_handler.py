@@ -1,6 +1,6 @@
-import time
 import os
 import glob
+import shutil
 from typing import Optional # Importar Optional
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
@@ -9,22 +9,28 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.chrome.options import Options
 
-try:
-    import PyPDF2
-except ImportError:
-    PyPDF2 = None
-try:
-    import pdfplumber
-except ImportError:
-    pdfplumber = None
+from utils.config import Config
+from extraction.pdf_reader import iterar_paginas
+from .pdf_downloader import PDFDownloader
+from .download_watcher import DownloadWatcher
+from .wait_policy import WaitPolicy
+from .pdf_index import PDFIndex
+from .limite_espaco import LimiteEspaco
+
 
 class FrameHandler:
-    def __init__(self, pasta_download="./downloads_dje"):
+    def __init__(self, pasta_download="./downloads_dje", espera: Optional[WaitPolicy] = None,
+                 indice: Optional[PDFIndex] = None, limite_espaco: Optional[LimiteEspaco] = None):
         self.driver = None
         self.wait = None
+        self.espera = espera or WaitPolicy()
         self.extraction_count = 0
         self.pasta_download = os.path.abspath(pasta_download)
-        self.arquivos_antes = set()
+        self.indice = indice or PDFIndex(self.pasta_download)
+        self.ultimo_arquivo = None
+        self.limite_espaco = limite_espaco
+        self.download_watcher = DownloadWatcher(self.pasta_download)
+        self.pdf_downloader = PDFDownloader(self.pasta_download) if Config.DOWNLOAD_HTTP else None
         
         os.makedirs(self.pasta_download, exist_ok=True)
 
@@ -32,6 +38,7 @@ class FrameHandler:
         """Configura driver e wait para interação com o navegador."""
         self.driver = driver
         self.wait = wait
+        self.espera.set_driver(driver)
         self._configurar_download_chrome()
 
     def _configurar_download_chrome(self):
@@ -46,10 +53,18 @@ class FrameHandler:
 
     def extrair_conteudo_pdf(self) -> str:
         self.extraction_count += 1
+        self.ultimo_arquivo = None
         
         try:
             self._registrar_arquivos_existentes()
-            time.sleep(3) # Aguardar carregamento inicial
+            
+            arquivo_baixado = self._baixar_via_http()
+            if arquivo_baixado:
+                conteudo = self._ler_pdf_baixado(arquivo_baixado)
+                if self._is_conteudo_valido(conteudo):
+                    return conteudo
+            
+            self.espera.documento_pronto('carregamento_pdf')
             
             arquivo_baixado = self._baixar_via_frame()
             if arquivo_baixado:
@@ -76,12 +91,48 @@ class FrameHandler:
         finally:
             self._garantir_contexto_principal()
 
+    def extrair_conteudo_url(self, url: str, referer: Optional[str] = None) -> Optional[str]:
+        """
+        Baixa por HTTP o PDF apontado pela URL de um link de resultado (seguindo o frame do
+        visualizador, se for uma página HTML), sem abrir janela. Retorna None se não conseguir.
+        """
+        if not self.pdf_downloader or not self.driver:
+            return None
+        self.extraction_count += 1
+        self.ultimo_arquivo = None
+        try:
+            self.pdf_downloader.sincronizar_sessao(self.driver)
+            arquivo = self.pdf_downloader.baixar(url, referer=referer)
+            if not arquivo:
+                return None
+            self.download_watcher.ignorar(arquivo)
+            arquivo = self._renomear_arquivo_unico(arquivo) or arquivo
+            conteudo = self._ler_pdf_baixado(arquivo)
+            return conteudo if self._is_conteudo_valido(conteudo) else None
+        except Exception:
+            return None
+
     def _registrar_arquivos_existentes(self):
-        """Registra arquivos que já existem na pasta de download antes de uma nova operação."""
+        """Passa a observar a pasta de download; apenas arquivos novos a partir daqui contam como download."""
+        self.download_watcher.iniciar()
+
+    def _baixar_via_http(self) -> Optional[str]:
+        """Baixa o PDF por HTTP usando a URL do 'bottomFrame' e os cookies do navegador."""
+        if not self.pdf_downloader:
+            return None
         try:
-            self.arquivos_antes = set(os.listdir(self.pasta_download))
-        except:
-            self.arquivos_antes = set()
+            url_pdf = self.pdf_downloader.resolver_url_pdf(self.driver)
+            if not url_pdf:
+                return None
+            self.pdf_downloader.sincronizar_sessao(self.driver)
+            arquivo = self.pdf_downloader.baixar(url_pdf, referer=self.driver.current_url)
+            if not arquivo:
+                return None
+            self.download_watcher.ignorar(arquivo)
+            arquivo_renomeado = self._renomear_arquivo_unico(arquivo)
+            return arquivo_renomeado if arquivo_renomeado else arquivo
+        except Exception:
+            return None
 
     def _baixar_via_frame(self) -> Optional[str]:
         """Tenta baixar PDF interagindo com o frame 'bottomFrame'."""
@@ -89,7 +140,7 @@ class FrameHandler:
             self.wait.until(
                 EC.frame_to_be_available_and_switch_to_it((By.NAME, "bottomFrame"))
             )
-            time.sleep(3)
+            self.espera.documento_pronto('carregamento_frame')
             
             arquivo = self._tentar_botao_download()
             if arquivo: return arquivo
@@ -135,12 +186,9 @@ class FrameHandler:
                             elemento.click()
                             
                             if 'open' in texto_botao.lower() or 'abrir' in texto_botao.lower():
-                                time.sleep(5)
-                                nova_url = self.driver.current_url
-                                if nova_url != url_atual:
+                                if self.espera.aguardar('abrir_visualizador', lambda d: d.current_url != url_atual):
                                     return self._baixar_do_visualizador_chrome()
                             
-                            time.sleep(3)
                             arquivo = self._aguardar_download()
                             if arquivo: return arquivo
                 except Exception:
@@ -155,7 +203,6 @@ class FrameHandler:
         try:
             actions = ActionChains(self.driver)
             actions.key_down(Keys.CONTROL).send_keys('s').key_up(Keys.CONTROL).perform()
-            time.sleep(3)
             arquivo = self._aguardar_download()
             if arquivo: return arquivo
             
@@ -170,7 +217,6 @@ class FrameHandler:
                     for elemento in elementos:
                         if elemento.is_displayed():
                             elemento.click()
-                            time.sleep(3)
                             arquivo = self._aguardar_download()
                             if arquivo: return arquivo
                 except Exception:
@@ -185,7 +231,6 @@ class FrameHandler:
                 }
                 return 'no_method';
             """)
-            time.sleep(5)
             arquivo = self._aguardar_download()
             if arquivo: return arquivo
             
@@ -198,16 +243,15 @@ class FrameHandler:
         """Tenta usar Ctrl+S para salvar o PDF."""
         try:
             self.driver.execute_script("document.body.focus();")
-            time.sleep(1)
             actions = ActionChains(self.driver)
             actions.key_down(Keys.CONTROL).send_keys('s').key_up(Keys.CONTROL).perform()
-            time.sleep(3)
+            self.espera.pausa('dialogo_salvar')
             try:
                 actions.send_keys(Keys.ENTER).perform()
-                time.sleep(2)
             except:
                 pass
             arquivo = self._aguardar_download()
+            self.espera.registrar_resultado('dialogo_salvar', arquivo is not None)
             if arquivo: return arquivo
             return None
         except Exception:
@@ -219,12 +263,12 @@ class FrameHandler:
             body_element = self.driver.find_element(By.TAG_NAME, "body")
             actions = ActionChains(self.driver)
             actions.context_click(body_element).perform()
-            time.sleep(2)
+            self.espera.pausa('menu_contexto')
             actions.send_keys('a').perform()
-            time.sleep(2)
+            self.espera.pausa('menu_contexto')
             actions.send_keys(Keys.ENTER).perform()
-            time.sleep(3)
             arquivo = self._aguardar_download()
+            self.espera.registrar_resultado('menu_contexto', arquivo is not None)
             if arquivo: return arquivo
             return None
         except Exception:
@@ -247,7 +291,6 @@ class FrameHandler:
             } catch (e) { return 'error: ' + e.message; }
             """
             self.driver.execute_script(js_script)
-            time.sleep(5)
             arquivo = self._aguardar_download()
             if arquivo: return arquivo
             return None
@@ -271,7 +314,6 @@ class FrameHandler:
                 for url_teste in urls_para_tentar:
                     try:
                         self.driver.get(url_teste)
-                        time.sleep(5)
                         arquivo = self._aguardar_download()
                         if arquivo: return arquivo
                     except: continue
@@ -286,7 +328,6 @@ class FrameHandler:
                 if url_modificada != url_atual:
                     try:
                         self.driver.get(url_modificada)
-                        time.sleep(5)
                         arquivo = self._aguardar_download()
                         if arquivo: return arquivo
                     except: continue
@@ -317,19 +358,16 @@ class FrameHandler:
             return downloadBlob();
             """
             self.driver.execute_script(js_script)
-            time.sleep(5)
             arquivo = self._aguardar_download()
             if arquivo: return arquivo
             
             actions = ActionChains(self.driver)
             actions.key_down(Keys.CONTROL).send_keys('s').key_up(Keys.CONTROL).perform()
-            time.sleep(3)
             arquivo = self._aguardar_download()
             if arquivo: return arquivo
             
             actions = ActionChains(self.driver)
             actions.key_down(Keys.CONTROL).key_down(Keys.SHIFT).send_keys('s').key_up(Keys.SHIFT).key_up(Keys.CONTROL).perform()
-            time.sleep(3)
             arquivo = self._aguardar_download()
             if arquivo: return arquivo
             
@@ -337,41 +375,53 @@ class FrameHandler:
         except Exception:
             return None
 
-    def _aguardar_download(self, timeout=10) -> Optional[str]:
+    def _aguardar_download(self, timeout: Optional[float] = None) -> Optional[str]:
         """Aguarda o download ser concluído e retorna o nome do arquivo, com renomeação."""
         try:
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                try:
-                    arquivos_atuais = set(os.listdir(self.pasta_download))
-                    novos_arquivos = arquivos_atuais - self.arquivos_antes
-                    
-                    for arquivo in novos_arquivos:
-                        caminho_completo = os.path.join(self.pasta_download, arquivo)
-                        if arquivo.endswith(('.crdownload', '.tmp', '.part')):
-                            continue
-                        if os.path.isfile(caminho_completo) and os.path.getsize(caminho_completo) > 1000:
-                            time.sleep(1)
-                            if os.path.getsize(caminho_completo) == os.path.getsize(caminho_completo):
-                                arquivo_renomeado = self._renomear_arquivo_unico(arquivo)
-                                return arquivo_renomeado if arquivo_renomeado else arquivo
-                    time.sleep(0.5)
-                except Exception:
-                    time.sleep(0.5)
-            
-            arquivos_atuais = set(os.listdir(self.pasta_download))
-            novos_arquivos = arquivos_atuais - self.arquivos_antes
-            for arquivo in novos_arquivos:
-                if not arquivo.endswith(('.crdownload', '.tmp', '.part')):
-                    caminho_completo = os.path.join(self.pasta_download, arquivo)
-                    if os.path.isfile(caminho_completo) and os.path.getsize(caminho_completo) > 1000:
-                        arquivo_renomeado = self._renomear_arquivo_unico(arquivo)
-                        return arquivo_renomeado if arquivo_renomeado else arquivo
-            return None
+            arquivo = self.espera.medir(
+                'download', lambda: self.download_watcher.aguardar(timeout or Config.DOWNLOAD_TIMEOUT)
+            )
+            if not arquivo:
+                return None
+            arquivo_renomeado = self._renomear_arquivo_unico(arquivo)
+            return arquivo_renomeado if arquivo_renomeado else arquivo
         except Exception:
             return None
 
     def _renomear_arquivo_unico(self, nome_arquivo: str) -> Optional[str]:
+        """Dá um nome único ao arquivo baixado e o registra no índice de conteúdo (SHA-256)."""
+        novo_nome = self._aplicar_nome_unico(nome_arquivo)
+        if not novo_nome:
+            return novo_nome
+        self.download_watcher.ignorar(novo_nome)
+        self.ultimo_arquivo = self._indexar_arquivo(novo_nome)
+        if self.limite_espaco:
+            self.limite_espaco.registrar(os.path.join(self.pasta_download, self.ultimo_arquivo))
+        return self.ultimo_arquivo
+
+    def _indexar_arquivo(self, nome_arquivo: str) -> str:
+        """
+        Registra o PDF no índice. Se ele for cópia idêntica de um PDF já guardado, a cópia vai para a
+        pasta de duplicatas e o nome (relativo a esta pasta) do arquivo canônico é retornado no lugar.
+        """
+        try:
+            caminho = os.path.join(self.pasta_download, nome_arquivo)
+            _, existente = self.indice.registrar(caminho)
+            if not existente:
+                return nome_arquivo
+            
+            pasta_duplicatas = os.path.join(self.indice.pasta_base, "duplicatas")
+            os.makedirs(pasta_duplicatas, exist_ok=True)
+            destino = os.path.join(pasta_duplicatas, nome_arquivo)
+            if os.path.exists(destino):
+                nome_base, ext = os.path.splitext(nome_arquivo)
+                destino = os.path.join(pasta_duplicatas, f"{nome_base}_dup_{self.extraction_count:03d}{ext}")
+            shutil.move(caminho, destino)
+            return os.path.relpath(existente, self.pasta_download)
+        except Exception:
+            return nome_arquivo
+
+    def _aplicar_nome_unico(self, nome_arquivo: str) -> Optional[str]:
         """Renomeia arquivo para evitar conflitos, usando timestamp + contador."""
         try:
             from datetime import datetime
@@ -415,32 +465,16 @@ class FrameHandler:
         except Exception:
             return nome_arquivo
 
-    def _registrar_arquivos_existentes(self):
-        """Registra arquivos que já existem na pasta de download."""
-        try:
-            self.arquivos_antes = set(os.listdir(self.pasta_download))
-        except:
-            self.arquivos_antes = set()
-
     def _ler_pdf_baixado(self, nome_arquivo: str) -> str:
-        """Lê o conteúdo textual de um arquivo PDF baixado."""
+        """
+        Lê o texto da primeira página com texto do PDF baixado, o suficiente para validar o download;
+        o PDF inteiro é lido depois, página a página, por quem extrai as publicações (ultimo_arquivo).
+        """
         try:
             caminho_arquivo = os.path.join(self.pasta_download, nome_arquivo)
             
-            if PyPDF2:
-                try:
-                    with open(caminho_arquivo, 'rb') as file:
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        texto = "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
-                        if texto.strip(): return texto
-                except Exception: pass
-            
-            if pdfplumber:
-                try:
-                    with pdfplumber.open(caminho_arquivo) as pdf:
-                        texto = "".join(page.extract_text() + "\n" for page in pdf.pages if page.extract_text())
-                        if texto.strip(): return texto
-                except Exception: pass
+            texto = next((pagina for pagina in iterar_paginas(caminho_arquivo) if pagina.strip()), "")
+            if texto: return texto
             
             tamanho = os.path.getsize(caminho_arquivo)
             return f"PDF_BAIXADO: {nome_arquivo} ({tamanho} bytes)"
@@ -474,6 +508,12 @@ class FrameHandler:
         except:
             return "DOWNLOAD_FALHOU - Erro genérico"
 
+    def fechar(self):
+        """Libera o observador da pasta e as conexões HTTP."""
+        self.download_watcher.parar()
+        if self.pdf_downloader:
+            self.pdf_downloader.fechar()
+
     def reset_contador(self):
         """Reseta o contador de extrações."""
         self.extraction_count = 0
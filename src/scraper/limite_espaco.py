@@ -0,0 +1,264 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from utils.config import Config
+from utils.logger import get_logger
+from .pdf_index import PDFIndex
+
+
+class LimiteEspaco:
+    """
+    Mantém pastas (downloads de PDFs, cache de textos) abaixo de um orçamento em MB, descartando
+    os arquivos usados há mais tempo (LRU). Tamanho e último acesso de cada arquivo ficam num
+    índice SQLite, atualizado por quem grava ou lê (`registrar`/`tocar`) e por uma varredura
+    incremental: a cada passo, cada pasta é percorrida só em um lote de arquivos, para descobrir
+    os que apareceram por fora e, ao fim da volta completa, esquecer os que foram apagados.
+    Arquivos usados há menos de IDADE_MINIMA segundos nunca são descartados; um arquivo que não
+    pôde ser apagado volta para o fim da fila, como se tivesse acabado de ser usado.
+    """
+
+    NOME_ARQUIVO = 'limite_espaco.db'
+    LOTE_VARREDURA = 500
+    LOTE_DESCARTE = 100
+    IDADE_MINIMA = 300
+    INTERVALO = 30.0
+
+    def __init__(self, caminho_db: Optional[str] = None, intervalo: Optional[float] = None):
+        self.caminho_db = caminho_db or os.path.join(Config.DATA_DIR, self.NOME_ARQUIVO)
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        self.intervalo = self.INTERVALO if intervalo is None else intervalo
+        self.logger = get_logger('limite_espaco')
+
+        self._areas: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._removidos = {"arquivos": 0, "bytes": 0}
+        self._indices_proprios = []
+        self._conexao = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS arquivos (
+                    caminho TEXT PRIMARY KEY,
+                    area TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    ultimo_acesso REAL NOT NULL,
+                    varredura INTEGER NOT NULL
+                )
+            """)
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_arquivos_lru ON arquivos(area, ultimo_acesso)")
+
+    @classmethod
+    def padrao(cls, pasta_download: str, indice: Optional[PDFIndex] = None) -> 'LimiteEspaco':
+        """
+        Serviço com as áreas usuais: PDFs da pasta de downloads e textos do CacheManager em CACHE_DIR.
+        Os PDFs descartados saem também do `indice` (sem ele, é aberto o índice da pasta de downloads).
+        O cache de textos extraídos (textos_pdf.db, com orçamento próprio) também fica em CACHE_DIR,
+        então os arquivos do CacheManager recebem o que sobra de CACHE_MAX_SIZE_MB.
+        """
+        from .cache_manager import CacheManager
+        limite = cls()
+        if indice is None:
+            indice = PDFIndex(pasta_download)
+            limite._indices_proprios.append(indice)
+        limite.adicionar_area('downloads', pasta_download, Config.DOWNLOADS_MAX_SIZE_MB, ('.pdf',),
+                              ao_remover=indice.remover)
+        max_cache_mb = max(Config.CACHE_MAX_SIZE_MB - Config.TEXT_CACHE_MAX_SIZE_MB, 0)
+        limite.adicionar_area('cache', Config.CACHE_DIR, max_cache_mb, CacheManager.EXTENSOES)
+        return limite
+
+    def adicionar_area(self, nome: str, pasta: str, max_mb: float, extensoes: Tuple[str, ...],
+                       ao_remover: Optional[Callable[[str], None]] = None):
+        """
+        Passa a controlar os arquivos com as `extensoes` dentro de `pasta` (e subpastas).
+        `ao_remover(caminho)` é chamado para cada arquivo descartado (ex.: PDFIndex.remover).
+        """
+        with self._lock:
+            geracao = self._conexao.execute(
+                "SELECT COALESCE(MAX(varredura), 0) FROM arquivos WHERE area = ?", (nome,)
+            ).fetchone()[0]
+        self._areas[nome] = {
+            "pasta": os.path.abspath(pasta), "max_bytes": int(max_mb * 1024 * 1024),
+            "extensoes": tuple(extensoes), "geracao": geracao + 1, "varredura": None, "ao_remover": ao_remover
+        }
+
+    def registrar(self, caminho: str):
+        """Registra um arquivo gravado ou reaproveitado agora (tamanho atual, acesso = agora)."""
+        caminho = os.path.abspath(caminho)
+        nome = self._area_do_arquivo(caminho)
+        if not nome:
+            return
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            return
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                INSERT INTO arquivos (caminho, area, tamanho, ultimo_acesso, varredura) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(caminho) DO UPDATE SET
+                    tamanho = excluded.tamanho, ultimo_acesso = excluded.ultimo_acesso, varredura = excluded.varredura
+            """, (caminho, nome, tamanho, time.time(), self._areas[nome]["geracao"]))
+
+    def tocar(self, caminho: str):
+        """Marca um arquivo como usado agora (leitura)."""
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "UPDATE arquivos SET ultimo_acesso = ? WHERE caminho = ?", (time.time(), os.path.abspath(caminho))
+            )
+
+    def passo(self) -> int:
+        """Um passo incremental: varre o próximo lote de cada área e descarta o excedente. Retorna os removidos."""
+        for nome in list(self._areas):
+            self._varrer_lote(nome)
+        return self.aplicar_limites()
+
+    def aplicar_limites(self) -> int:
+        """Descarta os arquivos menos usados recentemente de cada área até ela caber no orçamento."""
+        removidos = 0
+        for nome, area in self._areas.items():
+            excedente = self.tamanho_area(nome) - area["max_bytes"]
+            while excedente > 0:
+                with self._lock:
+                    candidatos = self._conexao.execute(
+                        "SELECT caminho, tamanho FROM arquivos WHERE area = ? AND ultimo_acesso < ? "
+                        "ORDER BY ultimo_acesso LIMIT ?", (nome, time.time() - self.IDADE_MINIMA, self.LOTE_DESCARTE)
+                    ).fetchall()
+                if not candidatos:
+                    break
+                descartados, falhas = [], []
+                for caminho, tamanho in candidatos:
+                    if excedente <= 0:
+                        break
+                    try:
+                        os.remove(caminho)
+                        removidos += 1
+                        self._removidos["arquivos"] += 1
+                        self._removidos["bytes"] += tamanho
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        self.logger.warning(f"Não foi possível descartar {caminho}: {e}")
+                        falhas.append((time.time(), caminho))
+                        continue
+                    descartados.append((caminho,))
+                    excedente -= tamanho
+                    if area["ao_remover"]:
+                        try:
+                            area["ao_remover"](caminho)
+                        except Exception as e:
+                            self.logger.warning(f"Falha ao tratar o descarte de {caminho}: {e}")
+                with self._lock, self._conexao:
+                    self._conexao.executemany("DELETE FROM arquivos WHERE caminho = ?", descartados)
+                    # Quem não pôde ser apagado sai da frente da fila e fica protegido por IDADE_MINIMA
+                    self._conexao.executemany("UPDATE arquivos SET ultimo_acesso = ? WHERE caminho = ?", falhas)
+                if not descartados:
+                    break
+        if removidos:
+            self.logger.info(f"{removidos} arquivo(s) descartado(s) para respeitar o limite de espaço")
+        return removidos
+
+    def tamanho_area(self, nome: str) -> int:
+        with self._lock:
+            return self._conexao.execute(
+                "SELECT COALESCE(SUM(tamanho), 0) FROM arquivos WHERE area = ?", (nome,)
+            ).fetchone()[0]
+
+    def estatisticas(self) -> Dict:
+        """Tamanho atual e orçamento (MB) de cada área, e o total descartado pelo serviço."""
+        areas = {
+            nome: {"tamanho_mb": round(self.tamanho_area(nome) / (1024 * 1024), 2),
+                   "max_mb": round(area["max_bytes"] / (1024 * 1024), 2)}
+            for nome, area in self._areas.items()
+        }
+        return {"areas": areas, "removidos": self._removidos["arquivos"],
+                "removidos_mb": round(self._removidos["bytes"] / (1024 * 1024), 2)}
+
+    def iniciar(self):
+        """Executa `passo` periodicamente em segundo plano."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="limite-espaco", daemon=True)
+        self._thread.start()
+
+    def encerrar(self):
+        """Para a execução em segundo plano, aplica os limites uma última vez e fecha o índice."""
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.aplicar_limites()
+        except Exception as e:
+            self.logger.warning(f"Falha ao aplicar o limite de espaço: {e}")
+        self.logger.info(f"Limite de espaço: {self.estatisticas()}")
+        self.fechar()
+
+    def fechar(self):
+        for indice in self._indices_proprios:
+            indice.fechar()
+        self._indices_proprios = []
+        try:
+            self._conexao.close()
+        except Exception:
+            pass
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                self.passo()
+            except Exception as e:
+                self.logger.warning(f"Falha no passo de limpeza: {e}")
+            self._parar.wait(self.intervalo)
+
+    def _area_do_arquivo(self, caminho: str) -> Optional[str]:
+        for nome, area in self._areas.items():
+            if caminho.startswith(area["pasta"] + os.sep) and caminho.endswith(area["extensoes"]):
+                return nome
+        return None
+
+    def _varrer_lote(self, nome: str):
+        """
+        Indexa o próximo lote de arquivos da área. Ao terminar uma volta completa na pasta, esquece
+        os arquivos que não foram vistos nela (apagados por fora) e começa uma nova volta no passo seguinte.
+        """
+        area = self._areas[nome]
+        if area["varredura"] is None:
+            area["varredura"] = self._percorrer(area["pasta"], area["extensoes"])
+        lote = []
+        for _ in range(self.LOTE_VARREDURA):
+            try:
+                lote.append(next(area["varredura"]))
+            except StopIteration:
+                area["varredura"] = None
+                break
+        geracao = area["geracao"]
+        with self._lock, self._conexao:
+            self._conexao.executemany("""
+                INSERT INTO arquivos (caminho, area, tamanho, ultimo_acesso, varredura) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(caminho) DO UPDATE SET tamanho = excluded.tamanho, varredura = excluded.varredura
+            """, [(caminho, nome, tamanho, mtime, geracao) for caminho, tamanho, mtime in lote])
+            if area["varredura"] is None:
+                self._conexao.execute("DELETE FROM arquivos WHERE area = ? AND varredura < ?", (nome, geracao))
+                area["geracao"] = geracao + 1
+
+    @staticmethod
+    def _percorrer(pasta: str, extensoes: Tuple[str, ...]) -> Iterator[Tuple[str, int, float]]:
+        pendentes = [pasta]
+        while pendentes:
+            try:
+                with os.scandir(pendentes.pop()) as entradas:
+                    for entrada in entradas:
+                        try:
+                            if entrada.is_dir(follow_symlinks=False):
+                                pendentes.append(entrada.path)
+                            elif entrada.name.endswith(extensoes) and entrada.is_file():
+                                stat = entrada.stat()
+                                yield entrada.path, stat.st_size, stat.st_mtime
+                        except OSError:
+                            continue
+            except OSError:
+                continue
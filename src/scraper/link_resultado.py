@@ -0,0 +1,50 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urljoin
+
+# URL passada a popup('...') / window.open('...') no onclick dos links de 'Visualizar'
+_PADRAO_URL_ONCLICK = re.compile(r"""(?:popup|open)\s*\(\s*['"]([^'"]+)['"]""", re.IGNORECASE)
+
+
+@dataclass
+class LinkResultado:
+    """
+    Link de 'Visualizar' da lista de resultados, capturado como dados simples (sem WebElement):
+    pode ser processado depois de trocas de janela, repassado a outra sessão ou baixado por HTTP.
+    """
+    indice: int
+    pagina_resultado: int
+    posicao: int
+    url: Optional[str] = None
+    onclick: Optional[str] = None
+    texto: str = ""
+    linha: str = ""
+
+    @classmethod
+    def from_dados(cls, dados: dict, url_base: str, indice: int, pagina_resultado: int) -> 'LinkResultado':
+        """Monta o link a partir dos atributos lidos na página (href, onclick, texto da linha)."""
+        onclick = dados.get('onclick') or None
+        href = dados.get('href') or ''
+        url = None
+        if onclick:
+            encontrado = _PADRAO_URL_ONCLICK.search(onclick)
+            if encontrado:
+                url = urljoin(url_base, encontrado.group(1))
+        if not url and href and href != '#' and not href.startswith('javascript:'):
+            url = urljoin(url_base, href)
+
+        texto = ' '.join((dados.get('texto') or '').split())
+        linha = ' '.join((dados.get('linha') or '').split())
+        return cls(
+            indice=indice, pagina_resultado=pagina_resultado, posicao=dados.get('posicao', 0),
+            url=url, onclick=onclick, texto=texto, linha=linha
+        )
+
+    @property
+    def chave(self) -> str:
+        """
+        Identifica o link sem depender da posição na lista: URL, ou onclick, ou o texto da linha do
+        resultado (o texto do próprio link, 'Visualizar', se repete em todos).
+        """
+        return self.url or self.onclick or self.linha or f"posicao:{self.indice}"
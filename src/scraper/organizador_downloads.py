@@ -4,12 +4,15 @@ from datetime import datetime
 import json
 import re
 
+from .pdf_index import PDFIndex
+
 class OrganizadorDownloads:
     def __init__(self, pasta_download="./downloads_dje"):
         self.pasta_download = os.path.abspath(pasta_download)
         self.pasta_backup = os.path.join(self.pasta_download, "backup")
         self.pasta_duplicados = os.path.join(self.pasta_download, "duplicados")
         self.pasta_organizados = os.path.join(self.pasta_download, "organizados")
+        self.indice = PDFIndex(self.pasta_download)
         
     def analisar_downloads(self):
         """Analisa todos os downloads e identifica problemas como duplicatas ou arquivos pequenos."""
@@ -49,17 +52,32 @@ class OrganizadorDownloads:
             nomes_similares[nome_limpo].append(arquivo)
         
         duplicatas_tamanho = {t: arqs for t, arqs in tamanhos.items() if len(arqs) > 1}
+        duplicatas_conteudo = self._agrupar_por_hash(duplicatas_tamanho)
         nomes_duplicados = {n: arqs for n, arqs in nomes_similares.items() if len(arqs) > 1}
         pequenos = [arq for arq, info in arquivos_info.items() if info['tamanho'] < 10000] # < 10KB
         
         return {
             'total_arquivos': len(arquivos),
             'duplicatas_tamanho': duplicatas_tamanho,
+            'duplicatas_conteudo': duplicatas_conteudo,
             'nomes_similares': nomes_duplicados,
             'arquivos_pequenos': pequenos,
             'arquivos_info': arquivos_info
         }
     
+    def _agrupar_por_hash(self, grupos_tamanho):
+        """
+        Agrupa por SHA-256 apenas os arquivos que têm tamanho repetido (os demais não podem ser
+        cópias). Os hashes vêm do índice quando o arquivo não mudou desde o último registro.
+        """
+        hashes = {}
+        for arquivos in grupos_tamanho.values():
+            for arquivo in arquivos:
+                sha256 = self.indice.hash_arquivo(os.path.join(self.pasta_download, arquivo))
+                if sha256:
+                    hashes.setdefault(sha256, []).append(arquivo)
+        return {h: arqs for h, arqs in hashes.items() if len(arqs) > 1}
+
     def _limpar_nome_para_comparacao(self, nome):
         """Remove números, timestamps e caracteres especiais para comparação de nomes."""
         nome = re.sub(r'_?\d{8}_\d{6}', '', nome)
@@ -101,20 +119,21 @@ class OrganizadorDownloads:
                         contador += 1
                 
                 os.rename(caminho_original, novo_caminho)
+                self.indice.renomear(caminho_original, novo_caminho)
             except Exception:
                 pass
     
     def remover_duplicatas(self):
-        """Remove arquivos duplicados (baseado no mesmo tamanho), mantendo o mais antigo."""
+        """Remove arquivos duplicados (mesmo conteúdo, pelo SHA-256), mantendo o mais antigo."""
         analise = self.analisar_downloads()
         if not analise: return
         
-        duplicatas = analise.get('duplicatas_tamanho', {})
+        duplicatas = analise.get('duplicatas_conteudo', {})
         if not duplicatas: return
         
         os.makedirs(self.pasta_duplicados, exist_ok=True)
         
-        for tamanho, arquivos_dup in duplicatas.items():
+        for sha256, arquivos_dup in duplicatas.items():
             if len(arquivos_dup) <= 1:
                 continue
             
@@ -142,8 +161,11 @@ class OrganizadorDownloads:
                             contador += 1
                     
                     shutil.move(origem, destino)
+                    self.indice.remover(origem)
                 except Exception:
                     pass # Log errors
+            
+            self.indice.registrar(os.path.join(self.pasta_download, arquivo_manter))
     
     def organizar_por_data(self):
         arquivos = [f for f in os.listdir(self.pasta_download) 
@@ -173,6 +195,7 @@ class OrganizadorDownloads:
                     origem = os.path.join(self.pasta_download, arquivo)
                     destino = os.path.join(pasta_data, arquivo)
                     shutil.move(origem, destino)
+                    self.indice.renomear(origem, destino)
                 except Exception:
                     pass # Log errors
     
@@ -218,7 +241,8 @@ class OrganizadorDownloads:
             'pasta_download': self.pasta_download,
             'estatisticas': {
                 'total_arquivos': analise['total_arquivos'],
-                'grupos_duplicatas': len(analise['duplicatas_tamanho']),
+                'grupos_duplicatas': len(analise['duplicatas_conteudo']),
+                'grupos_mesmo_tamanho': len(analise['duplicatas_tamanho']),
                 'arquivos_pequenos': len(analise['arquivos_pequenos']),
                 'grupos_nomes_similares': len(analise['nomes_similares'])
             },
@@ -0,0 +1,151 @@
+import os
+import re
+import uuid
+from typing import Optional
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from utils.config import Config
+
+
+class PDFDownloader:
+    """
+    Baixa PDFs do DJE direto por HTTP, reaproveitando os cookies da sessão do Selenium.
+    Evita as tentativas pelo navegador (botões, Ctrl+S, blob) quando a URL do PDF já é conhecida.
+    """
+
+    PDF_ASSINATURA = b'%PDF'
+    PDF_FIM = b'%%EOF'
+    # Trecho final do arquivo em que o marcador de fim do PDF é procurado
+    TAMANHO_CAUDA = 2048
+    PADRAO_URL_EMBUTIDA = re.compile(
+        r'<(?:iframe|frame|embed|object)[^>]+(?:src|data)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE
+    )
+
+    def __init__(self, pasta_download="./downloads_dje", max_conexoes: Optional[int] = None, timeout: Optional[int] = None):
+        self.pasta_download = os.path.abspath(pasta_download)
+        self.max_conexoes = max_conexoes or max(4, Config.MAX_CONCURRENT_EXTRACTIONS * 2)
+        self.timeout = timeout or Config.PAGE_LOAD_TIMEOUT
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_conexoes, pool_maxsize=self.max_conexoes)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        os.makedirs(self.pasta_download, exist_ok=True)
+
+    def sincronizar_sessao(self, driver):
+        """Copia cookies e user-agent do navegador para a sessão HTTP."""
+        try:
+            for cookie in driver.get_cookies():
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain'), path=cookie.get('path', '/')
+                )
+        except Exception:
+            pass
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent;")
+            if user_agent:
+                self.session.headers['User-Agent'] = user_agent
+        except Exception:
+            pass
+
+    def resolver_url_pdf(self, driver, timeout: Optional[int] = None) -> Optional[str]:
+        """Resolve a URL do PDF a partir do src do 'bottomFrame' ou da própria URL da janela."""
+        try:
+            frame = WebDriverWait(driver, timeout or Config.PDF_LOAD_TIMEOUT).until(
+                EC.presence_of_element_located((By.NAME, "bottomFrame"))
+            )
+            src = frame.get_attribute("src")
+            if src and not src.startswith(('about:', 'javascript:')):
+                return urljoin(driver.current_url, src)
+        except Exception:
+            pass
+
+        try:
+            url_atual = driver.current_url
+            if '.pdf' in url_atual.lower() or 'getPaginaDoDiario' in url_atual:
+                return url_atual
+        except Exception:
+            pass
+        return None
+
+    def baixar(self, url: str, referer: Optional[str] = None, seguir_embutido: bool = True) -> Optional[str]:
+        """
+        Baixa o PDF da URL para a pasta de download e retorna o nome do arquivo salvo.
+        Se a resposta for HTML com um frame/embed apontando para o PDF, segue esse link uma vez.
+        Um download incompleto (menor que o Content-Length ou sem o marcador de fim do PDF) é
+        descartado, sem deixar arquivo parcial na pasta.
+        """
+        headers = {'Referer': referer} if referer else {}
+        caminho_parcial = None
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                blocos = response.iter_content(chunk_size=64 * 1024)
+                primeiro_bloco = next(blocos, b'')
+
+                if not primeiro_bloco.lstrip().startswith(self.PDF_ASSINATURA):
+                    if not seguir_embutido:
+                        return None
+                    html = (primeiro_bloco + b''.join(blocos)).decode(response.encoding or 'latin-1', errors='ignore')
+                    url_embutida = self._extrair_url_embutida(html, response.url)
+                    if url_embutida and url_embutida != url:
+                        return self.baixar(url_embutida, referer=response.url, seguir_embutido=False)
+                    return None
+
+                nome_arquivo = f"http_{uuid.uuid4().hex[:12]}.pdf"
+                caminho_final = os.path.join(self.pasta_download, nome_arquivo)
+                caminho_parcial = caminho_final + '.part'
+                tamanho = len(primeiro_bloco)
+                cauda = primeiro_bloco[-self.TAMANHO_CAUDA:]
+                with open(caminho_parcial, 'wb') as f:
+                    f.write(primeiro_bloco)
+                    for bloco in blocos:
+                        f.write(bloco)
+                        tamanho += len(bloco)
+                        cauda = (cauda + bloco)[-self.TAMANHO_CAUDA:]
+
+                esperado = response.headers.get('Content-Length')
+                completo = self.PDF_FIM in cauda and (
+                    not esperado or not esperado.isdigit() or 'Content-Encoding' in response.headers
+                    or int(esperado) == tamanho
+                )
+                if not completo:
+                    return None
+                os.replace(caminho_parcial, caminho_final)
+                caminho_parcial = None
+                return nome_arquivo
+        except Exception:
+            return None
+        finally:
+            if caminho_parcial:
+                try:
+                    os.remove(caminho_parcial)
+                except OSError:
+                    pass
+
+    def _extrair_url_embutida(self, html: str, url_base: str) -> Optional[str]:
+        """
+        Procura em uma página HTML o endereço do PDF embutido em frame/iframe/embed/object.
+        Só endereços com cara de PDF (.pdf ou getPaginaDoDiario) valem; sem nenhum, retorna None.
+        """
+        candidatos = self.PADRAO_URL_EMBUTIDA.findall(html)
+        for candidato in candidatos:
+            if '.pdf' in candidato.lower() or 'getPaginaDoDiario' in candidato:
+                return urljoin(url_base, candidato)
+        return None
+
+    def fechar(self):
+        """Fecha as conexões HTTP do pool."""
+        try:
+            self.session.close()
+        except Exception:
+            pass
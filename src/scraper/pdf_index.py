@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+
+class PDFIndex:
+    """
+    Índice persistente (SQLite) dos PDFs baixados, endereçado pelo SHA-256 do conteúdo.
+    Cada hash aponta para um único arquivo canônico, com data de registro e número do processo,
+    de modo que uma cópia idêntica é reconhecida antes de qualquer extração de texto.
+    Os caminhos são gravados relativos à pasta base, para o índice sobreviver a mudanças de diretório.
+    """
+
+    NOME_ARQUIVO = '.indice_pdfs.db'
+    TAMANHO_BLOCO = 1024 * 1024
+
+    def __init__(self, pasta_base: str = "./downloads_dje"):
+        self.pasta_base = os.path.abspath(pasta_base)
+        os.makedirs(self.pasta_base, exist_ok=True)
+        self.caminho_db = os.path.join(self.pasta_base, self.NOME_ARQUIVO)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        self._criar_tabelas()
+
+    def _criar_tabelas(self):
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS pdfs (
+                    sha256 TEXT PRIMARY KEY,
+                    arquivo TEXT NOT NULL,
+                    tamanho INTEGER,
+                    mtime REAL,
+                    data_registro TEXT,
+                    numero_processo TEXT
+                )
+            """)
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_pdfs_arquivo ON pdfs(arquivo)")
+
+    @classmethod
+    def calcular_hash(cls, caminho: str) -> str:
+        """Calcula o SHA-256 do conteúdo do arquivo."""
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(cls.TAMANHO_BLOCO), b''):
+                sha.update(bloco)
+        return sha.hexdigest()
+
+    def hash_arquivo(self, caminho: str) -> Optional[str]:
+        """Retorna o hash do arquivo, reaproveitando o do índice quando tamanho e mtime não mudaram."""
+        try:
+            stat = os.stat(caminho)
+        except OSError:
+            return None
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT sha256, tamanho, mtime FROM pdfs WHERE arquivo = ?", (self._relativo(caminho),)
+            ).fetchone()
+        if linha and linha['tamanho'] == stat.st_size and linha['mtime'] == stat.st_mtime:
+            return linha['sha256']
+        try:
+            return self.calcular_hash(caminho)
+        except OSError:
+            return None
+
+    def registrar(self, caminho: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Registra o arquivo no índice. Retorna (hash, caminho_existente): se já houver outro arquivo
+        presente em disco com o mesmo conteúdo, o segundo valor é o caminho absoluto dele e o índice
+        não é alterado. A consulta e a gravação acontecem na mesma transação, então dois registros
+        simultâneos do mesmo conteúdo (ex.: sessões paralelas) elegem um único arquivo canônico.
+        """
+        sha256 = self.hash_arquivo(caminho)
+        if not sha256:
+            return None, None
+
+        relativo = self._relativo(caminho)
+        try:
+            stat = os.stat(caminho)
+        except OSError:
+            return None, None
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                INSERT INTO pdfs (sha256, arquivo, tamanho, mtime, data_registro)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(sha256) DO NOTHING
+            """, (sha256, relativo, stat.st_size, stat.st_mtime, datetime.now().isoformat()))
+            canonico = self._conexao.execute("SELECT arquivo FROM pdfs WHERE sha256 = ?", (sha256,)).fetchone()['arquivo']
+            if canonico != relativo and os.path.isfile(self._absoluto(canonico)):
+                return sha256, self._absoluto(canonico)
+
+            # Este arquivo passa a ser o canônico do hash (o anterior sumiu do disco)
+            self._conexao.execute("DELETE FROM pdfs WHERE arquivo = ? AND sha256 != ?", (relativo, sha256))
+            self._conexao.execute(
+                "UPDATE pdfs SET arquivo = ?, tamanho = ?, mtime = ? WHERE sha256 = ?",
+                (relativo, stat.st_size, stat.st_mtime, sha256)
+            )
+        return sha256, None
+
+    def buscar(self, sha256: str) -> Optional[Dict]:
+        """Busca a entrada de um hash (arquivo relativo, tamanho, data, número do processo)."""
+        with self._lock:
+            linha = self._conexao.execute("SELECT * FROM pdfs WHERE sha256 = ?", (sha256,)).fetchone()
+        return dict(linha) if linha else None
+
+    def caminho_do_hash(self, sha256: str) -> Optional[str]:
+        """Caminho absoluto do arquivo canônico de um hash, se ele ainda existir em disco."""
+        entrada = self.buscar(sha256)
+        if not entrada:
+            return None
+        caminho = self._absoluto(entrada['arquivo'])
+        return caminho if os.path.isfile(caminho) else None
+
+    def buscar_por_arquivo(self, caminho: str) -> Optional[Dict]:
+        """Busca a entrada registrada para um caminho de arquivo."""
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT * FROM pdfs WHERE arquivo = ?", (self._relativo(caminho),)
+            ).fetchone()
+        return dict(linha) if linha else None
+
+    def atualizar_processo(self, caminho: str, numero_processo: Optional[str]):
+        """Associa o número do processo extraído ao PDF."""
+        if not numero_processo:
+            return
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "UPDATE pdfs SET numero_processo = ? WHERE arquivo = ?", (numero_processo, self._relativo(caminho))
+            )
+
+    def renomear(self, caminho_antigo: str, caminho_novo: str):
+        """Atualiza o índice após um arquivo ser movido ou renomeado."""
+        try:
+            stat = os.stat(caminho_novo)
+        except OSError:
+            return
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "UPDATE pdfs SET arquivo = ?, tamanho = ?, mtime = ? WHERE arquivo = ?",
+                (self._relativo(caminho_novo), stat.st_size, stat.st_mtime, self._relativo(caminho_antigo))
+            )
+
+    def remover(self, caminho: str):
+        """Remove a entrada do arquivo (ex.: movido para duplicatas ou apagado)."""
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM pdfs WHERE arquivo = ?", (self._relativo(caminho),))
+
+    def fechar(self):
+        try:
+            self._conexao.close()
+        except Exception:
+            pass
+
+    def _relativo(self, caminho: str) -> str:
+        return os.path.relpath(os.path.abspath(caminho), self.pasta_base)
+
+    def _absoluto(self, relativo: str) -> str:
+        return os.path.normpath(os.path.join(self.pasta_base, relativo))
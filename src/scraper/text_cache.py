@@ -0,0 +1,198 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Iterator, Optional
+
+from utils.config import Config
+from .pdf_index import PDFIndex
+
+
+class PDFTextCache:
+    """
+    Cache persistente (SQLite) do texto extraído dos PDFs.
+    A busca rápida usa (caminho, tamanho, mtime), ou seja, só um stat por arquivo; se o arquivo
+    mudou de lugar, a busca cai para o SHA-256 do conteúdo. Textos são guardados comprimidos e o
+    total é mantido abaixo de TEXT_CACHE_MAX_SIZE_MB (parte do CACHE_MAX_SIZE_MB da pasta de cache),
+    descartando os menos usados recentemente.
+    O banco usa auto_vacuum incremental, então o espaço dos textos descartados volta para o disco.
+    """
+
+    NOME_ARQUIVO = 'textos_pdf.db'
+    NIVEL_COMPRESSAO = 6
+
+    def __init__(self, caminho_db: Optional[str] = None, max_size_mb: Optional[int] = None):
+        self.caminho_db = caminho_db or os.path.join(Config.CACHE_DIR, self.NOME_ARQUIVO)
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        if max_size_mb is None:
+            max_size_mb = min(Config.TEXT_CACHE_MAX_SIZE_MB, Config.CACHE_MAX_SIZE_MB)
+        self.max_bytes = max_size_mb * 1024 * 1024
+
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        self._ativar_vacuum_incremental()
+        self._criar_tabelas()
+        self._total_bytes = self._conexao.execute("SELECT COALESCE(SUM(tamanho_bytes), 0) FROM textos").fetchone()[0]
+
+    def _ativar_vacuum_incremental(self):
+        """Liga o auto_vacuum incremental (num banco já existente, a mudança exige um VACUUM completo)."""
+        if self._conexao.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return
+        self._conexao.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conexao.execute("VACUUM")
+
+    def _liberar_espaco(self):
+        """Devolve ao sistema de arquivos as páginas livres do banco."""
+        with self._lock:
+            # Via executescript o pragma roda até o fim; com execute, só a primeira página seria liberada
+            self._conexao.executescript("PRAGMA incremental_vacuum;")
+
+    def _criar_tabelas(self):
+        with self._lock, self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS textos (
+                    sha256 TEXT PRIMARY KEY,
+                    texto BLOB NOT NULL,
+                    tamanho_bytes INTEGER NOT NULL,
+                    ultimo_acesso REAL NOT NULL
+                )
+            """)
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS arquivos (
+                    caminho TEXT PRIMARY KEY,
+                    tamanho INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    sha256 TEXT NOT NULL
+                )
+            """)
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_textos_acesso ON textos(ultimo_acesso)")
+
+    def obter(self, caminho: str, sha256: Optional[str] = None) -> Optional[str]:
+        """
+        Retorna o texto em cache para o PDF, ou None se não houver entrada válida.
+        `sha256` evita recalcular o hash quando ele já é conhecido (ex.: pelo PDFIndex).
+        """
+        caminho = os.path.abspath(caminho)
+        try:
+            stat = os.stat(caminho)
+        except OSError:
+            return None
+
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT tamanho, mtime, sha256 FROM arquivos WHERE caminho = ?", (caminho,)
+            ).fetchone()
+        if linha and linha[0] == stat.st_size and linha[1] == stat.st_mtime:
+            texto = self._carregar_texto(linha[2])
+            if texto is not None:
+                return texto
+
+        try:
+            sha256 = sha256 or PDFIndex.calcular_hash(caminho)
+        except OSError:
+            return None
+        texto = self._carregar_texto(sha256)
+        if texto is not None:
+            self._vincular_arquivo(caminho, stat, sha256)
+        return texto
+
+    def salvar(self, caminho: str, texto: str, sha256: Optional[str] = None):
+        """Guarda o texto extraído do PDF e aplica o limite de tamanho do cache."""
+        if not texto or not texto.strip():
+            return
+        self.salvar_comprimido(caminho, zlib.compress(texto.encode('utf-8'), self.NIVEL_COMPRESSAO), sha256)
+
+    def salvar_comprimido(self, caminho: str, comprimido: bytes, sha256: Optional[str] = None):
+        """Guarda um texto já comprimido com zlib (ex.: montado página a página por um worker)."""
+        if not comprimido:
+            return
+        caminho = os.path.abspath(caminho)
+        try:
+            stat = os.stat(caminho)
+            sha256 = sha256 or PDFIndex.calcular_hash(caminho)
+        except OSError:
+            return
+
+        with self._lock, self._conexao:
+            anterior = self._conexao.execute(
+                "SELECT tamanho_bytes FROM textos WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO textos (sha256, texto, tamanho_bytes, ultimo_acesso) VALUES (?, ?, ?, ?)",
+                (sha256, comprimido, len(comprimido), time.time())
+            )
+            self._total_bytes += len(comprimido) - (anterior[0] if anterior else 0)
+        self._vincular_arquivo(caminho, stat, sha256)
+        self._aplicar_limite()
+
+    def iterar_textos(self) -> Iterator[str]:
+        """Percorre todos os textos em cache (ex.: como corpus para benchmarks), sem alterar o LRU."""
+        with self._lock:
+            hashes = [linha[0] for linha in self._conexao.execute("SELECT sha256 FROM textos")]
+        for sha256 in hashes:
+            with self._lock:
+                linha = self._conexao.execute("SELECT texto FROM textos WHERE sha256 = ?", (sha256,)).fetchone()
+            if not linha:
+                continue
+            try:
+                yield zlib.decompress(linha[0]).decode('utf-8')
+            except (zlib.error, UnicodeDecodeError):
+                continue
+
+    def invalidar(self, caminho: str):
+        """Remove o vínculo do arquivo com o texto em cache (o texto fica disponível por hash)."""
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM arquivos WHERE caminho = ?", (os.path.abspath(caminho),))
+
+    def limpar(self):
+        """Apaga todo o cache de textos."""
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM arquivos")
+            self._conexao.execute("DELETE FROM textos")
+            self._total_bytes = 0
+        self._liberar_espaco()
+
+    def tamanho_mb(self) -> float:
+        return round(self._total_bytes / (1024 * 1024), 2)
+
+    def fechar(self):
+        try:
+            self._conexao.close()
+        except Exception:
+            pass
+
+    def _carregar_texto(self, sha256: str) -> Optional[str]:
+        with self._lock, self._conexao:
+            linha = self._conexao.execute("SELECT texto FROM textos WHERE sha256 = ?", (sha256,)).fetchone()
+            if not linha:
+                return None
+            self._conexao.execute("UPDATE textos SET ultimo_acesso = ? WHERE sha256 = ?", (time.time(), sha256))
+        try:
+            return zlib.decompress(linha[0]).decode('utf-8')
+        except (zlib.error, UnicodeDecodeError):
+            return None
+
+    def _vincular_arquivo(self, caminho: str, stat: os.stat_result, sha256: str):
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO arquivos (caminho, tamanho, mtime, sha256) VALUES (?, ?, ?, ?)",
+                (caminho, stat.st_size, stat.st_mtime, sha256)
+            )
+
+    def _aplicar_limite(self):
+        """Descarta os textos menos usados até o cache ficar abaixo de 90% do limite."""
+        if self.max_bytes <= 0 or self._total_bytes <= self.max_bytes:
+            return
+        alvo = int(self.max_bytes * 0.9)
+        with self._lock, self._conexao:
+            cursor = self._conexao.execute("SELECT sha256, tamanho_bytes FROM textos ORDER BY ultimo_acesso")
+            removidos = []
+            for sha256, tamanho in cursor:
+                if self._total_bytes <= alvo:
+                    break
+                removidos.append((sha256,))
+                self._total_bytes -= tamanho
+            self._conexao.executemany("DELETE FROM textos WHERE sha256 = ?", removidos)
+            self._conexao.execute("DELETE FROM arquivos WHERE sha256 NOT IN (SELECT sha256 FROM textos)")
+        self._liberar_espaco()
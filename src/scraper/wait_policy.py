@@ -0,0 +1,139 @@
+import time
+from typing import Callable, Dict, Optional, Any
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.config import Config
+from utils.logger import get_logger
+
+
+class EstatisticaEspera:
+    """Tempo efetivamente gasto por um tipo de espera ao longo da execução."""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.expiradas = 0
+        self.total = 0.0
+        self.media_movel = None
+
+    def registrar(self, duracao: float, expirou: bool = False):
+        self.chamadas += 1
+        self.total += duracao
+        if expirou:
+            self.expiradas += 1
+        self.media_movel = duracao if self.media_movel is None else 0.7 * self.media_movel + 0.3 * duracao
+
+
+class WaitPolicy:
+    """
+    Política central de esperas do scraping.
+    Condições explícitas (Selenium ou predicados) são verificadas com intervalo crescente, começando
+    perto do tempo típico já medido para aquela espera. Pausas sem condição observável se ajustam
+    sozinhas: encurtam enquanto a etapa seguinte dá certo e voltam a crescer quando ela falha.
+    """
+
+    INTERVALO_MINIMO = 0.05
+    INTERVALO_MAXIMO = 0.5
+
+    def __init__(self, driver=None):
+        self.driver = driver
+        self.logger = get_logger('wait_policy')
+        self.estatisticas: Dict[str, EstatisticaEspera] = {}
+        self.pausas: Dict[str, float] = {}
+
+    def set_driver(self, driver):
+        """Define o driver usado nas condições do Selenium."""
+        self.driver = driver
+
+    def aguardar(self, nome: str, condicao: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Aguarda `condicao(driver)` retornar um valor verdadeiro, por no máximo `timeout` segundos
+        (padrão: PDF_LOAD_TIMEOUT). Retorna o valor da condição, ou False se o tempo expirar.
+        """
+        return self.aguardar_ate(nome, lambda: condicao(self.driver), timeout)
+
+    def aguardar_ate(self, nome: str, predicado: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Aguarda um predicado sem argumentos, com intervalo de verificação crescente."""
+        timeout = Config.PDF_LOAD_TIMEOUT if timeout is None else timeout
+        estatistica = self._estatistica(nome)
+        intervalo = self._intervalo_inicial(estatistica)
+        inicio = time.time()
+
+        while True:
+            try:
+                resultado = predicado()
+                if resultado:
+                    estatistica.registrar(time.time() - inicio)
+                    return resultado
+            except WebDriverException:
+                pass # Elemento ausente/obsoleto ou página em transição; tenta de novo
+
+            decorrido = time.time() - inicio
+            if decorrido >= timeout:
+                estatistica.registrar(decorrido, expirou=True)
+                return False
+
+            time.sleep(min(intervalo, timeout - decorrido))
+            intervalo = min(intervalo * 1.5, self.INTERVALO_MAXIMO)
+
+    def medir(self, nome: str, funcao: Callable[[], Any]) -> Any:
+        """Executa uma espera implementada em outro lugar (ex.: download) e registra quanto ela levou."""
+        inicio = time.time()
+        resultado = funcao()
+        self._estatistica(nome).registrar(time.time() - inicio, expirou=not resultado)
+        return resultado
+
+    def documento_pronto(self, nome: str, timeout: Optional[float] = None) -> bool:
+        """Aguarda o document.readyState do contexto atual chegar a 'complete'."""
+        return bool(self.aguardar(
+            nome, lambda d: d.execute_script("return document.readyState") == "complete", timeout
+        ))
+
+    def pausa(self, nome: str, base: Optional[float] = None):
+        """
+        Pausa para etapas sem condição observável (ex.: diálogo de salvar, menu de contexto).
+        Começa em `base` (padrão: CLICK_PAUSE) e se ajusta com `registrar_resultado`.
+        """
+        base = Config.CLICK_PAUSE if base is None else base
+        duracao = self.pausas.setdefault(nome, base)
+        inicio = time.time()
+        time.sleep(duracao)
+        self._estatistica(nome).registrar(time.time() - inicio)
+
+    def registrar_resultado(self, nome: str, sucesso: bool, base: Optional[float] = None):
+        """Encurta a pausa após um sucesso e a dobra após uma falha, dentro de limites de `base`."""
+        base = Config.CLICK_PAUSE if base is None else base
+        atual = self.pausas.get(nome, base)
+        if sucesso:
+            self.pausas[nome] = max(atual * 0.75, base * 0.1)
+        else:
+            self.pausas[nome] = min(atual * 2, base * 2)
+
+    def tempo_total(self) -> float:
+        """Soma do tempo gasto em todas as esperas."""
+        return sum(e.total for e in self.estatisticas.values())
+
+    def relatorio(self) -> str:
+        """Resumo do tempo gasto por tipo de espera."""
+        linhas = [f"Esperas: {self.tempo_total():.1f}s no total"]
+        for nome, e in sorted(self.estatisticas.items(), key=lambda item: -item[1].total):
+            media = e.total / e.chamadas if e.chamadas else 0
+            linhas.append(
+                f"  {nome}: {e.chamadas}x, {e.total:.1f}s (média {media:.2f}s, expiradas {e.expiradas})"
+            )
+        return '\n'.join(linhas)
+
+    def registrar_relatorio(self):
+        """Envia o resumo das esperas para o log."""
+        if self.estatisticas:
+            self.logger.info(self.relatorio())
+
+    def _estatistica(self, nome: str) -> EstatisticaEspera:
+        if nome not in self.estatisticas:
+            self.estatisticas[nome] = EstatisticaEspera()
+        return self.estatisticas[nome]
+
+    def _intervalo_inicial(self, estatistica: EstatisticaEspera) -> float:
+        if estatistica.media_movel is None:
+            return self.INTERVALO_MINIMO
+        return min(max(estatistica.media_movel / 4, self.INTERVALO_MINIMO), self.INTERVALO_MAXIMO)
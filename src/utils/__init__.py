@@ -1,4 +1,5 @@
 from .config import Config, get_config
 from .logger import setup_logger, get_logger
+from .jsonl import GravadorJSONL, ler_publicacoes_jsonl
 
-__all__ = ['Config', 'get_config', 'setup_logger', 'get_logger']
\ No newline at end of file
+__all__ = ['Config', 'get_config', 'setup_logger', 'get_logger', 'GravadorJSONL', 'ler_publicacoes_jsonl']
\ No newline at end of file
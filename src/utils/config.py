@@ -10,13 +10,25 @@ class Config:
     CACHE_DIR = os.path.join(DATA_DIR, 'cache')
     RESULTS_DIR = os.path.join(DATA_DIR, 'results')
     BACKUPS_DIR = os.path.join(DATA_DIR, 'backups')
+    CHECKPOINTS_DIR = os.path.join(DATA_DIR, 'checkpoints')
     LOGS_DIR = os.path.join(BASE_DIR, 'logs')
+    # Resultados e backups em JSONL: compressão gzip e sincronização no disco a cada N publicações
+    RESULTS_COMPRESS = os.getenv('RESULTS_COMPRESS', 'false').lower() == 'true'
+    RESULTS_FSYNC_EVERY = int(os.getenv('RESULTS_FSYNC_EVERY', '50'))
     
     PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '30'))
     PDF_LOAD_TIMEOUT = int(os.getenv('PDF_LOAD_TIMEOUT', '8'))
+    DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', '10'))
     API_TIMEOUT = int(os.getenv('API_TIMEOUT', '10'))
     CLICK_PAUSE = float(os.getenv('CLICK_PAUSE', '1.0'))
     EXTRACTION_PAUSE = float(os.getenv('EXTRACTION_PAUSE', '2.0'))
+    DOWNLOAD_HTTP = os.getenv('DOWNLOAD_HTTP', 'true').lower() == 'true'
+    # Carrega a próxima página de resultados em outra aba enquanto a atual é processada
+    RESULTS_PREFETCH = os.getenv('RESULTS_PREFETCH', 'true').lower() == 'true'
+    # Pool de navegadores reaproveitados entre buscas (backfill e sessões paralelas)
+    DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '1'))
+    DRIVER_MAX_PAGES = int(os.getenv('DRIVER_MAX_PAGES', '200'))
+    DRIVER_MAX_MEMORY_GROWTH_MB = float(os.getenv('DRIVER_MAX_MEMORY_GROWTH_MB', '512'))
     
     CHROME_OPTIONS = [
         "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu",
@@ -50,12 +62,16 @@ class Config:
     
     CACHE_RETENTION_DAYS = int(os.getenv('CACHE_RETENTION_DAYS', '30'))
     CACHE_MAX_SIZE_MB = int(os.getenv('CACHE_MAX_SIZE_MB', '500'))
+    DOWNLOADS_MAX_SIZE_MB = int(os.getenv('DOWNLOADS_MAX_SIZE_MB', '2048'))
+    TEXT_CACHE_MAX_SIZE_MB = int(os.getenv('TEXT_CACHE_MAX_SIZE_MB', '200'))
     
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_TO_FILE = os.getenv('LOG_TO_FILE', 'true').lower() == 'true'
     LOG_MAX_FILES = int(os.getenv('LOG_MAX_FILES', '10'))
     
+    # Processos na extração de PDFs já baixados e sessões do navegador na extração do site
     MAX_CONCURRENT_EXTRACTIONS = int(os.getenv('MAX_CONCURRENT_EXTRACTIONS', '1'))
+    MAX_BROWSER_SESSIONS = int(os.getenv('MAX_BROWSER_SESSIONS', '1'))
     EXTRACTION_RETRY_ATTEMPTS = int(os.getenv('EXTRACTION_RETRY_ATTEMPTS', '3'))
     
     @classmethod
@@ -101,11 +117,21 @@ class Config:
         return {
             'dje_base_url': cls.DJE_BASE_URL, 'api_base_url': cls.API_BASE_URL,
             'cache_dir': cls.CACHE_DIR, 'results_dir': cls.RESULTS_DIR,
-            'backups_dir': cls.BACKUPS_DIR, 'logs_dir': cls.LOGS_DIR,
+            'backups_dir': cls.BACKUPS_DIR, 'checkpoints_dir': cls.CHECKPOINTS_DIR, 'logs_dir': cls.LOGS_DIR,
             'page_load_timeout': cls.PAGE_LOAD_TIMEOUT, 'pdf_load_timeout': cls.PDF_LOAD_TIMEOUT,
-            'api_timeout': cls.API_TIMEOUT, 'conteudo_min_chars': cls.CONTEUDO_MIN_CHARS,
+            'download_timeout': cls.DOWNLOAD_TIMEOUT, 'download_http': cls.DOWNLOAD_HTTP,
+            'results_prefetch': cls.RESULTS_PREFETCH,
+            'results_compress': cls.RESULTS_COMPRESS, 'results_fsync_every': cls.RESULTS_FSYNC_EVERY,
+            'driver_pool_size': cls.DRIVER_POOL_SIZE, 'driver_max_pages': cls.DRIVER_MAX_PAGES,
+            'driver_max_memory_growth_mb': cls.DRIVER_MAX_MEMORY_GROWTH_MB,
+            'api_timeout': cls.API_TIMEOUT,
+            'conteudo_min_chars': cls.CONTEUDO_MIN_CHARS,
             'indicadores_min': cls.INDICADORES_MIN, 'cache_retention_days': cls.CACHE_RETENTION_DAYS,
-            'log_level': cls.LOG_LEVEL, 'extraction_retry_attempts': cls.EXTRACTION_RETRY_ATTEMPTS
+            'cache_max_size_mb': cls.CACHE_MAX_SIZE_MB, 'downloads_max_size_mb': cls.DOWNLOADS_MAX_SIZE_MB,
+            'text_cache_max_size_mb': cls.TEXT_CACHE_MAX_SIZE_MB,
+            'log_level': cls.LOG_LEVEL, 'extraction_retry_attempts': cls.EXTRACTION_RETRY_ATTEMPTS,
+            'max_concurrent_extractions': cls.MAX_CONCURRENT_EXTRACTIONS,
+            'max_browser_sessions': cls.MAX_BROWSER_SESSIONS
         }
     
     @classmethod
@@ -132,6 +158,7 @@ class Config:
         print(f"\n⏱️ TIMEOUTS (segundos):")
         print(f"   Carregamento:      {cls.PAGE_LOAD_TIMEOUT}")
         print(f"   PDF:               {cls.PDF_LOAD_TIMEOUT}")
+        print(f"   Download:          {cls.DOWNLOAD_TIMEOUT}")
         print(f"   API:               {cls.API_TIMEOUT}")
         print(f"   Clique:            {cls.CLICK_PAUSE}")
         print(f"   Extração:          {cls.EXTRACTION_PAUSE}")
@@ -142,6 +169,7 @@ class Config:
         print(f"\n💾 CACHE:")
         print(f"   Retenção (dias):   {cls.CACHE_RETENTION_DAYS}")
         print(f"   Max size (MB):     {cls.CACHE_MAX_SIZE_MB}")
+        print(f"   Downloads (MB):    {cls.DOWNLOADS_MAX_SIZE_MB}")
         print(f"\n📝 LOGGING:")
         print(f"   Nível:             {cls.LOG_LEVEL}")
         print(f"   Para arquivo:      {cls.LOG_TO_FILE}")
@@ -175,6 +203,7 @@ class TestConfig(Config):
     CACHE_DIR = 'test_data/cache'
     RESULTS_DIR = 'test_data/results'
     BACKUPS_DIR = 'test_data/backups'
+    CHECKPOINTS_DIR = 'test_data/checkpoints'
     LOGS_DIR = 'test_data/logs'
     CONTEUDO_MIN_CHARS = 500
     PAGE_LOAD_TIMEOUT = 10
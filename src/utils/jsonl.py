@@ -0,0 +1,100 @@
+import os
+import gzip
+import json
+import threading
+from typing import Callable, Hashable, Iterable, Iterator, Optional
+
+from models.publicacao import Publicacao
+from .config import Config
+
+ASSINATURA_GZIP = b'\x1f\x8b'
+
+
+class GravadorJSONL:
+    """
+    Grava publicações em JSONL (uma linha JSON compacta por publicação) à medida que são
+    produzidas, sem montar a lista inteira em memória. Com `comprimir`, o arquivo é gzip
+    (extensão .gz). A cada `fsync_a_cada` linhas os dados são descarregados e sincronizados no
+    disco, então uma execução interrompida perde no máximo as últimas linhas.
+    Com `deduplicar_por`, publicações com chave já gravada são ignoradas.
+    Pode ser usado direto como `ao_extrair` (ex.: `scraper.executar(..., ao_extrair=gravador.adicionar)`).
+    """
+
+    def __init__(self, caminho: str, comprimir: Optional[bool] = None, fsync_a_cada: Optional[int] = None,
+                 deduplicar_por: Optional[Callable[[Publicacao], Hashable]] = None):
+        comprimir = Config.RESULTS_COMPRESS if comprimir is None else comprimir
+        if comprimir and not caminho.endswith('.gz'):
+            caminho += '.gz'
+        self.caminho = caminho
+        self.fsync_a_cada = max(1, fsync_a_cada or Config.RESULTS_FSYNC_EVERY)
+        self.deduplicar_por = deduplicar_por
+        self.quantidade = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._arquivo = gzip.open(caminho, 'at', encoding='utf-8') if comprimir else open(caminho, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._chaves = set()
+
+    def escrever(self, publicacao: Publicacao):
+        self.adicionar([publicacao])
+
+    def adicionar(self, publicacoes: Iterable[Publicacao]):
+        """Acrescenta as publicações ao arquivo (seguro para chamadas de várias threads)."""
+        with self._lock:
+            for publicacao in publicacoes:
+                if self.deduplicar_por:
+                    chave = self.deduplicar_por(publicacao)
+                    if chave in self._chaves:
+                        continue
+                    self._chaves.add(chave)
+                self._arquivo.write(json.dumps(publicacao.to_dict(), ensure_ascii=False, separators=(',', ':')) + "\n")
+                self.quantidade += 1
+                self._pendentes += 1
+                if self._pendentes >= self.fsync_a_cada:
+                    self._sincronizar()
+
+    def _sincronizar(self):
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self._pendentes = 0
+
+    def fechar(self):
+        with self._lock:
+            if self._arquivo.closed:
+                return
+            self._sincronizar()
+            self._arquivo.close()
+
+    def __enter__(self) -> 'GravadorJSONL':
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+
+def ler_publicacoes_jsonl(caminho: str) -> Iterator[Publicacao]:
+    """
+    Lê publicações de um arquivo JSONL (comprimido ou não, detectado pelo conteúdo) uma a uma, via
+    Publicacao.from_dict. Linhas incompletas de uma gravação interrompida são ignoradas. Arquivos
+    antigos com uma lista JSON também são aceitos (esses são carregados inteiros).
+    """
+    with open(caminho, 'rb') as f:
+        comprimido = f.read(2) == ASSINATURA_GZIP
+    arquivo = gzip.open(caminho, 'rt', encoding='utf-8') if comprimido else open(caminho, 'r', encoding='utf-8')
+    with arquivo:
+        try:
+            for linha in arquivo:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                if linha.startswith('['):
+                    arquivo.seek(0)
+                    yield from (Publicacao.from_dict(dados) for dados in json.load(arquivo))
+                    return
+                try:
+                    yield Publicacao.from_dict(json.loads(linha))
+                except (ValueError, TypeError):
+                    continue
+        except EOFError:
+            pass # gzip sem o final: arquivo de uma execução interrompida
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Os módulos do projeto são importados a partir de src/ (como em daily_run.py)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for caminho in (RAIZ, os.path.join(RAIZ, 'src')):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
@@ -0,0 +1,281 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api.api_client import JusAPIClient
+from api.circuit_breaker import CircuitBreaker
+from api.config import APIConfig
+from api.outbox import OutboxAPI
+from api.rate_limiter import TokenBucket
+from models.publicacao import Publicacao
+
+
+class EstadoServidor:
+    """Comportamento configurável da API falsa e o que ela recebeu."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.atraso = 0.0
+        self.ativos = 0
+        self.max_ativos = 0
+        self.chamadas = []          # (momento, endpoint, numero_processo)
+        self.falhas = {}            # numero_processo -> lista de status a devolver antes do 201
+        self.recusados = set()      # numero_processo -> 400
+        self.status_lote = 200
+        self.lotes = []
+        self.existentes = set()
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    def log_message(self, *_):
+        pass
+
+    @property
+    def estado(self) -> EstadoServidor:
+        return self.server.estado
+
+    def _responder(self, status, corpo, headers=None):
+        dados = json.dumps(corpo).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        self._responder(200, {"status": "ok"})
+
+    def do_POST(self):
+        corpo = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            corpo = gzip.decompress(corpo)
+        dados = json.loads(corpo)
+        with self.estado.lock:
+            self.estado.ativos += 1
+            self.estado.max_ativos = max(self.estado.max_ativos, self.estado.ativos)
+        try:
+            time.sleep(self.estado.atraso)
+            if self.path.endswith('/duplicados'):
+                self._registrar('duplicados', None)
+                existentes = [n for n in dados['numeros_processo'] if n in self.estado.existentes]
+                return self._responder(200, {"duplicados": existentes})
+            if self.path.endswith('/lote'):
+                return self._lote(dados['publicacoes'])
+            return self._publicacao(dados)
+        finally:
+            with self.estado.lock:
+                self.estado.ativos -= 1
+
+    def _registrar(self, endpoint, numero):
+        with self.estado.lock:
+            self.estado.chamadas.append((time.monotonic(), endpoint, numero))
+
+    def _publicacao(self, dados):
+        numero = dados.get('numero_processo')
+        self._registrar('publicacoes', numero)
+        with self.estado.lock:
+            pendentes = self.estado.falhas.get(numero)
+            status = pendentes.pop(0) if pendentes else None
+        if status == 429:
+            return self._responder(429, {"error": "calma"}, {"Retry-After": "0"})
+        if status:
+            return self._responder(status, {"error": "falha temporária"})
+        if numero in self.estado.recusados:
+            return self._responder(400, {"error": "inválida"})
+        self._responder(201, {"numero_processo": numero})
+
+    def _lote(self, itens):
+        self._registrar('lote', None)
+        if self.estado.status_lote != 200:
+            return self._responder(self.estado.status_lote, {"error": "lote indisponível"})
+        self.estado.lotes.append([item.get('numero_processo') for item in itens])
+        self._responder(200, {"resultados": [
+            {"error": "inválida"} if item.get('numero_processo') in self.estado.recusados
+            else {"numero_processo": item.get('numero_processo')}
+            for item in itens
+        ]})
+
+
+@pytest.fixture
+def servidor():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ManipuladorAPI)
+    httpd.estado = EstadoServidor()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def config_rapida(monkeypatch):
+    monkeypatch.setattr(APIConfig, 'BATCH_SIZE', 50)
+    monkeypatch.setattr(APIConfig, 'BATCH_DELAY', 0)
+    monkeypatch.setattr(APIConfig, 'MAX_RETRIES', 3)
+    monkeypatch.setattr(APIConfig, 'RETRY_DELAY', 0.01)
+    monkeypatch.setattr(APIConfig, 'RETRY_MAX_DELAY', 0.05)
+    monkeypatch.setattr(APIConfig, 'BULK_GZIP', True)
+
+
+def criar_cliente(servidor, tmp_path, lote=False, deduplicar=False, **kwargs) -> JusAPIClient:
+    kwargs.setdefault('rate_limiter', TokenBucket(0, 1))
+    kwargs.setdefault('outbox', OutboxAPI(str(tmp_path / 'outbox.db')))
+    cliente = JusAPIClient(base_url=f"http://127.0.0.1:{servidor.server_address[1]}", **kwargs)
+    cliente.usar_lote = lote
+    cliente.usar_deduplicacao = deduplicar
+    return cliente
+
+
+def publicacoes(quantidade: int):
+    return [Publicacao(numero_processo=f"0000{n:03d}-00.2024.8.26.0053", conteudo_completo=f"texto {n}")
+            for n in range(quantidade)]
+
+
+def test_resultados_por_item_na_ordem_de_entrada(servidor, tmp_path):
+    servidor.estado.atraso = 0.02
+    itens = publicacoes(12)
+    servidor.estado.recusados = {itens[4].numero_processo, itens[9].numero_processo}
+    cliente = criar_cliente(servidor, tmp_path, max_workers=4)
+
+    resultado = cliente.enviar_lote_publicacoes(itens)
+
+    assert [r["indice"] for r in resultado["resultados"]] == list(range(12))
+    assert [r["numero_processo"] for r in resultado["resultados"]] == [p.numero_processo for p in itens]
+    assert [r["sucesso"] for r in resultado["resultados"]] == [n not in (4, 9) for n in range(12)]
+    assert not resultado["resultados"][4]["retentavel"]
+    assert (resultado["sucessos"], resultado["erros"]) == (10, 2)
+
+
+def test_concorrencia_limitada_por_max_workers(servidor, tmp_path):
+    servidor.estado.atraso = 0.05
+    cliente = criar_cliente(servidor, tmp_path, max_workers=3)
+
+    resultado = cliente.enviar_lote_publicacoes(publicacoes(12))
+
+    assert resultado["sucessos"] == 12
+    assert 2 <= servidor.estado.max_ativos <= 3
+
+
+def test_token_bucket_controla_o_ritmo(servidor, tmp_path):
+    cliente = criar_cliente(servidor, tmp_path, max_workers=4, rate_limiter=TokenBucket(20, 2))
+
+    inicio = time.monotonic()
+    resultado = cliente.enviar_lote_publicacoes(publicacoes(8))
+    duracao = time.monotonic() - inicio
+
+    # Rajada de 2 e mais 6 requisições a 20/s: pelo menos 0,3s
+    assert resultado["sucessos"] == 8
+    assert duracao >= 0.25
+    momentos = sorted(momento for momento, _, _ in servidor.estado.chamadas)
+    assert momentos[-1] - momentos[2] >= 0.2
+
+
+def test_falha_temporaria_e_repetida(servidor, tmp_path):
+    item = publicacoes(1)[0]
+    servidor.estado.falhas = {item.numero_processo: [503, 429, 502]}
+    cliente = criar_cliente(servidor, tmp_path)
+
+    resultado = cliente.enviar_lote_publicacoes([item])
+
+    assert resultado["sucessos"] == 1
+    assert len(servidor.estado.chamadas) == 4
+    assert cliente.outbox.quantidade() == 0
+
+
+def test_tentativas_esgotadas_vao_para_a_outbox(servidor, tmp_path, monkeypatch):
+    monkeypatch.setattr(APIConfig, 'MAX_RETRIES', 1)
+    itens = publicacoes(2)
+    servidor.estado.falhas = {itens[1].numero_processo: [500] * 5}
+    cliente = criar_cliente(servidor, tmp_path, circuit_breaker=CircuitBreaker(limite_falhas=10))
+
+    resultado = cliente.enviar_lote_publicacoes(itens)
+
+    assert [r["sucesso"] for r in resultado["resultados"]] == [True, False]
+    assert resultado["resultados"][1]["retentavel"]
+    assert [p.numero_processo for p, _ in cliente.outbox.listar()] == [itens[1].numero_processo]
+
+    servidor.estado.falhas = {}
+    assert cliente.reenviar_pendentes()["sucessos"] == 1
+    assert cliente.outbox.quantidade() == 0
+
+
+def test_envio_em_lote_comprimido(servidor, tmp_path):
+    itens = publicacoes(5)
+    servidor.estado.recusados = {itens[2].numero_processo}
+    cliente = criar_cliente(servidor, tmp_path, lote=True)
+
+    resultado = cliente.enviar_lote_publicacoes(itens)
+
+    assert servidor.estado.lotes == [[p.numero_processo for p in itens]]
+    assert [r["sucesso"] for r in resultado["resultados"]] == [True, True, False, True, True]
+    assert all(endpoint == 'lote' for _, endpoint, _ in servidor.estado.chamadas)
+
+
+def test_lote_nao_suportado_cai_para_envio_individual(servidor, tmp_path):
+    servidor.estado.status_lote = 404
+    itens = publicacoes(6)
+    cliente = criar_cliente(servidor, tmp_path, lote=True)
+
+    resultado = cliente.enviar_lote_publicacoes(itens)
+
+    assert resultado["sucessos"] == 6
+    assert not cliente.usar_lote
+    endpoints = [endpoint for _, endpoint, _ in servidor.estado.chamadas]
+    assert endpoints.count('lote') == 1 and endpoints.count('publicacoes') == 6
+
+
+def test_processos_existentes_nao_sao_reenviados(servidor, tmp_path):
+    itens = publicacoes(4)
+    servidor.estado.existentes = {itens[0].numero_processo, itens[3].numero_processo}
+    cliente = criar_cliente(servidor, tmp_path, deduplicar=True)
+
+    resultado = cliente.enviar_lote_publicacoes(itens)
+
+    assert resultado["ja_existentes"] == 2 and resultado["sucessos"] == 2
+    enviados = {numero for _, endpoint, numero in servidor.estado.chamadas if endpoint == 'publicacoes'}
+    assert enviados == {itens[1].numero_processo, itens[2].numero_processo}
+
+
+def test_circuito_abre_apos_falhas_seguidas(servidor, tmp_path, monkeypatch):
+    monkeypatch.setattr(APIConfig, 'MAX_RETRIES', 0)
+    itens = publicacoes(6)
+    servidor.estado.falhas = {p.numero_processo: [500] for p in itens}
+    breaker = CircuitBreaker(limite_falhas=2, tempo_recuperacao=0.2)
+    cliente = criar_cliente(servidor, tmp_path, max_workers=1, circuit_breaker=breaker)
+
+    resultado = cliente.enviar_lote_publicacoes(itens)
+
+    assert len(servidor.estado.chamadas) == 2
+    assert breaker.estado == CircuitBreaker.ABERTO
+    assert all(not r["sucesso"] and r["retentavel"] for r in resultado["resultados"])
+    assert cliente.outbox.quantidade() == 6
+
+    # Passado o tempo de recuperação, uma chamada de teste bem-sucedida fecha o circuito
+    servidor.estado.falhas = {}
+    time.sleep(0.25)
+    assert cliente.reenviar_pendentes()["sucessos"] == 6
+    assert breaker.estado == CircuitBreaker.FECHADO
+
+
+def test_erro_de_requisicao_nao_prende_o_circuito_meio_aberto(servidor, tmp_path, monkeypatch):
+    monkeypatch.setattr(APIConfig, 'MAX_RETRIES', 0)
+    breaker = CircuitBreaker(limite_falhas=1, tempo_recuperacao=0.05)
+    cliente = criar_cliente(servidor, tmp_path, circuit_breaker=breaker)
+    breaker.registrar_falha()
+    time.sleep(0.06)
+
+    # URL inválida: erro do requests que não é de rede, na chamada de teste do meio-aberto
+    cliente.base_url = "http://[url-invalida"
+    assert "error" in cliente.enviar_publicacao(publicacoes(1)[0])
+    assert breaker.estado == CircuitBreaker.ABERTO
+
+    time.sleep(0.06)
+    cliente.base_url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    assert "error" not in cliente.enviar_publicacao(publicacoes(1)[0])
+    assert breaker.estado == CircuitBreaker.FECHADO
@@ -0,0 +1,104 @@
+import pytest
+
+from models.publicacao import Publicacao
+from scraper import backfill
+from scraper.backfill import LedgerJobs, executar_backfill, gerar_jobs
+
+
+def test_jobs_diarios_pulam_fins_de_semana():
+    # 01/03/2024 é uma sexta-feira
+    assert gerar_jobs("01/03/2024", "04/03/2024") == [("01/03/2024", "01/03/2024"), ("04/03/2024", "04/03/2024")]
+    assert len(gerar_jobs("01/03/2024", "04/03/2024", incluir_fins_de_semana=True)) == 4
+    assert gerar_jobs("02/03/2024", "03/03/2024") == []
+
+
+def test_jobs_semanais_vao_de_segunda_a_domingo_recortados_no_periodo():
+    assert gerar_jobs("01/03/2024", "20/03/2024", 'semana') == [
+        ("01/03/2024", "03/03/2024"),
+        ("04/03/2024", "10/03/2024"),
+        ("11/03/2024", "17/03/2024"),
+        ("18/03/2024", "20/03/2024"),
+    ]
+    # Período de um dia e período que começa num domingo
+    assert gerar_jobs("05/03/2024", "05/03/2024", 'semana') == [("05/03/2024", "05/03/2024")]
+    assert gerar_jobs("03/03/2024", "04/03/2024", 'semana') == [("03/03/2024", "03/03/2024"),
+                                                               ("04/03/2024", "04/03/2024")]
+
+
+def test_periodo_invalido():
+    with pytest.raises(ValueError):
+        gerar_jobs("05/03/2024", "04/03/2024")
+    with pytest.raises(ValueError):
+        gerar_jobs("04/03/2024", "05/03/2024", 'mes')
+
+
+class PoolFalso:
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+
+    def encerrar(self):
+        pass
+
+
+def scraper_falso(resultados, chamadas):
+    """DJEScraperDownload sem navegador: `resultados[data_inicio]` diz se a busca termina ou falha."""
+
+    class ScraperFalso:
+        def __init__(self, pasta_download, indice=None, pool=None, limite_espaco=None):
+            self.busca_concluida = False
+
+        def executar(self, data_busca, sessoes=None, ao_extrair=None, data_fim=None):
+            chamadas.append(data_busca)
+            resultado = resultados.get(data_busca, "concluido")
+            if resultado == "erro":
+                raise RuntimeError("navegador caiu")
+            self.busca_concluida = resultado == "concluido"
+            return [Publicacao(numero_processo=data_busca)]
+
+    return ScraperFalso
+
+
+def test_ledger_pula_jobs_concluidos_e_refaz_os_demais(tmp_path, monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(backfill, 'DriverPool', PoolFalso)
+    ledger = LedgerJobs(str(tmp_path / "jobs.db"))
+    jobs = gerar_jobs("04/03/2024", "06/03/2024")
+    pasta = str(tmp_path / "downloads")
+
+    monkeypatch.setattr(backfill, 'DJEScraperDownload',
+                        scraper_falso({"05/03/2024": "incompleto", "06/03/2024": "erro"}, chamadas))
+    totais = executar_backfill(jobs, pasta, ledger=ledger)
+
+    assert totais == {"jobs": 3, "pulados": 0, "concluidos": 1, "incompletos": 2}
+    assert ledger.estado("04/03/2024", "04/03/2024") == LedgerJobs.CONCLUIDO
+    assert ledger.estado("05/03/2024", "05/03/2024") == LedgerJobs.INCOMPLETO
+    assert ledger.estado("06/03/2024", "06/03/2024") == LedgerJobs.INCOMPLETO
+
+    # Segunda execução: só os jobs não concluídos rodam de novo
+    chamadas.clear()
+    monkeypatch.setattr(backfill, 'DJEScraperDownload', scraper_falso({}, chamadas))
+    totais = executar_backfill(jobs, pasta, ledger=ledger)
+
+    assert sorted(chamadas) == ["05/03/2024", "06/03/2024"]
+    assert totais == {"jobs": 3, "pulados": 1, "concluidos": 2, "incompletos": 0}
+    assert ledger.resumo() == {LedgerJobs.CONCLUIDO: 3}
+    ledger.fechar()
+
+
+def test_ledger_conta_tentativas_e_guarda_o_erro(tmp_path):
+    ledger = LedgerJobs(str(tmp_path / "jobs.db"))
+
+    ledger.iniciar("04/03/2024", "10/03/2024")
+    ledger.finalizar("04/03/2024", "10/03/2024", LedgerJobs.INCOMPLETO, erro="timeout")
+    assert not ledger.concluido("04/03/2024", "10/03/2024")
+    ledger.iniciar("04/03/2024", "10/03/2024")
+    ledger.finalizar("04/03/2024", "10/03/2024", LedgerJobs.CONCLUIDO, 7)
+
+    with ledger._lock:
+        tentativas, publicacoes, erro = ledger._conexao.execute(
+            "SELECT tentativas, publicacoes, erro FROM jobs"
+        ).fetchone()
+    assert (tentativas, publicacoes, erro) == (2, 7, None)
+    assert ledger.concluido("04/03/2024", "10/03/2024")
+    assert ledger.estado("11/03/2024", "17/03/2024") is None
+    ledger.fechar()
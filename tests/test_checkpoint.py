@@ -0,0 +1,112 @@
+import os
+
+from models.publicacao import Publicacao
+from scraper.checkpoint import CheckpointBusca
+from scraper.dje_scraper import DJEScraperDownload
+from scraper.link_resultado import LinkResultado
+from utils.config import Config
+
+
+def criar_pdf(caminho, conteudo):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'wb') as f:
+        f.write(conteudo)
+
+
+def test_checkpoint_recarregado_troca_o_arquivo_pelo_local_atual(tmp_path):
+    checkpoint = CheckpointBusca('01/02/2024', pasta=str(tmp_path))
+    checkpoint.registrar("http://dje/1", 0, [Publicacao(numero_processo="1", arquivo_cache="pagina.pdf")],
+                         {"pagina.pdf": "abc"})
+    checkpoint.registrar("http://dje/2", 1, [Publicacao(numero_processo="2", arquivo_cache="outra.pdf")])
+
+    recarregado = CheckpointBusca('01/02/2024', pasta=str(tmp_path))
+    locais = {"abc": "movido/pagina.pdf"}
+
+    assert [p.arquivo_cache for _, p in recarregado.publicacoes()] == ["pagina.pdf", "outra.pdf"]
+    assert [p.arquivo_cache for _, p in recarregado.publicacoes(locais.get)] == ["movido/pagina.pdf", "outra.pdf"]
+
+
+def test_pdf_de_sessao_paralela_e_encontrado_depois_de_incorporado(tmp_path):
+    pasta = str(tmp_path / "downloads")
+    principal = DJEScraperDownload(pasta)
+    sessao = DJEScraperDownload(os.path.join(pasta, "sessao_1"), indice=principal.indice)
+    # Um PDF diferente com o mesmo nome na pasta principal força a renomeação na incorporação
+    criar_pdf(os.path.join(pasta, "pagina.pdf"), b"%PDF-1.4 principal %%EOF")
+    criar_pdf(os.path.join(sessao.pasta_download, "pagina.pdf"), b"%PDF-1.4 sessao %%EOF")
+    principal.indice.registrar(os.path.join(sessao.pasta_download, "pagina.pdf"))
+
+    publicacao = Publicacao(numero_processo="1000000-00.2024.8.26.0053", arquivo_cache="pagina.pdf")
+    checkpoint = CheckpointBusca('01/02/2024', pasta=str(tmp_path / "checkpoints"))
+    checkpoint.registrar("http://dje/1", 0, [publicacao], sessao._hashes_pdfs([publicacao]))
+    principal._incorporar_downloads(sessao, [publicacao], 1)
+
+    # Nova execução (retomada): as publicações vêm do checkpoint gravado pela sessão
+    retomadas = CheckpointBusca('01/02/2024', pasta=str(tmp_path / "checkpoints")).publicacoes(principal._localizar_pdf)
+
+    arquivo = retomadas[0][1].arquivo_cache
+    assert arquivo == publicacao.arquivo_cache == "pagina_s1.pdf"
+    with open(os.path.join(pasta, arquivo), 'rb') as f:
+        assert f.read() == b"%PDF-1.4 sessao %%EOF"
+
+
+def scraper_falso(pasta, urls, processados, falhar=()):
+    """Scraper sem navegador: a lista de resultados tem uma página com os links de `urls`."""
+    scraper = DJEScraperDownload(pasta)
+    links = [LinkResultado(indice=n, pagina_resultado=1, posicao=n, url=url) for n, url in enumerate(urls)]
+
+    def processar_link(link):
+        processados.append(link.url)
+        if link.url in falhar:
+            return None
+        return [Publicacao(numero_processo=link.url)]
+
+    scraper._iniciar_sessao = lambda data_busca, data_fim=None: None
+    scraper._encerrar_sessao = lambda: None
+    scraper._limpar_janelas_extras = lambda: None
+    scraper._paginas_resultado = lambda: iter([(1, links)])
+    scraper._processar_link = processar_link
+    return scraper
+
+
+def test_retomada_reconhece_os_links_pela_url_e_nao_pela_posicao(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CHECKPOINTS_DIR', str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(Config, 'EXTRACTION_PAUSE', 0)
+    processados = []
+    primeira = scraper_falso(str(tmp_path / "downloads"), ["http://dje/a", "http://dje/b"], processados,
+                             falhar={"http://dje/b"})
+    primeira.executar('01/02/2024', sessoes=1)
+    assert not primeira.busca_concluida
+
+    # Um novo item no topo da lista desloca as posições dos links já vistos
+    processados.clear()
+    segunda = scraper_falso(str(tmp_path / "downloads"), ["http://dje/novo", "http://dje/a", "http://dje/b"],
+                            processados)
+    publicacoes = segunda.executar('01/02/2024', sessoes=1)
+
+    assert processados == ["http://dje/novo", "http://dje/b"]
+    assert sorted(p.numero_processo for p in publicacoes) == ["http://dje/a", "http://dje/b", "http://dje/novo"]
+
+
+def test_checkpoint_e_apagado_quando_a_busca_termina(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CHECKPOINTS_DIR', str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(Config, 'EXTRACTION_PAUSE', 0)
+    processados = []
+    scraper = scraper_falso(str(tmp_path / "downloads"), ["http://dje/a", "http://dje/b"], processados)
+
+    scraper.executar('01/02/2024', sessoes=1)
+
+    assert scraper.busca_concluida
+    assert not os.path.exists(CheckpointBusca('01/02/2024').caminho)
+    # Uma nova execução para a mesma data consulta todos os links de novo
+    processados.clear()
+    scraper.executar('01/02/2024', sessoes=1)
+    assert processados == ["http://dje/a", "http://dje/b"]
+
+
+def test_link_sem_url_e_identificado_pela_linha_do_resultado():
+    dados = [{"posicao": n, "href": "#", "onclick": None, "texto": " Visualizar ",
+              "linha": f"Caderno {n}\n  Visualizar"} for n in range(2)]
+    links = [LinkResultado.from_dados(item, "http://dje/", n, 1) for n, item in enumerate(dados)]
+
+    assert [link.url for link in links] == [None, None]
+    assert [link.chave for link in links] == ["Caderno 0 Visualizar", "Caderno 1 Visualizar"]
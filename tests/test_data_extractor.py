@@ -0,0 +1,66 @@
+from extraction.data_extractor import DataExtractor
+
+CABECALHO = (
+    "Publicação Oficial do Tribunal de Justiça do Estado de São Paulo\n"
+    "Disponibilização: quarta-feira, 14 de fevereiro de 2024\n"
+    "Diário da Justiça Eletrônico - Caderno Judicial - 1ª Instância - Capital\n"
+)
+
+
+def publicacao(numero, advogado="Maria da Silva Souza"):
+    return (
+        f"Processo {numero} - Cumprimento de Sentença contra a Fazenda Pública - "
+        "Auxílio-Acidente - José Pereira dos Santos - Vistos. Expeça-se RPV contra o INSS: "
+        "R$ 1.234,56 - principal bruto/líquido; R$ 100,00 - juros moratórios. "
+        f"ADV: {advogado} (OAB 123456/SP)\n"
+    )
+
+
+PUBLICACOES = [publicacao("1000001-11.2024.8.26.0053"), publicacao("1000002-22.2024.8.26.0053"),
+               publicacao("1000003-33.2024.8.26.0053")]
+
+
+def test_varias_publicacoes_na_mesma_pagina():
+    extrator = DataExtractor()
+
+    dados = list(extrator.extrair_publicacoes(CABECALHO + "".join(PUBLICACOES)))
+
+    assert [d['processo'] for d in dados] == ["1000001-11.2024.8.26.0053", "1000002-22.2024.8.26.0053",
+                                             "1000003-33.2024.8.26.0053"]
+    assert all(d['data'] == "14 de fevereiro de 2024" for d in dados)
+    assert [d['conteudo'] for d in dados] == PUBLICACOES
+    assert dados[0]['valores']['principal'] == 1234.56
+
+
+def test_cabecalho_antes_do_primeiro_processo_e_descartado():
+    segmentos = list(DataExtractor().segmentar_publicacoes(CABECALHO + "".join(PUBLICACOES)))
+
+    assert segmentos == PUBLICACOES
+
+
+def test_abertura_cortada_entre_paginas():
+    texto = CABECALHO + "".join(PUBLICACOES)
+    # Corta no meio do número do segundo processo
+    corte = texto.index("1000002-22") + 4
+    paginas = [texto[:corte], texto[corte:]]
+
+    assert list(DataExtractor().segmentar_publicacoes(paginas)) == PUBLICACOES
+
+
+def test_paginas_pequenas_geram_os_mesmos_segmentos_que_o_texto_inteiro():
+    extrator = DataExtractor()
+    texto = CABECALHO + "".join(PUBLICACOES * 3)
+    for tamanho in (7, 31, 64, 250):
+        paginas = [texto[i:i + tamanho] for i in range(0, len(texto), tamanho)]
+
+        assert list(extrator.segmentar_publicacoes(paginas)) == list(extrator.segmentar_publicacoes(texto))
+
+
+def test_texto_sem_abertura_de_processo_vira_um_segmento():
+    texto = CABECALHO + "Edital de intimação sem número de processo no início da linha.\n"
+    paginas = [CABECALHO, "Edital de intimação sem número de processo no início da linha.\n"]
+    extrator = DataExtractor()
+
+    assert list(extrator.segmentar_publicacoes(texto)) == [texto]
+    assert list(extrator.segmentar_publicacoes(paginas)) == [texto]
+    assert list(extrator.extrair_publicacoes(texto)) == []
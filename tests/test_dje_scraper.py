@@ -0,0 +1,44 @@
+import logging
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from scraper import dje_scraper
+from scraper.dje_scraper import DJEScraperDownload
+
+
+def pool_que_falha(erro):
+    class PoolQuebrado:
+        def __init__(self, max_workers):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            return False
+
+        def map(self, *_, **__):
+            raise erro
+
+    return PoolQuebrado
+
+
+def test_pool_quebrado_cai_para_extracao_sequencial_com_aviso(tmp_path, monkeypatch, caplog):
+    scraper = DJEScraperDownload(str(tmp_path))
+    monkeypatch.setattr(dje_scraper, 'ProcessPoolExecutor', pool_que_falha(BrokenProcessPool("worker morreu")))
+    monkeypatch.setattr(dje_scraper, '_extrair_dados_pdf', lambda caminho: (b'', [{'arquivo': caminho}]))
+
+    with caplog.at_level(logging.WARNING, logger='dje_scraper.dje_scraper'):
+        resultados = scraper._extrair_pdfs(["a.pdf", "b.pdf"], workers=2)
+
+    assert resultados == [(b'', [{'arquivo': "a.pdf"}]), (b'', [{'arquivo': "b.pdf"}])]
+    assert "em sequência" in caplog.text
+
+
+def test_erro_inesperado_no_pool_nao_e_engolido(tmp_path, monkeypatch):
+    scraper = DJEScraperDownload(str(tmp_path))
+    monkeypatch.setattr(dje_scraper, 'ProcessPoolExecutor', pool_que_falha(ValueError("bug na extração")))
+
+    with pytest.raises(ValueError):
+        scraper._extrair_pdfs(["a.pdf", "b.pdf"], workers=2)
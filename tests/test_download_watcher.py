@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from scraper.download_watcher import IN_Q_OVERFLOW, _EVENTO_INOTIFY, DownloadWatcher
+
+
+def criar_arquivo(pasta, nome, tamanho=2000):
+    with open(os.path.join(pasta, nome), 'wb') as f:
+        f.write(b"x" * tamanho)
+
+
+def test_estouro_da_fila_so_reporta_arquivos_novos(tmp_path, monkeypatch):
+    pasta = str(tmp_path)
+    criar_arquivo(pasta, "antigo.pdf")
+    watcher = DownloadWatcher(pasta, intervalo_estabilidade=0)
+    watcher.iniciar()
+    if watcher._fd is None:
+        pytest.skip("inotify indisponível")
+
+    criar_arquivo(pasta, "novo.pdf")
+    # A fila do inotify estourou: o kernel descarta os eventos e envia apenas IN_Q_OVERFLOW
+    os.read(watcher._fd, 64 * 1024)
+    evento = _EVENTO_INOTIFY.pack(-1, IN_Q_OVERFLOW, 0, 0)
+    leitura_original = os.read
+    monkeypatch.setattr(os, 'read', lambda fd, n: evento if fd == watcher._fd else leitura_original(fd, n))
+    monkeypatch.setattr('select.select', lambda r, w, x, t: (r, [], []))
+
+    assert watcher.aguardar(timeout=1) == "novo.pdf"
+    assert watcher.aguardar(timeout=0.2) is None
+    watcher.parar()
+
+
+def test_modo_varredura_ignora_arquivos_existentes(tmp_path, monkeypatch):
+    pasta = str(tmp_path)
+    criar_arquivo(pasta, "antigo.pdf")
+    watcher = DownloadWatcher(pasta, intervalo_estabilidade=0, intervalo_varredura=0.05)
+    monkeypatch.setattr(watcher, 'usa_inotify', False)
+    watcher.iniciar()
+
+    criar_arquivo(pasta, "novo.pdf")
+    criar_arquivo(pasta, "parcial.pdf.crdownload")
+
+    assert watcher.aguardar(timeout=1) == "novo.pdf"
+    assert watcher.aguardar(timeout=0.2) is None
+    watcher.parar()
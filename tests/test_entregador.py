@@ -0,0 +1,101 @@
+import json
+
+from api.entregador import EntregadorAPI
+from api.fila_envio import FilaEnvio
+from models.publicacao import Publicacao
+
+
+class ClienteFalso:
+    """Cliente da API que responde a cada processo conforme `respostas` (padrão: sucesso)."""
+
+    def __init__(self, respostas=None, outbox=None):
+        self.respostas = respostas or {}
+        self.outbox = outbox
+        self.lotes = []
+
+    def enviar_lote_publicacoes(self, publicacoes):
+        self.lotes.append([p.numero_processo for p in publicacoes])
+        resultados = []
+        for indice, publicacao in enumerate(publicacoes):
+            resposta = self.respostas.get(publicacao.numero_processo, "sucesso")
+            resultados.append({"indice": indice, "sucesso": resposta == "sucesso",
+                               "retentavel": resposta == "temporaria"})
+        sucessos = sum(1 for item in resultados if item["sucesso"])
+        return {"total": len(publicacoes), "sucessos": sucessos, "erros": len(publicacoes) - sucessos,
+                "ja_existentes": 0, "resultados": resultados}
+
+
+def criar_entregador(tmp_path, cliente):
+    fila = FilaEnvio(str(tmp_path / "fila.db"))
+    entregador = EntregadorAPI(cliente, fila, tamanho_lote=2,
+                               caminho_rejeitadas=str(tmp_path / EntregadorAPI.NOME_REJEITADAS))
+    return entregador, fila
+
+
+def test_enviados_com_sucesso_saem_da_fila_em_lotes(tmp_path):
+    cliente = ClienteFalso()
+    entregador, fila = criar_entregador(tmp_path, cliente)
+    fila.enfileirar([Publicacao(numero_processo=str(n)) for n in range(5)])
+
+    assert entregador.entregar_disponiveis() == 5
+
+    assert cliente.lotes == [["0", "1"], ["2", "3"], ["4"]]
+    assert fila.quantidade() == 0
+    assert entregador.totais["sucessos"] == 5
+    fila.fechar()
+
+
+def test_recusadas_vao_para_o_arquivo_de_rejeitadas(tmp_path):
+    entregador, fila = criar_entregador(tmp_path, ClienteFalso({"2": "recusada"}))
+    fila.enfileirar([Publicacao(numero_processo=str(n)) for n in range(3)])
+
+    entregador.entregar_disponiveis()
+
+    assert fila.quantidade() == 0
+    with open(entregador.caminho_rejeitadas, encoding='utf-8') as f:
+        rejeitadas = [json.loads(linha) for linha in f]
+    assert [item["numero_processo"] for item in rejeitadas] == ["2"]
+    assert entregador.totais["erros"] == 1
+    fila.fechar()
+
+
+def test_falha_temporaria_sem_outbox_volta_para_a_fila(tmp_path):
+    cliente = ClienteFalso({"1": "temporaria"})
+    entregador, fila = criar_entregador(tmp_path, cliente)
+    fila.enfileirar([Publicacao(numero_processo=str(n)) for n in range(2)])
+
+    assert entregador.entregar_disponiveis() == 2
+
+    # Devolvida com atraso: fica na fila, mas não é reservada de novo agora
+    assert fila.quantidade() == 1
+    assert fila.reservar(10) == []
+    fila.recuperar_reservas()
+    cliente.respostas = {}
+    assert entregador.entregar_disponiveis() == 1
+    assert fila.quantidade() == 0
+    fila.fechar()
+
+
+def test_falha_temporaria_com_outbox_sai_da_fila(tmp_path):
+    entregador, fila = criar_entregador(tmp_path, ClienteFalso({"1": "temporaria"}, outbox=object()))
+    fila.enfileirar([Publicacao(numero_processo=str(n)) for n in range(2)])
+
+    entregador.entregar_disponiveis()
+
+    # A outbox do cliente já guarda a publicação para o reenvio
+    assert fila.quantidade() == 0
+    fila.fechar()
+
+
+def test_erro_inesperado_do_cliente_devolve_o_lote(tmp_path):
+    class ClienteQuebrado(ClienteFalso):
+        def enviar_lote_publicacoes(self, publicacoes):
+            raise RuntimeError("falha inesperada")
+
+    entregador, fila = criar_entregador(tmp_path, ClienteQuebrado())
+    fila.enfileirar([Publicacao(numero_processo="1")])
+
+    entregador.entregar_disponiveis()
+
+    assert fila.quantidade() == 1
+    fila.fechar()
@@ -0,0 +1,59 @@
+import time
+
+from api.fila_envio import FilaEnvio
+from models.publicacao import Publicacao
+
+
+def publicacoes(*numeros):
+    return [Publicacao(numero_processo=numero) for numero in numeros]
+
+
+def test_enfileirar_ignora_processo_ja_na_fila(tmp_path):
+    fila = FilaEnvio(str(tmp_path / "fila.db"))
+
+    assert fila.enfileirar(publicacoes("1", "2")) == 2
+    assert fila.enfileirar(publicacoes("2", "3")) == 1
+    assert fila.quantidade() == 3
+    fila.fechar()
+
+
+def test_reserva_vencida_volta_para_a_fila(tmp_path):
+    fila = FilaEnvio(str(tmp_path / "fila.db"))
+    fila.enfileirar(publicacoes("1", "2", "3"))
+
+    reservados = fila.reservar(2, prazo=0.05)
+    assert [p.numero_processo for _, p in reservados] == ["1", "2"]
+    assert [p.numero_processo for _, p in fila.reservar(10)] == ["3"]
+    assert fila.reservar(10) == []
+
+    time.sleep(0.1)
+    assert [id_item for id_item, _ in fila.reservar(10)] == [id_item for id_item, _ in reservados]
+    fila.fechar()
+
+
+def test_reservas_de_execucao_interrompida_sao_recuperadas(tmp_path):
+    caminho = str(tmp_path / "fila.db")
+    fila = FilaEnvio(caminho)
+    fila.enfileirar(publicacoes("1", "2"))
+    fila.reservar(10)
+    fila.fechar()
+
+    reaberta = FilaEnvio(caminho)
+    assert reaberta.reservar(10) == []
+    assert reaberta.recuperar_reservas() == 2
+    assert len(reaberta.reservar(10)) == 2
+    reaberta.fechar()
+
+
+def test_confirmar_retira_e_devolver_libera(tmp_path):
+    fila = FilaEnvio(str(tmp_path / "fila.db"))
+    fila.enfileirar(publicacoes("1", "2", "3"))
+    (id_1, _), (id_2, _), (id_3, _) = fila.reservar(10)
+
+    fila.confirmar([id_1])
+    fila.devolver([id_2])
+    fila.devolver([id_3], atraso=60)
+
+    assert fila.quantidade() == 2
+    assert [id_item for id_item, _ in fila.reservar(10)] == [id_2]
+    fila.fechar()
@@ -0,0 +1,79 @@
+import gzip
+import json
+
+from api.outbox import chave_publicacao
+from models.publicacao import Publicacao
+from utils import jsonl
+from utils.jsonl import GravadorJSONL, ler_publicacoes_jsonl
+
+
+def publicacoes(*numeros):
+    return [Publicacao(numero_processo=numero, valor_principal=10.5, conteudo_completo=f"Processo {numero}")
+            for numero in numeros]
+
+
+def test_gzip_ida_e_volta(tmp_path):
+    originais = publicacoes("1", "2", "3")
+    with GravadorJSONL(str(tmp_path / "resultados.jsonl"), comprimir=True) as gravador:
+        gravador.adicionar(originais[:2])
+        gravador.escrever(originais[2])
+
+    assert gravador.caminho.endswith(".jsonl.gz")
+    with gzip.open(gravador.caminho, 'rt', encoding='utf-8') as f:
+        assert len(f.readlines()) == 3
+    lidas = list(ler_publicacoes_jsonl(gravador.caminho))
+    assert [p.to_dict() for p in lidas] == [p.to_dict() for p in originais]
+
+
+def test_deduplicacao_por_chave(tmp_path):
+    caminho = str(tmp_path / "resultados.jsonl")
+    with GravadorJSONL(caminho, comprimir=False, deduplicar_por=chave_publicacao) as gravador:
+        gravador.adicionar(publicacoes("1", "2"))
+        gravador.adicionar(publicacoes("2", "3", "1"))
+
+    assert gravador.quantidade == 3
+    assert [p.numero_processo for p in ler_publicacoes_jsonl(caminho)] == ["1", "2", "3"]
+
+
+def test_sincroniza_no_disco_a_cada_lote_de_linhas(tmp_path, monkeypatch):
+    sincronizacoes = []
+    monkeypatch.setattr(jsonl.os, 'fsync', sincronizacoes.append)
+    gravador = GravadorJSONL(str(tmp_path / "resultados.jsonl"), comprimir=False, fsync_a_cada=3)
+
+    gravador.adicionar(publicacoes("1", "2"))
+    assert sincronizacoes == []
+    gravador.adicionar(publicacoes("3", "4", "5", "6", "7"))
+    assert len(sincronizacoes) == 2
+    gravador.fechar()
+    assert len(sincronizacoes) == 3
+    gravador.fechar() # Fechar de novo não faz nada
+    assert len(sincronizacoes) == 3
+
+
+def test_le_lista_json_antiga(tmp_path):
+    caminho = tmp_path / "publicacoes_antigas.json"
+    caminho.write_text(json.dumps([p.to_dict() for p in publicacoes("1", "2")], indent=2), encoding='utf-8')
+
+    assert [p.numero_processo for p in ler_publicacoes_jsonl(str(caminho))] == ["1", "2"]
+
+
+def test_linhas_incompletas_sao_ignoradas(tmp_path):
+    caminho = tmp_path / "resultados.jsonl"
+    linhas = [json.dumps(p.to_dict()) for p in publicacoes("1", "2")]
+    caminho.write_text(linhas[0] + "\n\n" + linhas[1][:20], encoding='utf-8')
+
+    assert [p.numero_processo for p in ler_publicacoes_jsonl(str(caminho))] == ["1"]
+
+
+def test_gzip_truncado_devolve_o_que_foi_gravado(tmp_path):
+    caminho = str(tmp_path / "resultados.jsonl")
+    gravador = GravadorJSONL(caminho, comprimir=True, fsync_a_cada=1)
+    gravador.adicionar(publicacoes("1", "2"))
+    # Execução interrompida: o gzip fica sem o bloco final
+    with open(gravador.caminho, 'rb') as f:
+        dados = f.read()
+
+    truncado = tmp_path / "truncado.jsonl.gz"
+    truncado.write_bytes(dados)
+    assert [p.numero_processo for p in ler_publicacoes_jsonl(str(truncado))] == ["1", "2"]
+    gravador.fechar()
@@ -0,0 +1,98 @@
+import os
+import time
+
+from scraper import limite_espaco as modulo
+from scraper.limite_espaco import LimiteEspaco
+from scraper.pdf_index import PDFIndex
+
+TAMANHO = 4000
+ORCAMENTO_MB = 10_000 / (1024 * 1024) # Cabem dois arquivos
+
+
+def criar_arquivo(pasta, nome, idade, conteudo=None):
+    """Cria um arquivo de TAMANHO bytes modificado há `idade` segundos."""
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, 'wb') as f:
+        f.write(conteudo or os.urandom(TAMANHO))
+    momento = time.time() - idade
+    os.utime(caminho, (momento, momento))
+    return caminho
+
+
+def criar_limite(tmp_path, ao_remover=None):
+    pasta = tmp_path / "downloads"
+    pasta.mkdir(exist_ok=True)
+    limite = LimiteEspaco(str(tmp_path / "limite.db"))
+    limite.adicionar_area('downloads', str(pasta), ORCAMENTO_MB, ('.pdf',), ao_remover=ao_remover)
+    return limite, str(pasta)
+
+
+def test_descarta_os_mais_antigos_ate_caber_no_orcamento(tmp_path):
+    limite, pasta = criar_limite(tmp_path)
+    for n in range(5):
+        criar_arquivo(pasta, f"{n}.pdf", idade=3600 * (5 - n)) # 0.pdf é o mais antigo
+
+    assert limite.passo() == 3
+
+    assert sorted(os.listdir(pasta)) == ["3.pdf", "4.pdf"]
+    assert limite.tamanho_area('downloads') == 2 * TAMANHO
+    assert limite.estatisticas()["removidos"] == 3
+    limite.fechar()
+
+
+def test_arquivos_usados_recentemente_nao_sao_descartados(tmp_path):
+    limite, pasta = criar_limite(tmp_path)
+    criar_arquivo(pasta, "antigo.pdf", idade=3600)
+    limite.passo()
+    for n in range(4):
+        limite.registrar(criar_arquivo(pasta, f"novo_{n}.pdf", idade=0))
+    # O antigo acabou de ser lido: também fica protegido por IDADE_MINIMA
+    limite.tocar(os.path.join(pasta, "antigo.pdf"))
+
+    assert limite.aplicar_limites() == 0
+
+    assert len(os.listdir(pasta)) == 5
+    assert limite.tamanho_area('downloads') > ORCAMENTO_MB * 1024 * 1024
+    limite.fechar()
+
+
+def test_arquivo_que_nao_pode_ser_apagado_volta_para_o_fim_da_fila(tmp_path, monkeypatch):
+    limite, pasta = criar_limite(tmp_path)
+    for n in range(4):
+        criar_arquivo(pasta, f"{n}.pdf", idade=3600 * (4 - n))
+    bloqueado = os.path.join(pasta, "0.pdf")
+    remover_original = os.remove
+
+    def remover(caminho):
+        if caminho == bloqueado:
+            raise PermissionError(13, "Permission denied", caminho)
+        remover_original(caminho)
+
+    monkeypatch.setattr(modulo.os, 'remove', remover)
+
+    assert limite.passo() == 2
+
+    assert sorted(os.listdir(pasta)) == ["0.pdf", "3.pdf"]
+    with limite._lock:
+        ultimo_acesso, = limite._conexao.execute(
+            "SELECT ultimo_acesso FROM arquivos WHERE caminho = ?", (bloqueado,)
+        ).fetchone()
+    assert ultimo_acesso > time.time() - 60
+    # Na próxima passada o arquivo bloqueado está protegido e não trava o laço
+    assert limite.aplicar_limites() == 0
+    limite.fechar()
+
+
+def test_pdfs_descartados_saem_do_indice(tmp_path):
+    indice = PDFIndex(str(tmp_path / "downloads"))
+    limite, pasta = criar_limite(tmp_path, ao_remover=indice.remover)
+    caminhos = [criar_arquivo(pasta, f"{n}.pdf", idade=3600 * (3 - n)) for n in range(3)]
+    hashes = [indice.registrar(caminho)[0] for caminho in caminhos]
+
+    assert limite.passo() == 1
+
+    assert indice.caminho_do_hash(hashes[0]) is None
+    assert indice.buscar_por_arquivo(caminhos[0]) is None
+    assert indice.caminho_do_hash(hashes[1]) == caminhos[1]
+    limite.fechar()
+    indice.fechar()
@@ -0,0 +1,157 @@
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin, urlparse
+
+import pytest
+import requests
+from selenium.common.exceptions import NoSuchElementException
+
+from scraper.pdf_downloader import PDFDownloader
+
+PDF = b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n"
+
+PAGINAS = {
+    # Consulta do DJE: frameset com o PDF da página no 'bottomFrame'
+    '/cdje/consultaSimples.do': (
+        'text/html',
+        b'<html><frameset rows="80,*">'
+        b'<frame name="topFrame" src="cabecalho.do">'
+        b'<frame name="bottomFrame" src="getPaginaDoDiario.do?cdVolume=1&nuDiario=2&cdCaderno=12&nuSeqpagina=3">'
+        b'</frameset></html>'
+    ),
+    '/cdje/cabecalho.do': ('text/html', b'<html><body>DJE</body></html>'),
+    '/cdje/getPaginaDoDiario.do': ('application/pdf', PDF),
+    # Visualizador com o PDF embutido em vez do arquivo
+    '/cdje/visualizador.do': (
+        'text/html',
+        b'<html><body><iframe src="/cdje/banner.html"></iframe>'
+        b'<embed type="application/pdf" src="arquivos/pagina_3.pdf"></body></html>'
+    ),
+    '/cdje/arquivos/pagina_3.pdf': ('application/pdf', PDF),
+    # Página de aviso (ex.: sessão expirada): HTML sem nenhum PDF
+    '/cdje/aviso.do': ('text/html', b'<html><body><iframe src="banner.html"></iframe>Sessao expirada</body></html>'),
+    '/cdje/banner.html': ('text/html', b'<html><body>banner</body></html>'),
+    '/cdje/truncado.pdf': ('application/pdf', PDF[:40]),
+}
+
+
+class ManipuladorDJE(BaseHTTPRequestHandler):
+    def do_GET(self):
+        pagina = PAGINAS.get(urlparse(self.path).path)
+        if pagina is None:
+            self.send_error(404)
+            return
+        tipo, corpo = pagina
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *_):
+        pass
+
+
+class ElementoFalso:
+    def __init__(self, atributos):
+        self.atributos = atributos
+
+    def get_attribute(self, nome):
+        return self.atributos.get(nome)
+
+
+class DriverFalso:
+    """O mínimo de um WebDriver que o PDFDownloader usa: URL atual, busca de frames por nome e cookies."""
+
+    def __init__(self):
+        self.current_url = 'about:blank'
+        self.html = ''
+
+    def get(self, url):
+        resposta = requests.get(url, timeout=5)
+        self.current_url = resposta.url
+        self.html = resposta.text if 'html' in resposta.headers.get('Content-Type', '') else ''
+
+    def find_element(self, by, valor):
+        for tag in re.findall(r'<(?:frame|iframe)\b[^>]*>', self.html, re.IGNORECASE):
+            atributos = dict(re.findall(r'(\w+)="([^"]*)"', tag))
+            if atributos.get('name') == valor:
+                return ElementoFalso(atributos)
+        raise NoSuchElementException(valor)
+
+    def get_cookies(self):
+        return [{'name': 'JSESSIONID', 'value': 'abc', 'path': '/'}]
+
+    def execute_script(self, script, *args):
+        return 'DriverFalso/1.0'
+
+
+@pytest.fixture(scope='module')
+def servidor():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ManipuladorDJE)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/cdje/"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    downloader = PDFDownloader(str(tmp_path), timeout=5)
+    yield downloader
+    downloader.fechar()
+
+
+def test_resolver_url_pdf_usa_o_bottom_frame(servidor, downloader):
+    driver = DriverFalso()
+    driver.get(urljoin(servidor, 'consultaSimples.do'))
+
+    url = downloader.resolver_url_pdf(driver, timeout=1)
+
+    assert url == urljoin(servidor, 'getPaginaDoDiario.do?cdVolume=1&nuDiario=2&cdCaderno=12&nuSeqpagina=3')
+
+
+def test_resolver_url_pdf_sem_frame_usa_a_url_da_janela(servidor, downloader):
+    driver = DriverFalso()
+    driver.get(urljoin(servidor, 'getPaginaDoDiario.do?nuSeqpagina=3'))
+
+    assert downloader.resolver_url_pdf(driver, timeout=1) == driver.current_url
+
+
+def test_resolver_url_pdf_sem_pdf(servidor, downloader):
+    driver = DriverFalso()
+    driver.get(urljoin(servidor, 'cabecalho.do'))
+
+    assert downloader.resolver_url_pdf(driver, timeout=1) is None
+
+
+def test_baixar_pdf_resolvido_do_frameset(servidor, downloader, tmp_path):
+    driver = DriverFalso()
+    driver.get(urljoin(servidor, 'consultaSimples.do'))
+    downloader.sincronizar_sessao(driver)
+
+    nome = downloader.baixar(downloader.resolver_url_pdf(driver, timeout=1), referer=driver.current_url)
+
+    assert nome and nome.endswith('.pdf')
+    assert (tmp_path / nome).read_bytes() == PDF
+    assert os.listdir(tmp_path) == [nome]
+
+
+def test_baixar_segue_o_pdf_embutido_no_html(servidor, downloader, tmp_path):
+    nome = downloader.baixar(urljoin(servidor, 'visualizador.do'))
+
+    assert nome
+    assert (tmp_path / nome).read_bytes() == PDF
+
+
+def test_baixar_html_sem_pdf_nao_grava_nada(servidor, downloader, tmp_path):
+    assert downloader.baixar(urljoin(servidor, 'aviso.do')) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_baixar_pdf_incompleto_descarta_o_parcial(servidor, downloader, tmp_path):
+    assert downloader.baixar(urljoin(servidor, 'truncado.pdf')) is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,66 @@
+import os
+import threading
+
+from scraper.pdf_index import PDFIndex
+
+
+def criar_pdf(pasta, nome, conteudo=b"%PDF-1.4 mesmo conteudo %%EOF"):
+    caminho = os.path.join(pasta, nome)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'wb') as f:
+        f.write(conteudo)
+    return caminho
+
+
+def test_registros_simultaneos_elegem_um_unico_canonico(tmp_path):
+    indice = PDFIndex(str(tmp_path))
+    caminhos = [criar_pdf(str(tmp_path), f"sessao_{n}/pagina.pdf") for n in range(8)]
+    resultados = [None] * len(caminhos)
+    largada = threading.Barrier(len(caminhos))
+
+    def registrar(n):
+        largada.wait()
+        resultados[n] = indice.registrar(caminhos[n])
+
+    threads = [threading.Thread(target=registrar, args=(n,)) for n in range(len(caminhos))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    canonicos = [caminhos[n] for n, (_, existente) in enumerate(resultados) if existente is None]
+    assert len(canonicos) == 1
+    assert all(existente == canonicos[0] for _, existente in resultados if existente is not None)
+    assert len({sha256 for sha256, _ in resultados}) == 1
+    assert indice.buscar_por_arquivo(canonicos[0])['sha256'] == resultados[0][0]
+    indice.fechar()
+
+
+def test_registrar_substitui_canonico_que_sumiu_e_preserva_o_processo(tmp_path):
+    indice = PDFIndex(str(tmp_path))
+    original = criar_pdf(str(tmp_path), "a.pdf")
+    copia = criar_pdf(str(tmp_path), "b.pdf")
+    sha256, _ = indice.registrar(original)
+    indice.atualizar_processo(original, "1000000-00.2024.8.26.0053")
+
+    assert indice.registrar(copia) == (sha256, os.path.abspath(original))
+
+    os.remove(original)
+    assert indice.registrar(copia) == (sha256, None)
+    entrada = indice.buscar(sha256)
+    assert entrada['arquivo'] == "b.pdf"
+    assert entrada['numero_processo'] == "1000000-00.2024.8.26.0053"
+    indice.fechar()
+
+
+def test_arquivo_alterado_troca_de_hash(tmp_path):
+    indice = PDFIndex(str(tmp_path))
+    caminho = criar_pdf(str(tmp_path), "a.pdf")
+    antigo, _ = indice.registrar(caminho)
+    criar_pdf(str(tmp_path), "a.pdf", b"%PDF-1.4 outro conteudo maior %%EOF")
+
+    novo, existente = indice.registrar(caminho)
+
+    assert existente is None and novo != antigo
+    assert indice.buscar(antigo) is None
+    indice.fechar()
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from models.publicacao import Publicacao
+from models.publicacao_batch import PublicacaoBatch, PublicacaoView
+
+
+def publicacao(numero, **campos):
+    dados = dict(numero_processo=numero, data_disponibilizacao="14 de fevereiro de 2024",
+                 autores="José Pereira dos Santos", advogados="Maria da Silva Souza",
+                 valor_principal=1234.56, valor_juros=100.0, honorarios=None,
+                 conteudo_completo=f"Processo {numero} - RPV INSS", url_publicacao="http://dje/1",
+                 arquivo_cache="pagina.pdf", created_at=datetime(2024, 2, 14, 10, 30, 15, 123456))
+    dados.update(campos)
+    return Publicacao(**dados)
+
+
+def test_linhas_leem_os_campos_das_colunas(tmp_path):
+    lote = PublicacaoBatch([publicacao("1"), publicacao("2", valor_principal=None)], pasta_conteudo=str(tmp_path))
+
+    assert len(lote) == 2
+    linha = lote[-1]
+    assert isinstance(linha, PublicacaoView)
+    assert linha.numero_processo == "2"
+    assert linha.valor_principal is None
+    assert linha.valor_juros == 100.0
+    assert linha.conteudo_completo == "Processo 2 - RPV INSS"
+    assert [view.numero_processo for view in lote[:1]] == ["1"]
+    with pytest.raises(IndexError):
+        lote[2]
+    lote.fechar()
+
+
+def test_to_publicacao_devolve_a_publicacao_original(tmp_path):
+    originais = [publicacao("1"), publicacao("2", autores=None, conteudo_completo=None, honorarios=50.0)]
+    lote = PublicacaoBatch(originais, pasta_conteudo=str(tmp_path))
+
+    copias = lote.to_publicacoes()
+
+    assert [copia.to_dict() for copia in copias] == [original.to_dict() for original in originais]
+    assert all(isinstance(copia, Publicacao) for copia in copias)
+    assert lote[0] == originais[0]
+    assert lote[0].to_dict() == originais[0].to_dict()
+    lote.fechar()
+
+
+def test_datas_e_valores_ausentes(tmp_path):
+    com_fuso = datetime(2024, 2, 14, 13, 30, tzinfo=timezone.utc)
+    sem_data = publicacao("1", valor_juros=None, data_disponibilizacao=None)
+    sem_data.created_at = None # Publicacao preenche created_at na criação
+    lote = PublicacaoBatch([sem_data, publicacao("2", created_at=com_fuso)], pasta_conteudo=str(tmp_path))
+
+    assert lote[0].created_at is None
+    assert lote[0].valor_juros is None
+    assert lote[0].data_disponibilizacao is None
+    # Datas com fuso são guardadas no horário local, sem fuso
+    assert lote[1].created_at == com_fuso.astimezone().replace(tzinfo=None)
+    lote.fechar()
+
+
+def test_strings_repetidas_sao_compartilhadas(tmp_path):
+    lote = PublicacaoBatch([publicacao(str(n), advogados="".join(["Maria ", "Souza"])) for n in range(3)],
+                           pasta_conteudo=str(tmp_path))
+
+    assert lote[0].advogados is lote[2].advogados
+    lote.fechar()
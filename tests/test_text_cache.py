@@ -0,0 +1,46 @@
+import os
+import sqlite3
+
+from scraper.text_cache import PDFTextCache
+
+
+def texto_aleatorio(tamanho: int) -> str:
+    return os.urandom(tamanho // 2).hex()
+
+
+def criar_pdf(pasta, n: int) -> str:
+    caminho = os.path.join(pasta, f"{n}.pdf")
+    with open(caminho, 'wb') as f:
+        f.write(b"%PDF-1.4 " + str(n).encode() + b" %%EOF")
+    return caminho
+
+
+def test_descarte_devolve_o_espaco_ao_disco(tmp_path):
+    caminho_db = str(tmp_path / "textos.db")
+    cache = PDFTextCache(caminho_db, max_size_mb=1)
+
+    for n in range(30):
+        cache.salvar(criar_pdf(str(tmp_path), n), texto_aleatorio(150_000))
+
+    assert cache.tamanho_mb() <= 1
+    assert os.path.getsize(caminho_db) < 1.5 * 1024 * 1024
+    assert cache.obter(str(tmp_path / "29.pdf")) is not None
+    assert cache.obter(str(tmp_path / "0.pdf")) is None
+
+    cache.limpar()
+    assert os.path.getsize(caminho_db) < 100 * 1024
+    cache.fechar()
+
+
+def test_banco_existente_passa_a_usar_vacuum_incremental(tmp_path):
+    caminho_db = str(tmp_path / "textos.db")
+    antigo = sqlite3.connect(caminho_db)
+    antigo.execute("CREATE TABLE textos (sha256 TEXT PRIMARY KEY, texto BLOB NOT NULL, "
+                   "tamanho_bytes INTEGER NOT NULL, ultimo_acesso REAL NOT NULL)")
+    antigo.commit()
+    antigo.close()
+
+    cache = PDFTextCache(caminho_db)
+
+    assert cache._conexao.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    cache.fechar()